@@ -1,23 +1,68 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 import uvicorn
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 import os
 
 # Import routes
-from app.routes import auth, users, courses, hackathons, portfolio, analytics, ai
+from app.routes import auth, users, courses, hackathons, portfolio, analytics, ai, debug
+from app.utils.database import db
+from app.utils.cache import start_caches, close_caches
+from app.utils.jwks import supabase_jwks
+from app.utils.write_behind import drain_buffers
+from app.services.course_service import course_catalog
+from app.services.analytics_service import analytics_rollup
+from app.services.leaderboard_service import leaderboard
+from app.services.recommendation_service import course_recommender
+from app.services.mentor_service import mentor
+from app.services.github_sync_service import github_sync
+from app.utils.realtime import hub
+from app.utils.metrics import MetricsMiddleware, METRICS_ENABLED, CONTENT_TYPE, registry, metrics_authorized
+from app.utils.profiler import ProfilerMiddleware, PROFILER_ENABLED, request_profiler
+from app.utils.responses import DefaultJSONResponse
 
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Clients are built per worker process after the fork, never at import time
+    await db.warm_up()
+    await start_caches()
+    await supabase_jwks.start()
+    await course_catalog.start()
+    await course_recommender.start()
+    await analytics_rollup.start()
+    await leaderboard.start()
+    await hub.start()
+    await mentor.start()
+    await github_sync.start()
+    await request_profiler.start()
+    yield
+    await request_profiler.aclose()
+    await github_sync.aclose()
+    await mentor.aclose()
+    await hub.aclose()
+    await drain_buffers()
+    await leaderboard.aclose()
+    await analytics_rollup.aclose()
+    await course_recommender.aclose()
+    await course_catalog.aclose()
+    await supabase_jwks.aclose()
+    await close_caches()
+    await db.aclose()
+
 # Create FastAPI app
 app = FastAPI(
     title="MedhasMind API",
     description="Backend API for MedhasMind - AI-powered hackathon preparation platform",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=DefaultJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -27,8 +72,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination cursors and ETags are read by the frontend's fetch calls
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+if PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# Added last so it is the outermost middleware and times everything below it
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -45,6 +99,7 @@ app.include_router(hackathons.router, prefix="/api/v1/hackathons", tags=["Hackat
 app.include_router(portfolio.router, prefix="/api/v1/portfolio", tags=["Portfolio"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["Analytics"])
 app.include_router(ai.router, prefix="/api/v1/ai", tags=["AI Services"])
+app.include_router(debug.router, prefix="/api/v1/debug", tags=["Debugging"])
 
 # Root endpoint
 @app.get("/")
@@ -56,6 +111,13 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "medhasmind-api"}
 
+# Prometheus scrape endpoint; values are per worker process
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if not metrics_authorized(request.headers.get("authorization")):
+        return Response(status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True)
\ No newline at end of file
@@ -1,9 +1,52 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator
+import json
+from app.schemas.ai import MentorRequest
+from app.schemas.user import TokenData
+from app.services.mentor_service import mentor, MentorAnswer, MentorBusyError
+from app.utils.auth import get_current_user, get_current_admin
 
 router = APIRouter()
 
+def _event(name: str, data: dict) -> str:
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+async def _mentor_events(answer: MentorAnswer) -> AsyncIterator[str]:
+    try:
+        async for chunk in answer.chunks:
+            yield _event("token", {"text": chunk})
+    except Exception:
+        # Details were logged by the mentor service
+        yield _event("error", {"detail": "The mentor could not answer, please try again"})
+        return
+    yield _event("done", {"source": answer.source})
+
+@router.post("/mentor/stream")
+async def mentor_stream(request: MentorRequest, current_user: TokenData = Depends(get_current_user)):
+    """Ask the AI mentor; the answer streams back as server-sent events.
+
+    ``token`` events carry the answer as it is generated, followed by ``done``
+    (with ``source``: ``model`` or ``cache``) or ``error``. Answers 429 with
+    Retry-After when too many questions are waiting.
+    """
+    history = [{"role": message.role.value, "content": message.content} for message in request.history]
+    try:
+        answer = mentor.ask(request.message, history)
+    except MentorBusyError as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e), headers={"Retry-After": "1"})
+    return StreamingResponse(
+        _mentor_events(answer),
+        media_type="text/event-stream",
+        # Proxies must pass tokens through as they arrive
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/mentor/stats")
+async def mentor_stats(current_user: TokenData = Depends(get_current_admin)):
+    """Cache hit rate, time to first token, batching and queue depth (admin only)"""
+    return mentor.stats()
+
 # TODO: Implement AI integration endpoints
-# - AI mentor conversation endpoints
-# - Learning path recommendation engine
 # - Code analysis and feedback
-# - Pitch coach and evaluation
\ No newline at end of file
+# - Pitch coach and evaluation
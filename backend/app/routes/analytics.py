@@ -1,8 +1,95 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from app.schemas.analytics import ActivitySeries, RollupGrain, LeaderboardPage, LeaderboardScope
+from app.schemas.user import TokenData
+from app.services.analytics_service import AnalyticsService
+from app.services.leaderboard_service import leaderboard
+from app.utils.auth import get_current_user, get_current_admin
 
 router = APIRouter()
+analytics_service = AnalyticsService()
 
-# TODO: Implement analytics endpoints
-# - Performance metrics and dashboards
-# - Progress visualization data
-# - Comparative analytics and leaderboards
\ No newline at end of file
+# Hourly buckets are kept for dashboards over short ranges only
+MAX_HOURLY_DAYS = 31
+
+def _check_range(grain: RollupGrain, days: int) -> None:
+    if grain == RollupGrain.HOUR and days > MAX_HOURLY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Hourly series are limited to {MAX_HOURLY_DAYS} days")
+
+@router.get("/me/activity", response_model=ActivitySeries)
+async def get_my_activity(
+    grain: RollupGrain = RollupGrain.DAY,
+    days: int = Query(30, ge=1, le=366),
+    activity_type: Optional[str] = None,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Current user's learning activity over time, read from the rollups"""
+    _check_range(grain, days)
+    series = await analytics_service.get_user_activity(current_user.user_id, grain, days, activity_type)
+    if series is None:
+        raise HTTPException(status_code=503, detail="Analytics unavailable")
+    return series
+
+@router.get("/users/{user_id}/activity", response_model=ActivitySeries)
+async def get_user_activity(
+    user_id: str,
+    grain: RollupGrain = RollupGrain.DAY,
+    days: int = Query(30, ge=1, le=366),
+    activity_type: Optional[str] = None,
+    current_user: TokenData = Depends(get_current_admin)
+):
+    """A user's learning activity over time (admin only)"""
+    _check_range(grain, days)
+    series = await analytics_service.get_user_activity(user_id, grain, days, activity_type)
+    if series is None:
+        raise HTTPException(status_code=503, detail="Analytics unavailable")
+    return series
+
+@router.get("/courses/{course_id}/activity", response_model=ActivitySeries)
+async def get_course_activity(
+    course_id: str,
+    grain: RollupGrain = RollupGrain.DAY,
+    days: int = Query(30, ge=1, le=366),
+    activity_type: str = "course_progress",
+    current_user: TokenData = Depends(get_current_admin)
+):
+    """Events, watch time and active learners for a course over time (admin only)"""
+    _check_range(grain, days)
+    series = await analytics_service.get_activity_stats(course_id, grain, days, activity_type)
+    if series is None:
+        raise HTTPException(status_code=503, detail="Analytics unavailable")
+    return series
+
+def _board_key(scope: LeaderboardScope, key: Optional[str], user_id: str) -> Optional[str]:
+    """Hackathon boards need an id; institution boards default to the caller's own"""
+    if scope == LeaderboardScope.GLOBAL:
+        return None
+    if scope == LeaderboardScope.INSTITUTION and not key:
+        key = leaderboard.institution_of(user_id)
+    if not key:
+        raise HTTPException(status_code=400, detail=f"A key is required for {scope.value} leaderboards")
+    return key
+
+@router.get("/leaderboards/{scope}", response_model=LeaderboardPage)
+async def get_leaderboard(
+    scope: LeaderboardScope,
+    key: Optional[str] = Query(None, max_length=200),
+    limit: int = Query(10, ge=1, le=100),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Top users by achievement points, with the caller's own rank"""
+    await leaderboard.ensure_loaded()
+    key = _board_key(scope, key, current_user.user_id)
+    return leaderboard.top(scope, key, current_user.user_id, limit)
+
+@router.get("/leaderboards/{scope}/around-me", response_model=LeaderboardPage)
+async def get_leaderboard_around_me(
+    scope: LeaderboardScope,
+    key: Optional[str] = Query(None, max_length=200),
+    radius: int = Query(5, ge=1, le=50),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Users ranked just above and below the caller"""
+    await leaderboard.ensure_loaded()
+    key = _board_key(scope, key, current_user.user_id)
+    return leaderboard.around(scope, key, current_user.user_id, radius)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import Dict, Any
 from datetime import timedelta
+import asyncio
 
 from app.schemas.user import (
     SignupRequest,
@@ -11,11 +12,13 @@ from app.schemas.user import (
     PasswordResetRequest,
     PasswordResetConfirm,
     UserRole,
-    UserType
+    UserType,
+    TokenData
 )
 from app.utils.auth import create_access_token, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
-from app.utils.database import supabase, supabase_admin
+from app.utils.database import db
 from app.services.user_service import UserService
+from app.utils.responses import model_response
 
 router = APIRouter()
 user_service = UserService()
@@ -24,7 +27,8 @@ user_service = UserService()
 async def signup(user_data: SignupRequest) -> AuthResponse:
     """Register a new user (student or partner)"""
     try:
-        # Check if user already exists
+        # Check first: signing up an existing email in Supabase Auth still sends
+        # it an email, so the two calls cannot overlap
         existing_user = await user_service.get_user_by_email(user_data.email)
         if existing_user:
             raise HTTPException(
@@ -32,8 +36,7 @@ async def signup(user_data: SignupRequest) -> AuthResponse:
                 detail="User with this email already exists"
             )
 
-        # Create user in Supabase Auth
-        auth_response = supabase.auth.sign_up({
+        auth_response = await db.async_client.auth.sign_up({
             "email": user_data.email,
             "password": user_data.password,
             "options": {
@@ -88,11 +91,15 @@ async def signup(user_data: SignupRequest) -> AuthResponse:
 async def login(credentials: LoginRequest) -> AuthResponse:
     """Authenticate user and return access token"""
     try:
-        # Sign in with Supabase Auth
-        auth_response = supabase.auth.sign_in_with_password({
-            "email": credentials.email,
-            "password": credentials.password
-        })
+        # Sign in with Supabase Auth and fetch the profile by email in parallel;
+        # the profile is only returned once the password has been verified.
+        auth_response, user_profile = await asyncio.gather(
+            db.async_client.auth.sign_in_with_password({
+                "email": credentials.email,
+                "password": credentials.password
+            }),
+            user_service.get_user_by_email(credentials.email)
+        )
 
         if auth_response.user is None or auth_response.session is None:
             raise HTTPException(
@@ -100,16 +107,17 @@ async def login(credentials: LoginRequest) -> AuthResponse:
                 detail="Invalid email or password"
             )
 
-        # Get user profile
-        user_profile = await user_service.get_user_by_id(auth_response.user.id)
+        # Fall back to the id lookup if the email lookup missed or disagrees
+        if not user_profile or user_profile.id != auth_response.user.id:
+            user_profile = await user_service.get_user_by_id(auth_response.user.id)
         if not user_profile:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User profile not found"
             )
 
-        # Update last login
-        await user_service.update_last_login(auth_response.user.id)
+        # Update last login through the write-behind batcher, off the response path
+        user_service.record_login(auth_response.user.id)
 
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -122,12 +130,12 @@ async def login(credentials: LoginRequest) -> AuthResponse:
             expires_delta=access_token_expires
         )
 
-        return AuthResponse(
+        return model_response(AuthResponse(
             access_token=access_token,
             token_type="bearer",
             expires_in=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
             user=user_profile
-        )
+        ), AuthResponse)
 
     except Exception as e:
         raise HTTPException(
@@ -140,7 +148,7 @@ async def logout(current_user: Dict[str, Any] = Depends(get_current_user)):
     """Logout user by invalidating session"""
     try:
         # Sign out from Supabase
-        supabase.auth.sign_out()
+        await db.async_client.auth.sign_out()
         return {"message": "Successfully logged out"}
     except Exception as e:
         raise HTTPException(
@@ -149,18 +157,18 @@ async def logout(current_user: Dict[str, Any] = Depends(get_current_user)):
         )
 
 @router.post("/refresh-token")
-async def refresh_token(current_user: Dict[str, Any] = Depends(get_current_user)):
+async def refresh_token(current_user: TokenData = Depends(get_current_user)):
     """Refresh access token"""
     try:
         # Get user profile
-        user_profile = await user_service.get_user_by_id(current_user["user_id"])
+        user_profile = await user_service.get_user_by_id(current_user.user_id)
 
         # Create new access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
             data={
-                "sub": current_user["user_id"],
-                "email": current_user["email"],
+                "sub": current_user.user_id,
+                "email": current_user.email,
                 "role": user_profile.role
             },
             expires_delta=access_token_expires
@@ -183,7 +191,7 @@ async def reset_password(request: PasswordResetRequest):
     """Request password reset"""
     try:
         # Send password reset email via Supabase
-        supabase.auth.reset_password_email(
+        await db.async_client.auth.reset_password_email(
             email=request.email,
             options={
                 "redirect_to": "http://localhost:3000/reset-password"  # Update with your frontend URL
@@ -201,7 +209,7 @@ async def confirm_reset_password(data: PasswordResetConfirm):
     """Confirm password reset with token"""
     try:
         # Update password using Supabase
-        supabase.auth.update_user({
+        await db.async_client.auth.update_user({
             "password": data.new_password
         })
         return {"message": "Password updated successfully"}
@@ -212,12 +220,12 @@ async def confirm_reset_password(data: PasswordResetConfirm):
         )
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: Dict[str, Any] = Depends(get_current_user)):
+async def get_current_user_profile(current_user: TokenData = Depends(get_current_user)):
     """Get current user profile"""
-    user_profile = await user_service.get_user_by_id(current_user["user_id"])
+    user_profile = await user_service.get_user_by_id(current_user.user_id)
     if not user_profile:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User profile not found"
         )
-    return user_profile
\ No newline at end of file
+    return model_response(user_profile, UserResponse)
\ No newline at end of file
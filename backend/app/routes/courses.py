@@ -1,9 +1,105 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from typing import List, Optional
+import math
+from app.schemas.course import (
+    CourseResponse, CourseCatalogPage, CourseDifficulty, CourseSort, ProgressBatch, ProgressIngestResult,
+    CourseRecommendation, LearningPath
+)
+from app.schemas.user import TokenData
+from app.services.course_service import course_catalog
+from app.services.progress_service import ProgressService, PROGRESS_FLUSH_SECONDS
+from app.services.recommendation_service import course_recommender
+from app.utils.auth import get_current_user
+from app.utils.etag import make_etag, etag_matches
+from app.utils.write_behind import BufferFullError
 
 router = APIRouter()
+progress_service = ProgressService()
+
+# Clients may reuse a cached copy but must revalidate it (cheaply, via ETag) first
+CATALOG_CACHE_CONTROL = "public, no-cache"
+
+def _not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """Set validators on ``response``; return a 304 if the client's copy is current"""
+    headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+@router.get("/", response_model=CourseCatalogPage)
+async def list_courses(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    difficulty: Optional[CourseDifficulty] = None,
+    tags: List[str] = Query([]),
+    sort: CourseSort = CourseSort.NEWEST,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0)
+):
+    """Browse published courses with filters, sorting and facet counts.
+
+    Repeat ``tags`` to require several tags. Served from the in-memory catalog.
+    """
+    index = await course_catalog.get_index()
+    # Same URL + same catalog version = same body, so the version is a valid ETag
+    not_modified = _not_modified(request, response, make_etag(index.version))
+    if not_modified:
+        return not_modified
+    return index.search(
+        category=category, difficulty=difficulty, tags=tags, sort=sort, limit=limit, offset=offset
+    )
+
+@router.post("/progress", response_model=ProgressIngestResult, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_progress(batch: ProgressBatch, current_user: TokenData = Depends(get_current_user)):
+    """Accept a batch of player heartbeats; they are written asynchronously in bulk.
+
+    Answers 429 with Retry-After when the write queue is saturated.
+    """
+    try:
+        return progress_service.ingest(current_user.user_id, batch.events)
+    except BufferFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, math.ceil(PROGRESS_FLUSH_SECONDS)))}
+        )
+
+@router.get("/recommendations", response_model=List[CourseRecommendation])
+async def recommend_courses(
+    limit: int = Query(10, ge=1, le=50),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Courses the current user is most likely to take next, based on what they are enrolled in.
+
+    Learners with no enrollments get popular courses.
+    """
+    if course_recommender.model is None:
+        raise HTTPException(status_code=503, detail="Recommendations are not available yet")
+    return await course_recommender.recommend(current_user.user_id, limit)
+
+@router.get("/{course_id}", response_model=CourseResponse)
+async def get_course(course_id: str, request: Request, response: Response):
+    """Get a published course by ID"""
+    index = await course_catalog.get_index()
+    course = index.get(course_id)
+    if not course:
+        raise HTTPException(status_code=404, detail="Course not found")
+    not_modified = _not_modified(request, response, make_etag(course.id, course.updated_at))
+    if not_modified:
+        return not_modified
+    return course
+
+@router.get("/{course_id}/learning-path", response_model=LearningPath)
+async def get_learning_path(course_id: str, current_user: TokenData = Depends(get_current_user)):
+    """Prerequisites the current user still has to complete for a course, in taking order"""
+    if course_recommender.model is None:
+        raise HTTPException(status_code=503, detail="Recommendations are not available yet")
+    path = await course_recommender.learning_path(current_user.user_id, course_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Course not found")
+    return path
 
 # TODO: Implement course management endpoints
-# - Course catalog
 # - Course enrollment
-# - Progress tracking
-# - Learning path recommendations
\ No newline at end of file
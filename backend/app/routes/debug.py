@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+import asyncio
+from app.schemas.user import TokenData
+from app.utils.auth import get_current_admin
+from app.utils.profiler import request_profiler
+
+router = APIRouter()
+
+@router.get("/profiles")
+async def list_profiles(current_user: TokenData = Depends(get_current_admin)):
+    """Request profiles captured by the sampling profiler, newest first (admin only)"""
+    loop = asyncio.get_running_loop()
+    profiles = await loop.run_in_executor(None, request_profiler.store.list)
+    return {"profiler": request_profiler.stats(), "profiles": profiles}
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def download_profile(profile_id: str, current_user: TokenData = Depends(get_current_admin)):
+    """One profile as folded stacks, ready for flamegraph.pl or speedscope (admin only)"""
+    loop = asyncio.get_running_loop()
+    folded = await loop.run_in_executor(None, request_profiler.store.read, profile_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        folded, headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'}
+    )
@@ -1,9 +1,131 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, status
+from jose import JWTError, jwt
+from typing import List, Optional, Tuple
+from uuid import UUID
+import os
+from app.schemas.hackathon import ParticipantRegistration, TeamMatch, ParticipantMatch
+from app.schemas.user import TokenData, UserRole
+from app.services.team_matching_service import TeamMatchingService
+from app.utils.auth import get_current_user, verify_token
+from app.utils.realtime import hub, CLOSE_POLICY_VIOLATION
 
 router = APIRouter()
+matching_service = TeamMatchingService()
+
+# Browsers cannot set headers on a WebSocket, but they can offer the subprotocols
+# ["bearer", <token>]; the server accepts with "bearer" and never echoes the token
+WS_AUTH_SUBPROTOCOL = "bearer"
+# ?token= ends up in access and proxy logs, so it only takes tokens issued to
+# live at most this long
+WS_QUERY_TOKEN_MAX_SECONDS = int(os.getenv("WS_QUERY_TOKEN_MAX_SECONDS", 60))
+
+@router.post("/{hackathon_id}/participants", status_code=status.HTTP_201_CREATED)
+async def register_for_hackathon(
+    hackathon_id: UUID,
+    registration: ParticipantRegistration,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Register the current user for a hackathon, optionally as looking for a team"""
+    if not await matching_service.hackathon_exists(str(hackathon_id)):
+        raise HTTPException(status_code=404, detail="Hackathon not found")
+    await matching_service.register_participant(
+        str(hackathon_id), current_user.user_id, registration.looking_for_team
+    )
+    return {"message": "Registered for hackathon"}
+
+@router.get("/{hackathon_id}/matches/teams", response_model=List[TeamMatch])
+async def recommend_teams(
+    hackathon_id: UUID,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Open teams whose needs best match the current user's skills"""
+    index = await matching_service.get_index(str(hackathon_id))
+    if index is None:
+        raise HTTPException(status_code=404, detail="Hackathon not found")
+    if not index.is_participant(current_user.user_id):
+        raise HTTPException(status_code=404, detail="Register for the hackathon to get team matches")
+    return index.teams_for(current_user.user_id, limit)
+
+@router.get("/{hackathon_id}/teams/{team_id}/matches", response_model=List[ParticipantMatch])
+async def recommend_participants(
+    hackathon_id: UUID,
+    team_id: UUID,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Participants looking for a team who best fill the team's gaps (team members only)"""
+    index = await matching_service.get_index(str(hackathon_id))
+    if index is None or not index.has_team(str(team_id)):
+        raise HTTPException(status_code=404, detail="Team not found")
+    if current_user.role != UserRole.ADMIN and not index.is_member(str(team_id), current_user.user_id):
+        raise HTTPException(status_code=403, detail="Only team members can see matches")
+    return index.participants_for(str(team_id), limit)
+
+def _short_lived(token: str) -> bool:
+    # The signature is checked by verify_token; this only reads the lifetime
+    try:
+        claims = jwt.get_unverified_claims(token)
+    except JWTError:
+        return False
+    issued, expires = claims.get("iat"), claims.get("exp")
+    if not isinstance(issued, (int, float)) or not isinstance(expires, (int, float)):
+        return False
+    return expires - issued <= WS_QUERY_TOKEN_MAX_SECONDS
+
+def _authenticate_websocket(websocket: WebSocket) -> Tuple[Optional[TokenData], Optional[str]]:
+    """The caller and the subprotocol to accept with.
+
+    The token comes from the ["bearer", <token>] subprotocol pair (browsers),
+    the Authorization header (other clients), or ?token= for short-lived
+    tokens only.
+    """
+    subprotocol = None
+    subprotocols = websocket.scope.get("subprotocols") or []
+    scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+    if len(subprotocols) == 2 and subprotocols[0] == WS_AUTH_SUBPROTOCOL:
+        token, subprotocol = subprotocols[1], WS_AUTH_SUBPROTOCOL
+    elif scheme.lower() == "bearer" and credentials:
+        token = credentials
+    else:
+        token = websocket.query_params.get("token")
+        if token and not _short_lived(token):
+            return None, None
+    if not token:
+        return None, None
+    try:
+        return verify_token(token), subprotocol
+    except HTTPException:
+        return None, None
+
+@router.websocket("/{hackathon_id}/ws")
+async def hackathon_channel(websocket: WebSocket, hackathon_id: UUID):
+    """Live announcements and chat for a hackathon's participants and organizer"""
+    user, subprotocol = _authenticate_websocket(websocket)
+    if user is None:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+    if user.role != UserRole.ADMIN:
+        index = await matching_service.get_index(str(hackathon_id))
+        if index is None or not (index.is_participant(user.user_id) or index.is_organizer(user.user_id)):
+            await websocket.close(code=CLOSE_POLICY_VIOLATION)
+            return
+    await hub.serve(websocket, f"hackathon:{hackathon_id}", user.user_id, subprotocol=subprotocol)
+
+@router.websocket("/{hackathon_id}/teams/{team_id}/ws")
+async def team_channel(websocket: WebSocket, hackathon_id: UUID, team_id: UUID):
+    """Private real-time channel for a team's members"""
+    user, subprotocol = _authenticate_websocket(websocket)
+    if user is None:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+    if user.role != UserRole.ADMIN:
+        index = await matching_service.get_index(str(hackathon_id))
+        if index is None or not index.is_member(str(team_id), user.user_id):
+            await websocket.close(code=CLOSE_POLICY_VIOLATION)
+            return
+    await hub.serve(websocket, f"team:{team_id}", user.user_id, subprotocol=subprotocol)
 
 # TODO: Implement hackathon management endpoints
 # - Hackathon creation and management
-# - Team formation
-# - Real-time collaboration
-# - Submissions and evaluation
\ No newline at end of file
+# - Submissions and evaluation
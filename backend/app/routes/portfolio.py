@@ -1,9 +1,104 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from typing import List
+from uuid import UUID
+from app.schemas.portfolio import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, PublicPortfolio, GitHubSyncStatus
+)
+from app.schemas.user import TokenData
+from app.services.portfolio_service import PortfolioService
+from app.services.github_sync_service import github_sync, github_login
+from app.utils.auth import get_current_user
+from app.utils.etag import etag_matches
 
 router = APIRouter()
+portfolio_service = PortfolioService()
+
+# Shared caches and browsers may reuse a page for a minute, and serve it stale
+# while revalidating (a cheap 304) for up to ten more
+PUBLIC_PORTFOLIO_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=600"
+
+@router.get("/projects", response_model=List[ProjectResponse])
+async def list_my_projects(current_user: TokenData = Depends(get_current_user)):
+    """The current user's portfolio projects"""
+    return await portfolio_service.list_projects(current_user.user_id)
+
+@router.post("/projects", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
+async def create_project(project: ProjectCreate, current_user: TokenData = Depends(get_current_user)):
+    """Add a project to the current user's portfolio"""
+    created = await portfolio_service.create_project(current_user.user_id, project)
+    if not created:
+        raise HTTPException(status_code=400, detail="Could not create project")
+    return created
+
+@router.patch("/projects/{project_id}", response_model=ProjectResponse)
+async def update_project(
+    project_id: UUID,
+    update: ProjectUpdate,
+    current_user: TokenData = Depends(get_current_user)
+):
+    """Update one of the current user's projects"""
+    if not update.model_fields_set:
+        raise HTTPException(status_code=400, detail="No fields to update")
+    updated = await portfolio_service.update_project(current_user.user_id, str(project_id), update)
+    if not updated:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return updated
+
+@router.delete("/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_project(project_id: UUID, current_user: TokenData = Depends(get_current_user)):
+    """Remove one of the current user's projects"""
+    if not await portfolio_service.delete_project(current_user.user_id, str(project_id)):
+        raise HTTPException(status_code=404, detail="Project not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+@router.get(
+    "/public/{user_id}",
+    response_model=PublicPortfolio,
+    responses={304: {"description": "The client's copy is current"}}
+)
+async def get_public_portfolio(user_id: UUID, request: Request):
+    """A user's public portfolio page (no authentication).
+
+    Served as pre-serialized JSON from the portfolio cache, with a strong ETag;
+    send it back in If-None-Match to get a 304.
+    """
+    page = await portfolio_service.get_public_page(str(user_id))
+    if page is None:
+        raise HTTPException(status_code=404, detail="Portfolio not found")
+    headers = {"ETag": page.etag, "Cache-Control": PUBLIC_PORTFOLIO_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), page.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
+
+@router.post("/github/sync", response_model=GitHubSyncStatus, status_code=status.HTTP_202_ACCEPTED)
+async def sync_github(current_user: TokenData = Depends(get_current_user)):
+    """Import the current user's public GitHub repositories as projects, in the background.
+
+    Uses the github_url on the profile. Every repository is written again, so
+    imported projects the user deleted come back.
+    """
+    try:
+        github_url = await github_sync.store.github_url(current_user.user_id)
+    except Exception as e:
+        print(f"Error loading GitHub URL: {e}")
+        raise HTTPException(status_code=503, detail="GitHub sync is unavailable")
+    login = github_login(github_url)
+    if login is None:
+        raise HTTPException(status_code=400, detail="Add your GitHub profile URL first")
+    if not github_sync.enqueue(current_user.user_id, github_url, force=True) and not github_sync.is_pending(current_user.user_id):
+        raise HTTPException(status_code=503, detail="GitHub sync is unavailable")
+    return GitHubSyncStatus(github_login=login, in_progress=True)
+
+@router.get("/github/sync", response_model=GitHubSyncStatus)
+async def get_github_sync(current_user: TokenData = Depends(get_current_user)):
+    """Status of the current user's last GitHub import"""
+    try:
+        state = await github_sync.store.get_state(current_user.user_id)
+    except Exception as e:
+        print(f"Error loading GitHub sync state: {e}")
+        raise HTTPException(status_code=503, detail="GitHub sync is unavailable")
+    state = {key: value for key, value in (state or {}).items() if value is not None}
+    return GitHubSyncStatus(**state, in_progress=github_sync.is_pending(current_user.user_id))
 
 # TODO: Implement portfolio management endpoints
-# - Project creation and management
-# - GitHub integration
 # - Template management
-# - Public sharing
\ No newline at end of file
@@ -1,30 +1,82 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from app.schemas.user import UserResponse, UserUpdate, UserProfile
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, AsyncIterator
+import csv
+import io
+import json
+from app.schemas.user import UserResponse, UserUpdate, UserProfile, UserRole, UserSuggestion, TokenData
 from app.utils.auth import get_current_user, get_current_admin
-from app.services.user_service import UserService
+from app.services.user_service import UserService, EXPORT_COLUMNS
+from app.utils.responses import model_response
 
 router = APIRouter()
 user_service = UserService()
 
+# Ranked searches return at most this many users (search_profiles caps result_limit the same)
+MAX_SEARCH_RESULTS = 100
+
 @router.get("/profile", response_model=UserProfile)
-async def get_my_profile(current_user: dict = Depends(get_current_user)):
+async def get_my_profile(current_user: TokenData = Depends(get_current_user)):
     """Get current user's profile with statistics"""
-    profile = await user_service.get_user_profile_with_stats(current_user["user_id"])
+    profile = await user_service.get_user_profile_with_stats(current_user.user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="Profile not found")
-    return profile
+    return model_response(profile, UserProfile)
 
 @router.put("/profile", response_model=UserResponse)
 async def update_my_profile(
     update_data: UserUpdate,
-    current_user: dict = Depends(get_current_user)
+    current_user: TokenData = Depends(get_current_user)
 ):
     """Update current user's profile"""
-    updated_profile = await user_service.update_user_profile(current_user["user_id"], update_data)
+    updated_profile = await user_service.update_user_profile(current_user.user_id, update_data)
     if not updated_profile:
         raise HTTPException(status_code=404, detail="Profile not found")
-    return updated_profile
+    return model_response(updated_profile, UserResponse)
+
+async def _ndjson_lines(users: AsyncIterator[dict]) -> AsyncIterator[str]:
+    async for user in users:
+        yield json.dumps(user) + "\n"
+
+async def _csv_lines(users: AsyncIterator[dict]) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    async for user in users:
+        writer.writerow(user)
+        if buffer.tell() > 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@router.get("/export")
+async def export_users(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    role: Optional[UserRole] = None,
+    current_user: dict = Depends(get_current_admin)
+):
+    """Stream every user as NDJSON or CSV (admin only)"""
+    users = user_service.iter_users(role=role)
+    if format == "csv":
+        body, media_type = _csv_lines(users), "text/csv"
+    else:
+        body, media_type = _ndjson_lines(users), "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'}
+    )
+
+@router.get("/autocomplete", response_model=List[UserSuggestion])
+async def autocomplete_users(
+    prefix: str = Query(..., min_length=1, max_length=100),
+    role: Optional[UserRole] = None,
+    limit: int = Query(10, ge=1, le=25),
+    current_user: dict = Depends(get_current_admin)
+):
+    """Suggest users whose name or email words start with the typed text (admin only)"""
+    return await user_service.autocomplete_users(prefix, limit=limit, role=role)
 
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user_profile(user_id: str, current_user: dict = Depends(get_current_user)):
@@ -32,25 +84,35 @@ async def get_user_profile(user_id: str, current_user: dict = Depends(get_curren
     profile = await user_service.get_user_by_id(user_id)
     if not profile:
         raise HTTPException(status_code=404, detail="User not found")
-    return profile
+    return model_response(profile, UserResponse)
 
 @router.get("/", response_model=List[UserResponse])
 async def search_users(
     query: str = "",
-    role: str = None,
+    role: Optional[UserRole] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: dict = Depends(get_current_admin)
 ):
-    """Search users (admin only)"""
-    if query:
-        users = await user_service.search_users(query)
-    elif role:
-        from app.schemas.user import UserRole
-        users = await user_service.get_users_by_role(UserRole(role))
-    else:
-        # Return empty list for now - implement pagination later
-        users = []
+    """Search and list users (admin only).
+
+    Without a query, users are listed page by page and the cursor for the next
+    page is returned in the X-Next-Cursor header. With a query, the best
+    ``limit`` matches (at most 100) are returned ranked by relevance.
+    """
+    if query.strip():
+        if limit > MAX_SEARCH_RESULTS:
+            raise HTTPException(status_code=400, detail=f"Searches return at most {MAX_SEARCH_RESULTS} users")
+        return model_response(await user_service.search_users(query, limit=limit, role=role), List[UserResponse])
+
+    try:
+        rows, next_cursor = await user_service.list_users(role=role, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return users
+    # Rows are validated once, straight from the database response
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return model_response(rows, List[UserResponse], headers=headers)
 
 # TODO: Add more user management endpoints
 # - User deactivation/activation
@@ -0,0 +1,16 @@
+from pydantic import BaseModel, Field
+from typing import List
+from enum import Enum
+
+class MentorRole(str, Enum):
+    USER = "user"
+    ASSISTANT = "assistant"
+
+class MentorMessage(BaseModel):
+    role: MentorRole
+    content: str = Field(..., min_length=1, max_length=4000)
+
+class MentorRequest(BaseModel):
+    message: str = Field(..., min_length=1, max_length=4000)
+    # Earlier turns of the conversation, oldest first
+    history: List[MentorMessage] = Field(default_factory=list, max_length=20)
@@ -0,0 +1,54 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+from enum import Enum
+
+class RollupGrain(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+
+class ActivityPoint(BaseModel):
+    bucket: datetime
+    events: int = 0
+    seconds: int = 0
+    # Activity series only: distinct users active in the bucket
+    active_users: Optional[int] = None
+
+class ActivityTotal(BaseModel):
+    activity_type: str
+    activity_id: Optional[str] = None
+    events: int = 0
+    seconds: int = 0
+    max_progress: Optional[int] = None
+
+class ActivitySeries(BaseModel):
+    grain: RollupGrain
+    since: datetime
+    until: datetime
+    total_events: int
+    total_seconds: int
+    points: List[ActivityPoint]
+    # User series only: totals per course/activity over the range
+    activities: Optional[List[ActivityTotal]] = None
+
+class LeaderboardScope(str, Enum):
+    GLOBAL = "global"
+    HACKATHON = "hackathon"
+    INSTITUTION = "institution"
+
+class LeaderboardEntry(BaseModel):
+    # Ties share a rank: 1, 2, 2, 4
+    rank: int
+    user_id: str
+    name: Optional[str] = None
+    points: int
+
+class LeaderboardPage(BaseModel):
+    scope: LeaderboardScope
+    # Hackathon id or institution name; None for the global board
+    key: Optional[str] = None
+    total_users: int
+    entries: List[LeaderboardEntry]
+    # The caller's own position, when they are on the board
+    me: Optional[LeaderboardEntry] = None
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,71 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict
+from datetime import datetime
+from uuid import UUID
+from enum import Enum
+
+class CourseDifficulty(str, Enum):
+    BEGINNER = "beginner"
+    INTERMEDIATE = "intermediate"
+    ADVANCED = "advanced"
+
+class CourseSort(str, Enum):
+    NEWEST = "newest"
+    OLDEST = "oldest"
+    TITLE = "title"
+    SHORTEST = "shortest"
+    LONGEST = "longest"
+
+class CourseResponse(BaseModel):
+    id: str
+    title: str
+    description: Optional[str] = None
+    category: str
+    difficulty: CourseDifficulty = CourseDifficulty.BEGINNER
+    duration_hours: int = 0
+    instructor_id: Optional[str] = None
+    tags: List[str] = []
+    prerequisites: List[str] = []
+    learning_objectives: List[str] = []
+    created_at: datetime
+    updated_at: datetime
+
+class CourseCatalogPage(BaseModel):
+    items: List[CourseResponse]
+    total: int
+    limit: int
+    offset: int
+    # facet name -> value -> number of matching courses
+    facets: Dict[str, Dict[str, int]]
+
+class ProgressEvent(BaseModel):
+    course_id: UUID
+    # Client-generated id; retried events with a seen id are dropped
+    event_id: Optional[str] = Field(None, max_length=64)
+    occurred_at: datetime
+    progress_percentage: int = Field(..., ge=0, le=100)
+    # Watch time since the previous heartbeat
+    seconds_watched: int = Field(0, ge=0, le=300)
+    current_lesson: Optional[str] = Field(None, max_length=200)
+
+class ProgressBatch(BaseModel):
+    events: List[ProgressEvent] = Field(..., min_length=1, max_length=500)
+
+class ProgressIngestResult(BaseModel):
+    accepted: int
+    duplicates: int
+    enrollments: int
+
+class CourseRecommendation(BaseModel):
+    course: CourseResponse
+    score: float
+    # False if some prerequisites are not completed yet
+    ready: bool
+    # Enrolled course that contributed most to the score
+    because_of: Optional[str] = None
+
+class LearningPath(BaseModel):
+    course_id: str
+    # Courses still to take, prerequisites first and the target last
+    steps: List[CourseResponse]
+    total_hours: int
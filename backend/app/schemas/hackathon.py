@@ -0,0 +1,22 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+class ParticipantRegistration(BaseModel):
+    # Joins the pool that team matching recommends to teams
+    looking_for_team: bool = True
+
+class TeamMatch(BaseModel):
+    team_id: str
+    name: str
+    score: float
+    members: int
+    max_members: int
+    # Skills the participant brings that the team is looking for
+    matched_skills: List[str] = []
+
+class ParticipantMatch(BaseModel):
+    user_id: str
+    name: Optional[str] = None
+    skill_level: Optional[str] = None
+    score: float
+    matched_skills: List[str] = []
@@ -0,0 +1,75 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import datetime
+from uuid import UUID
+from enum import Enum
+
+class ProjectType(str, Enum):
+    PERSONAL = "personal"
+    HACKATHON = "hackathon"
+    ACADEMIC = "academic"
+
+class ProjectBase(BaseModel):
+    title: str = Field(..., min_length=1, max_length=200)
+    description: Optional[str] = Field(None, max_length=5000)
+    technologies: List[str] = Field(default_factory=list, max_length=30)
+    github_url: Optional[str] = None
+    live_url: Optional[str] = None
+    images: List[str] = Field(default_factory=list, max_length=10)
+    featured: bool = False
+    project_type: ProjectType = ProjectType.PERSONAL
+    hackathon_id: Optional[UUID] = None
+    team_id: Optional[UUID] = None
+
+class ProjectCreate(ProjectBase):
+    pass
+
+class ProjectUpdate(BaseModel):
+    title: Optional[str] = Field(None, min_length=1, max_length=200)
+    description: Optional[str] = Field(None, max_length=5000)
+    technologies: Optional[List[str]] = Field(None, max_length=30)
+    github_url: Optional[str] = None
+    live_url: Optional[str] = None
+    images: Optional[List[str]] = Field(None, max_length=10)
+    featured: Optional[bool] = None
+    project_type: Optional[ProjectType] = None
+    hackathon_id: Optional[UUID] = None
+    team_id: Optional[UUID] = None
+
+class ProjectResponse(ProjectBase):
+    id: str
+    user_id: str
+    # Set on projects imported from GitHub
+    github_repo_id: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+
+class PublicProfile(BaseModel):
+    # Only what a portfolio visitor may see: no email, phone or account state
+    id: str
+    name: str
+    avatar_url: Optional[str] = None
+    bio: Optional[str] = None
+    institution: Optional[str] = None
+    location: Optional[str] = None
+    linkedin_url: Optional[str] = None
+    github_url: Optional[str] = None
+    portfolio_url: Optional[str] = None
+    skills: List[str] = []
+    skill_level: Optional[str] = None
+    hackathons_participated: int = 0
+    hackathons_won: int = 0
+    badges_earned: int = 0
+
+class PublicPortfolio(BaseModel):
+    profile: PublicProfile
+    # Featured projects first, then newest first
+    projects: List[ProjectResponse]
+
+class GitHubSyncStatus(BaseModel):
+    github_login: Optional[str] = None
+    synced_at: Optional[datetime] = None
+    repos_imported: int = 0
+    last_error: Optional[str] = None
+    # True while a sync is queued or running
+    in_progress: bool = False
@@ -24,6 +24,7 @@ class UserBase(BaseModel):
     linkedin_url: Optional[str] = None
     github_url: Optional[str] = None
     portfolio_url: Optional[str] = None
+    skills: List[str] = Field(default_factory=list, max_length=50)
 
 class UserCreate(UserBase):
     password: str = Field(..., min_length=8)
@@ -37,8 +38,12 @@ class UserUpdate(BaseModel):
     linkedin_url: Optional[str] = None
     github_url: Optional[str] = None
     portfolio_url: Optional[str] = None
+    skills: Optional[List[str]] = Field(None, max_length=50)
 
 class UserInDB(UserBase):
+    # Stored emails were validated at signup; re-running the email validator
+    # on every row read was most of the cost of building a profile
+    email: str = Field(..., json_schema_extra={"format": "email"})
     id: str
     created_at: datetime
     updated_at: datetime
@@ -59,6 +64,12 @@ class UserProfile(UserInDB):
     badges_earned: int = 0
     skill_level: str = "beginner"  # beginner, intermediate, advanced, expert
 
+class UserSuggestion(BaseModel):
+    id: str
+    name: str
+    email: str
+    role: UserRole
+
 class AuthResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -0,0 +1,172 @@
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timedelta, timezone
+import asyncio
+import os
+from app.utils.database import db, fetch_all
+from app.schemas.analytics import ActivityPoint, ActivitySeries, ActivityTotal, RollupGrain
+
+# How often each worker folds new user_progress rows into the rollups (0 disables)
+ANALYTICS_ROLLUP_SECONDS = float(os.getenv("ANALYTICS_ROLLUP_SECONDS", 60))
+ANALYTICS_ROLLUP_BATCH = int(os.getenv("ANALYTICS_ROLLUP_BATCH", 50000))
+# Stored in place of a NULL activity_id in the rollup tables
+NIL_ACTIVITY_ID = "00000000-0000-0000-0000-000000000000"
+GRAIN_STEPS = {RollupGrain.HOUR: timedelta(hours=1), RollupGrain.DAY: timedelta(days=1)}
+
+def bucket_range(grain: RollupGrain, days: int, now: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """The ``days`` of whole buckets ending with (and including) the current one"""
+    now = now or datetime.now(timezone.utc)
+    current = now.replace(minute=0, second=0, microsecond=0)
+    if grain == RollupGrain.DAY:
+        current = current.replace(hour=0)
+    until = current + GRAIN_STEPS[grain]
+    return until - timedelta(days=days), until
+
+def _parse_bucket(value: str) -> datetime:
+    return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+def _fill_series(
+    grain: RollupGrain, since: datetime, until: datetime, rows: List[Dict[str, Any]], with_users: bool
+) -> List[ActivityPoint]:
+    """One point per bucket in the range, zero where there was no activity"""
+    step = GRAIN_STEPS[grain]
+    points: Dict[datetime, ActivityPoint] = {}
+    bucket = since
+    while bucket < until:
+        points[bucket] = ActivityPoint(bucket=bucket, active_users=0 if with_users else None)
+        bucket += step
+    for row in rows:
+        point = points.get(_parse_bucket(row['bucket']))
+        if point is None:
+            continue
+        point.events += row['events']
+        point.seconds += row['seconds']
+        if with_users:
+            point.active_users += row['active_users']
+    return list(points.values())
+
+class AnalyticsService:
+    async def get_user_activity(
+        self, user_id: str, grain: RollupGrain, days: int, activity_type: Optional[str] = None
+    ) -> Optional[ActivitySeries]:
+        """Activity over time for one user, with totals per course/activity"""
+        since, until = bucket_range(grain, days)
+
+        def query():
+            builder = db.async_admin_client.table('user_activity_rollups') \
+                .select('bucket,activity_type,activity_id,events,seconds,max_progress') \
+                .eq('grain', grain.value).eq('user_id', user_id) \
+                .gte('bucket', since.isoformat()).lt('bucket', until.isoformat())
+            if activity_type:
+                builder = builder.eq('activity_type', activity_type)
+            return builder.order('bucket,activity_type,activity_id')
+
+        try:
+            rows = await fetch_all(query)
+        except Exception as e:
+            print(f"Error getting user activity: {e}")
+            return None
+
+        totals: Dict[Tuple[str, str], ActivityTotal] = {}
+        for row in rows:
+            key = (row['activity_type'], row['activity_id'])
+            total = totals.get(key)
+            if total is None:
+                total = totals[key] = ActivityTotal(
+                    activity_type=row['activity_type'],
+                    activity_id=None if row['activity_id'] == NIL_ACTIVITY_ID else row['activity_id']
+                )
+            total.events += row['events']
+            total.seconds += row['seconds']
+            if row['max_progress'] is not None:
+                total.max_progress = max(total.max_progress or 0, row['max_progress'])
+
+        return ActivitySeries(
+            grain=grain,
+            since=since,
+            until=until,
+            total_events=sum(row['events'] for row in rows),
+            total_seconds=sum(row['seconds'] for row in rows),
+            points=_fill_series(grain, since, until, rows, with_users=False),
+            activities=sorted(totals.values(), key=lambda total: -total.seconds)
+        )
+
+    async def get_activity_stats(
+        self, activity_id: str, grain: RollupGrain, days: int, activity_type: str = "course_progress"
+    ) -> Optional[ActivitySeries]:
+        """Activity over time for one course (or other activity) across all users"""
+        since, until = bucket_range(grain, days)
+        try:
+            rows = await fetch_all(
+                lambda: db.async_admin_client.table('activity_rollups')
+                .select('bucket,events,seconds,active_users')
+                .eq('grain', grain.value).eq('activity_id', activity_id).eq('activity_type', activity_type)
+                .gte('bucket', since.isoformat()).lt('bucket', until.isoformat())
+                .order('bucket')
+            )
+        except Exception as e:
+            print(f"Error getting activity stats: {e}")
+            return None
+
+        return ActivitySeries(
+            grain=grain,
+            since=since,
+            until=until,
+            total_events=sum(row['events'] for row in rows),
+            total_seconds=sum(row['seconds'] for row in rows),
+            points=_fill_series(grain, since, until, rows, with_users=True)
+        )
+
+    async def run_rollup(self, batch_limit: int = ANALYTICS_ROLLUP_BATCH) -> int:
+        """Fold new user_progress rows into the rollups; returns events consumed"""
+        consumed = 0
+        while True:
+            batch = await db.async_admin_client.call(
+                'rollup_user_progress', {'batch_limit': batch_limit}, timeout=300
+            ) or 0
+            consumed += batch
+            if batch < batch_limit:
+                return consumed
+
+class AnalyticsRollup:
+    """Background task that keeps the rollups current in every worker.
+
+    The database function takes an advisory lock, so when several workers
+    run it at once only one does the work and the others return immediately.
+    """
+
+    def __init__(self, interval: float = ANALYTICS_ROLLUP_SECONDS):
+        self.interval = interval
+        self.runs = 0
+        self.events_consumed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _loop(self) -> None:
+        service = AnalyticsService()
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.events_consumed += await service.run_rollup()
+                self.runs += 1
+            except Exception as e:
+                print(f"Error rolling up analytics: {e}")
+
+    async def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        try:
+            db.async_admin_client
+        except ValueError as e:
+            print(f"Skipping analytics rollups: {e}")
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+analytics_rollup = AnalyticsRollup()
@@ -0,0 +1,205 @@
+from typing import Optional, Dict, Any, List, Set, Iterable, Callable
+from collections import Counter, defaultdict
+import asyncio
+import hashlib
+import os
+from app.utils.database import db, fetch_all
+from app.schemas.course import CourseResponse, CourseCatalogPage, CourseDifficulty, CourseSort
+
+COURSE_CATALOG_REFRESH_SECONDS = float(os.getenv("COURSE_CATALOG_REFRESH_SECONDS", 30))
+COURSE_COLUMNS = (
+    "id,title,description,category,difficulty,duration_hours,instructor_id,"
+    "tags,prerequisites,learning_objectives,created_at,updated_at"
+)
+FACETS = ("category", "difficulty", "tags")
+
+_SORT_KEYS: Dict[CourseSort, Callable[[CourseResponse], Any]] = {
+    CourseSort.NEWEST: lambda course: (-course.created_at.timestamp(), course.id),
+    CourseSort.OLDEST: lambda course: (course.created_at.timestamp(), course.id),
+    CourseSort.TITLE: lambda course: (course.title.lower(), course.id),
+    CourseSort.SHORTEST: lambda course: (course.duration_hours, course.title.lower(), course.id),
+    CourseSort.LONGEST: lambda course: (-course.duration_hours, course.title.lower(), course.id),
+}
+
+def _facet_values(course: CourseResponse, facet: str) -> Iterable[str]:
+    if facet == "tags":
+        return set(course.tags)
+    if facet == "difficulty":
+        return (course.difficulty.value,)
+    return (course.category,)
+
+class CatalogIndex:
+    """Immutable snapshot of the published catalog with an inverted index per facet.
+
+    Filters intersect posting sets (smallest first) and results are ordered by
+    ranks precomputed for every sort, so a query never scans the catalog.
+    """
+
+    def __init__(self, courses: List[CourseResponse], version: str):
+        self.version = version
+        self.courses: Dict[str, CourseResponse] = {course.id: course for course in courses}
+        self.postings: Dict[str, Dict[str, Set[str]]] = {facet: defaultdict(set) for facet in FACETS}
+        for course in courses:
+            for facet in FACETS:
+                for value in _facet_values(course, facet):
+                    self.postings[facet][value].add(course.id)
+        # Filter values are matched case-insensitively against the stored spelling
+        self._spellings = {
+            facet: {value.lower(): value for value in values} for facet, values in self.postings.items()
+        }
+        self._order: Dict[CourseSort, List[str]] = {}
+        self._rank: Dict[CourseSort, Dict[str, int]] = {}
+        for sort, key in _SORT_KEYS.items():
+            order = [course.id for course in sorted(courses, key=key)]
+            self._order[sort] = order
+            self._rank[sort] = {course_id: position for position, course_id in enumerate(order)}
+
+    def __len__(self) -> int:
+        return len(self.courses)
+
+    def get(self, course_id: str) -> Optional[CourseResponse]:
+        return self.courses.get(course_id)
+
+    def _posting(self, facet: str, value: str) -> Set[str]:
+        spelling = self._spellings[facet].get(value.lower())
+        return self.postings[facet][spelling] if spelling is not None else set()
+
+    def search(
+        self,
+        category: Optional[str] = None,
+        difficulty: Optional[CourseDifficulty] = None,
+        tags: Iterable[str] = (),
+        sort: CourseSort = CourseSort.NEWEST,
+        limit: int = 20,
+        offset: int = 0
+    ) -> CourseCatalogPage:
+        """Filter by category, difficulty and all of ``tags``; facets count the matches"""
+        postings = [self._posting("tags", tag) for tag in tags]
+        if category:
+            postings.append(self._posting("category", category))
+        if difficulty:
+            postings.append(self._posting("difficulty", difficulty.value))
+
+        if postings:
+            postings.sort(key=len)
+            matched = set(postings[0]).intersection(*postings[1:])
+            ordered = sorted(matched, key=self._rank[sort].__getitem__)
+        else:
+            ordered = self._order[sort]
+
+        facets = {facet: Counter() for facet in FACETS}
+        for course_id in ordered:
+            course = self.courses[course_id]
+            for facet in FACETS:
+                facets[facet].update(_facet_values(course, facet))
+
+        return CourseCatalogPage(
+            items=[self.courses[course_id] for course_id in ordered[offset:offset + limit]],
+            total=len(ordered),
+            limit=limit,
+            offset=offset,
+            facets={facet: dict(counts.most_common()) for facet, counts in facets.items()}
+        )
+
+def _course_from_row(row: Dict[str, Any]) -> CourseResponse:
+    # Array columns are nullable in the table
+    for column in ("tags", "prerequisites", "learning_objectives"):
+        row[column] = row.get(column) or []
+    return CourseResponse(**row)
+
+def catalog_version(rows: Iterable[Dict[str, Any]]) -> str:
+    """Fingerprint of the published set; changes when a course is added, edited or unpublished"""
+    digest = hashlib.sha256()
+    for row in sorted(rows, key=lambda row: row['id']):
+        digest.update(f"{row['id']}:{row['updated_at']};".encode())
+    return digest.hexdigest()
+
+class CourseCatalog:
+    """Serves the catalog from an in-memory CatalogIndex kept in sync in the background.
+
+    Every ``refresh_interval`` seconds the refresher reads only the id and
+    updated_at of published courses; the full rows are loaded and a new index
+    swapped in only when that fingerprint changed. Requests never query the
+    database once the first snapshot is loaded.
+    """
+
+    def __init__(self, refresh_interval: float = COURSE_CATALOG_REFRESH_SECONDS):
+        self.refresh_interval = refresh_interval
+        self.index = CatalogIndex([], version=catalog_version([]))
+        self.refreshes = 0
+        self._loaded = False
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._refresh_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _fetch_published(self, columns: str) -> List[Dict[str, Any]]:
+        return await fetch_all(
+            lambda: db.async_client.table('courses').select(columns).eq('is_published', True).order('id')
+        )
+
+    async def refresh(self, force: bool = False) -> bool:
+        """Rebuild the index if the published catalog changed; returns True if swapped"""
+        try:
+            if not force and self._loaded:
+                fingerprint = catalog_version(await self._fetch_published('id,updated_at'))
+                if fingerprint == self.index.version:
+                    return False
+            rows = await self._fetch_published(COURSE_COLUMNS)
+            index = CatalogIndex([_course_from_row(row) for row in rows], version=catalog_version(rows))
+        except Exception as e:
+            # Keep serving the previous snapshot until the next successful refresh
+            print(f"Error refreshing course catalog: {e}")
+            return False
+        self.index = index
+        self._loaded = True
+        self.refreshes += 1
+        return True
+
+    async def get_index(self) -> CatalogIndex:
+        """Current snapshot; loads it on first use if startup could not"""
+        if not self._loaded:
+            if self._load_lock is None:
+                self._load_lock = asyncio.Lock()
+            async with self._load_lock:
+                if not self._loaded:
+                    await self.refresh(force=True)
+        return self.index
+
+    def request_refresh(self) -> None:
+        """Check for changes now instead of at the next interval (e.g. after a course write)"""
+        if self._refresh_requested is not None:
+            self._refresh_requested.set()
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._refresh_requested.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+            await self.refresh()
+
+    async def start(self) -> None:
+        """Load the catalog once and start the background refresh task"""
+        if self._task is not None:
+            return
+        try:
+            db.async_client
+        except ValueError as e:
+            print(f"Skipping course catalog refresh: {e}")
+            return
+        self._refresh_requested = asyncio.Event()
+        await self.refresh(force=True)
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Shared by every request in this worker process
+course_catalog = CourseCatalog()
@@ -0,0 +1,264 @@
+import asyncio
+import os
+import re
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from app.services.portfolio_service import invalidate_portfolio
+from app.utils.database import db, execute
+from app.utils.github import GitHubClient, GitHubError, RateLimitedError
+
+# Seconds between looking for users whose import is due (0 disables the scheduler)
+GITHUB_SYNC_POLL_SECONDS = float(os.getenv("GITHUB_SYNC_POLL_SECONDS", 60))
+# A user's repositories are re-imported this long after the last sync
+GITHUB_SYNC_INTERVAL_SECONDS = int(os.getenv("GITHUB_SYNC_INTERVAL_SECONDS", 6 * 3600))
+# Users claimed per poll, and users synced concurrently by this worker
+GITHUB_SYNC_BATCH = int(os.getenv("GITHUB_SYNC_BATCH", 50))
+GITHUB_SYNC_WORKERS = int(os.getenv("GITHUB_SYNC_WORKERS", 4))
+# Repositories imported per user, most recently pushed first
+GITHUB_MAX_REPOS = int(os.getenv("GITHUB_MAX_REPOS", 100))
+# A claimed user is left alone by other workers for this long
+GITHUB_SYNC_LEASE_SECONDS = 900
+
+_LOGIN = re.compile(r"^[A-Za-z0-9](?:[A-Za-z0-9-]{0,38})$")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def github_login(github_url: Optional[str]) -> Optional[str]:
+    """The login in a profile's github_url ("https://github.com/octocat", "github.com/octocat/" or "octocat")"""
+    if not github_url:
+        return None
+    value = github_url.strip().rstrip("/")
+    value = re.sub(r"^(?:https?://)?(?:www\.)?github\.com/", "", value, flags=re.IGNORECASE)
+    login = value.split("/")[0].lstrip("@")
+    return login if _LOGIN.match(login) else None
+
+
+def project_from_repo(user_id: str, repo: Dict[str, Any]) -> Dict[str, Any]:
+    """A portfolio_projects row for a GitHub repository.
+
+    Only the columns GitHub owns are set, so featured, images, the project
+    type and the hackathon link the user edited survive a re-import; new
+    rows get the column defaults (project_type 'personal').
+    """
+    technologies = [repo["language"]] if repo.get("language") else []
+    technologies += [topic for topic in repo.get("topics") or [] if topic not in technologies]
+    return {
+        "user_id": user_id,
+        "github_repo_id": repo["id"],
+        "title": repo["name"],
+        "description": repo.get("description"),
+        "github_url": repo.get("html_url"),
+        "live_url": repo.get("homepage") or None,
+        "technologies": technologies,
+    }
+
+
+class SyncStore:
+    """Where the pipeline claims due users and writes imported projects (Supabase)"""
+
+    async def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """Lease up to ``limit`` due users: [{"user_id", "github_url"}]"""
+        claimed = await db.async_admin_client.call(
+            "claim_github_syncs",
+            {
+                "batch_limit": limit,
+                "sync_interval_seconds": GITHUB_SYNC_INTERVAL_SECONDS,
+                "lease_seconds": GITHUB_SYNC_LEASE_SECONDS,
+            },
+        )
+        return claimed or []
+
+    async def github_url(self, user_id: str) -> Optional[str]:
+        response = await execute(
+            db.async_admin_client.table('profiles').select('github_url').eq('id', user_id).limit(1)
+        )
+        return response.data[0].get("github_url") if response.data else None
+
+    async def save_projects(self, user_id: str, rows: List[Dict[str, Any]]) -> None:
+        """Upsert imported projects; raises if the write fails"""
+        if rows:
+            await execute(
+                db.async_admin_client.table('portfolio_projects')
+                .upsert(rows, on_conflict='user_id,github_repo_id')
+            )
+
+    async def record(self, user_id: str, state: Dict[str, Any]) -> None:
+        """Update the user's github_sync_state row and end its lease"""
+        row = {"user_id": user_id, "leased_until": None, **state}
+        await execute(db.async_admin_client.table('github_sync_state').upsert(row, on_conflict='user_id'))
+
+    async def get_state(self, user_id: str) -> Optional[Dict[str, Any]]:
+        response = await execute(
+            db.async_admin_client.table('github_sync_state').select('*').eq('user_id', user_id).limit(1)
+        )
+        return response.data[0] if response.data else None
+
+
+class GitHubSync:
+    """Background pipeline that imports users' public GitHub repositories as portfolio projects.
+
+    A scheduler claims users whose import is due (the database leases them,
+    so workers never sync the same user twice) and a few workers sync them
+    from a queue. Requests go through GitHubClient, which keeps an on-disk
+    ETag cache, so an unchanged repository list costs one 304 per page.
+    Whether the user's projects need writing is decided by the user's own
+    sync state: the ETags of the list are stored with it only after the
+    projects were saved, and the rows are written whenever they differ
+    (another account or login, a failed write, a new push). Syncs the user
+    asks for are always written. When GitHub's rate limit runs out the
+    client waits for the reset; if that is too far away the user is
+    released and the scheduler stops claiming until then.
+    """
+
+    def __init__(
+        self,
+        client: Optional[GitHubClient] = None,
+        store: Optional[SyncStore] = None,
+        workers: int = GITHUB_SYNC_WORKERS,
+        poll_interval: float = GITHUB_SYNC_POLL_SECONDS,
+        batch: int = GITHUB_SYNC_BATCH,
+        max_repos: int = GITHUB_MAX_REPOS
+    ):
+        self.client = client or GitHubClient()
+        self.store = store or SyncStore()
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.batch = batch
+        self.max_repos = max_repos
+        self._queue: Optional[asyncio.Queue] = None
+        self._pending: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._resume_at = 0.0
+        self.users_synced = 0
+        self.users_unchanged = 0
+        self.users_failed = 0
+        self.repos_imported = 0
+
+    async def sync_user(self, user_id: str, github_url: Optional[str], force: bool = False) -> int:
+        """Import one user's repositories now; the number written (0 when unchanged).
+
+        With ``force`` the projects are written even if the list did not
+        change since the last sync (e.g. the user deleted an imported one).
+        """
+        login = github_login(github_url)
+        if login is None:
+            await self.store.record(user_id, {"github_login": None, "last_error": "No valid GitHub URL on the profile"})
+            self.users_failed += 1
+            return 0
+        previous = None if force else await self.store.get_state(user_id)
+        try:
+            repos, version = await self.client.list_repos(login, self.max_repos)
+        except RateLimitedError as e:
+            self._resume_at = max(self._resume_at, e.resume_at)
+            # Released without synced_at, so the user is claimed again after the reset
+            await self.store.record(user_id, {"github_login": login, "last_error": str(e)})
+            self.users_failed += 1
+            raise
+        except GitHubError as e:
+            # 404: the account was renamed or deleted; wait for the next interval either way
+            await self.store.record(user_id, {
+                "github_login": login, "last_error": str(e), "synced_at": _now()
+            })
+            self.users_failed += 1
+            return 0
+
+        rows = [project_from_repo(user_id, repo) for repo in repos if not repo.get("fork")]
+        state: Dict[str, Any] = {"github_login": login, "last_error": None, "synced_at": _now()}
+        unchanged = (
+            version is not None and previous is not None
+            and previous.get("github_login") == login and previous.get("repos_etag") == version
+        )
+        if not unchanged:
+            # Raises on failure, leaving the stored version alone so the next sync writes again
+            await self.store.save_projects(user_id, rows)
+            await invalidate_portfolio(user_id)
+            state["repos_imported"] = len(rows)
+            state["repos_etag"] = version
+            self.repos_imported += len(rows)
+            self.users_synced += 1
+        else:
+            self.users_unchanged += 1
+        await self.store.record(user_id, state)
+        return 0 if unchanged else len(rows)
+
+    def enqueue(self, user_id: str, github_url: Optional[str], force: bool = False) -> bool:
+        """Queue a sync for this worker; False if the user is already queued or the pipeline is stopped"""
+        if self._queue is None or user_id in self._pending:
+            return False
+        self._pending.add(user_id)
+        self._queue.put_nowait((user_id, github_url, force))
+        return True
+
+    def is_pending(self, user_id: str) -> bool:
+        """Whether a sync for the user is queued or running in this worker"""
+        return user_id in self._pending
+
+    async def _worker(self) -> None:
+        while True:
+            user_id, github_url, force = await self._queue.get()
+            try:
+                await self.sync_user(user_id, github_url, force)
+            except RateLimitedError as e:
+                print(f"GitHub sync paused: {e}")
+            except Exception as e:
+                print(f"Error syncing GitHub repositories: {e}")
+            finally:
+                self._pending.discard(user_id)
+                self._queue.task_done()
+
+    async def _schedule(self) -> None:
+        while True:
+            await asyncio.sleep(max(self.poll_interval, self._resume_at - time.time()))
+            # Claim only what the workers can start on soon, so leases do not expire in the queue
+            if self._queue.qsize() >= self.batch:
+                continue
+            try:
+                for user in await self.store.claim(self.batch):
+                    self.enqueue(user["user_id"], user.get("github_url"))
+            except Exception as e:
+                print(f"Error claiming GitHub syncs: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "users_synced": self.users_synced,
+            "users_unchanged": self.users_unchanged,
+            "users_failed": self.users_failed,
+            "repos_imported": self.repos_imported,
+            "resume_at": self._resume_at,
+            "github": self.client.stats(),
+        }
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        try:
+            db.async_admin_client
+        except ValueError as e:
+            print(f"Skipping GitHub sync: {e}")
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        if self.poll_interval > 0:
+            self._tasks.append(asyncio.create_task(self._schedule()))
+
+    async def aclose(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+        await self.client.aclose()
+
+# Shared by every request in this worker process
+github_sync = GitHubSync()
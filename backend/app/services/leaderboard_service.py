@@ -0,0 +1,467 @@
+from typing import Optional, Dict, Any, List, Tuple
+from collections import defaultdict
+from datetime import datetime, timezone
+from sortedcontainers import SortedList
+import asyncio
+import json
+import os
+import tempfile
+from app.utils.database import db
+from app.schemas.analytics import LeaderboardEntry, LeaderboardPage, LeaderboardScope
+
+# How often each worker pulls newly earned points into its boards
+LEADERBOARD_REFRESH_SECONDS = float(os.getenv("LEADERBOARD_REFRESH_SECONDS", 5))
+LEADERBOARD_BATCH = int(os.getenv("LEADERBOARD_BATCH", 20000))
+# Boards are written here periodically and on shutdown so a restart only
+# replays points earned since the snapshot (empty path disables snapshots)
+LEADERBOARD_SNAPSHOT_PATH = os.getenv(
+    "LEADERBOARD_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "leaderboard_snapshot.json")
+)
+LEADERBOARD_SNAPSHOT_SECONDS = float(os.getenv("LEADERBOARD_SNAPSHOT_SECONDS", 300))
+# How often each worker rebuilds its boards from the achievements table and
+# replaces the snapshot, undoing any drift (0 disables)
+LEADERBOARD_REBUILD_SECONDS = float(os.getenv("LEADERBOARD_REBUILD_SECONDS", 3600))
+SNAPSHOT_FORMAT = 3
+
+# (rank, user_id, points)
+Ranked = Tuple[int, str, int]
+
+class Board:
+    """Users ordered by points in a sorted list keyed by (-points, user_id).
+
+    Updates, rank lookups and positioning a window are O(log n); reading a
+    window of k entries is O(log n + k). Ties share the rank of the first
+    user with that score (1, 2, 2, 4). Users without points are not on the
+    board.
+    """
+
+    def __init__(self, scores: Optional[Dict[str, int]] = None):
+        self.scores: Dict[str, int] = {user_id: points for user_id, points in (scores or {}).items() if points}
+        self._ranked = SortedList((-points, user_id) for user_id, points in self.scores.items())
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self.scores
+
+    def set(self, user_id: str, points: int) -> None:
+        if not points:
+            self.remove(user_id)
+            return
+        previous = self.scores.get(user_id)
+        if previous == points:
+            return
+        if previous is not None:
+            self._ranked.remove((-previous, user_id))
+        self.scores[user_id] = points
+        self._ranked.add((-points, user_id))
+
+    def add(self, user_id: str, delta: int) -> int:
+        """Add (or with a negative delta, take away) points; returns the new score"""
+        points = self.scores.get(user_id, 0) + delta
+        self.set(user_id, points)
+        return points
+
+    def remove(self, user_id: str) -> None:
+        previous = self.scores.pop(user_id, None)
+        if previous is not None:
+            self._ranked.remove((-previous, user_id))
+
+    def rank(self, user_id: str) -> Optional[int]:
+        points = self.scores.get(user_id)
+        if points is None:
+            return None
+        # (-points,) sorts before every entry with that score
+        return self._ranked.bisect_left((-points,)) + 1
+
+    def _window(self, start: int, stop: int) -> List[Ranked]:
+        entries: List[Ranked] = []
+        rank = previous = None
+        for position, (negative, user_id) in enumerate(self._ranked[start:stop], start):
+            if negative != previous:
+                # Only the first entry can be tied with users before the window
+                rank = position + 1 if previous is not None else self._ranked.bisect_left((negative,)) + 1
+                previous = negative
+            entries.append((rank, user_id, -negative))
+        return entries
+
+    def top(self, limit: int) -> List[Ranked]:
+        return self._window(0, limit)
+
+    def around(self, user_id: str, radius: int) -> List[Ranked]:
+        """Up to ``radius`` users either side of ``user_id`` (empty if not on the board)"""
+        points = self.scores.get(user_id)
+        if points is None:
+            return []
+        position = self._ranked.index((-points, user_id))
+        return self._window(max(position - radius, 0), position + radius + 1)
+
+def _institution_key(institution: Optional[str]) -> Optional[str]:
+    """Institutions are free text on profiles, so boards match them case-insensitively"""
+    key = (institution or "").strip().lower()
+    return key or None
+
+def _write_snapshot(path: str, snapshot: Dict[str, Any]) -> None:
+    # Written beside the target and renamed so readers never see a partial file
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(snapshot, f, separators=(",", ":"))
+    os.replace(temporary, path)
+
+def _read_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+class Leaderboard:
+    """Global, per-hackathon and per-institution points boards held in memory.
+
+    The boards are built once (from the last snapshot, or from scratch with
+    leaderboard_totals()) and then updated incrementally: every
+    ``refresh_interval`` seconds the worker reads only the point changes
+    logged since its cursor, summed per user and hackathon. Awards, edits and
+    deletions of achievements all reach the boards this way, and so do
+    profile renames and institution moves. Every ``rebuild_interval`` seconds
+    the boards are rebuilt from the achievements table and the snapshot is
+    replaced, so any drift is temporary. Requests never aggregate the
+    achievements table.
+
+    The global board ranks users by all their points and each hackathon board
+    by the points tied to that hackathon. Institution boards hold the global
+    scores of users whose profile lists that institution.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = LEADERBOARD_REFRESH_SECONDS,
+        batch_limit: int = LEADERBOARD_BATCH,
+        snapshot_path: str = LEADERBOARD_SNAPSHOT_PATH,
+        snapshot_interval: float = LEADERBOARD_SNAPSHOT_SECONDS,
+        rebuild_interval: float = LEADERBOARD_REBUILD_SECONDS
+    ):
+        self.refresh_interval = refresh_interval
+        self.batch_limit = batch_limit
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.rebuild_interval = rebuild_interval
+        self.refreshes = 0
+        self.rebuilds = 0
+        self.updated_at: Optional[datetime] = None
+        self._reset()
+        self._snapshot_cursor: Optional[Tuple[int, int]] = None
+        # Cursor of the previous rebuild: the log is pruned up to it
+        self._rebuild_cursor: Optional[Tuple[int, int]] = None
+        self._loaded = False
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def _reset(self) -> None:
+        # Position in the change log: (transaction id, seq) of the last row applied
+        self.last_xid = 0
+        self.last_seq = 0
+        # reset_leaderboards() call the boards were built after
+        self.reset_xid = 0
+        self.global_board = Board()
+        self.hackathons: Dict[str, Board] = {}
+        self.institutions: Dict[str, Board] = {}
+        # user_id -> (name, institution)
+        self.profiles: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+
+    def board(self, scope: LeaderboardScope, key: Optional[str] = None) -> Optional[Board]:
+        if scope == LeaderboardScope.GLOBAL:
+            return self.global_board
+        if scope == LeaderboardScope.HACKATHON:
+            return self.hackathons.get(key)
+        return self.institutions.get(_institution_key(key))
+
+    def institution_of(self, user_id: str) -> Optional[str]:
+        return self.profiles.get(user_id, (None, None))[1]
+
+    def _institution_board(self, user_id: str) -> Optional[Board]:
+        key = _institution_key(self.institution_of(user_id))
+        if key is None:
+            return None
+        board = self.institutions.get(key)
+        if board is None:
+            board = self.institutions[key] = Board()
+        return board
+
+    def _set_profile(self, user_id: str, name: Optional[str], institution: Optional[str]) -> None:
+        previous = _institution_key(self.institution_of(user_id))
+        self.profiles[user_id] = (name, institution)
+        if previous == _institution_key(institution) or user_id not in self.global_board:
+            return
+        # Moved institution: carry the global score over to the new board
+        if previous is not None:
+            self.institutions[previous].remove(user_id)
+            if not self.institutions[previous]:
+                del self.institutions[previous]
+        board = self._institution_board(user_id)
+        if board is not None:
+            board.set(user_id, self.global_board.scores[user_id])
+
+    def apply(self, changes: Dict[str, Any]) -> None:
+        """Apply one batch returned by leaderboard_changes(); point changes may be negative or zero"""
+        for profile in changes['profiles']:
+            self._set_profile(profile['id'], profile['name'], profile['institution'])
+        per_user: Dict[str, int] = defaultdict(int)
+        for total in changes['totals']:
+            per_user[total['user_id']] += total['points']
+            hackathon_id = total['hackathon_id']
+            if hackathon_id is not None and total['points']:
+                board = self.hackathons.get(hackathon_id)
+                if board is None:
+                    board = self.hackathons[hackathon_id] = Board()
+                board.add(total['user_id'], total['points'])
+                if not board:
+                    del self.hackathons[hackathon_id]
+        for user_id, delta in per_user.items():
+            points = self.global_board.add(user_id, delta)
+            key = _institution_key(self.institution_of(user_id))
+            board = self._institution_board(user_id)
+            if board is not None:
+                board.set(user_id, points)
+                if not board:
+                    del self.institutions[key]
+            if not points and not any(user_id in board for board in self.hackathons.values()):
+                # Off every board; a user who earns points again is re-read with them
+                self.profiles.pop(user_id, None)
+        self.last_xid = changes['last_xid']
+        self.last_seq = changes['last_seq']
+
+    async def refresh(self) -> int:
+        """Apply point changes logged since the last refresh; returns log rows consumed"""
+        consumed = 0
+        try:
+            while True:
+                changes = await db.async_admin_client.call('leaderboard_changes', {
+                    'after_xid': self.last_xid, 'after_seq': self.last_seq, 'batch_limit': self.batch_limit
+                })
+                if changes['reset_xid'] != self.reset_xid:
+                    # reset_leaderboards() was run since the boards were built: start over
+                    print("Leaderboards were reset; rebuilding leaderboards")
+                    if not await self.rebuild():
+                        return consumed
+                    continue
+                if (self.last_xid, self.last_seq) < (changes['floor_xid'], changes['floor_seq']):
+                    # Rows after our cursor were pruned (say, an old snapshot was restored)
+                    print("Leaderboard log was pruned past our cursor; rebuilding leaderboards")
+                    if not await self.rebuild():
+                        return consumed
+                    continue
+                if changes['consumed']:
+                    self.apply(changes)
+                    consumed += changes['consumed']
+                if changes['consumed'] < self.batch_limit:
+                    break
+        except Exception as e:
+            # Keep serving the boards as they are until the next successful refresh
+            print(f"Error refreshing leaderboards: {e}")
+            return consumed
+        self._loaded = True
+        self.refreshes += 1
+        self.updated_at = datetime.now(timezone.utc)
+        return consumed
+
+    async def rebuild(self) -> bool:
+        """Replace the boards with totals summed from the achievements table, then the snapshot"""
+        try:
+            totals = await db.async_admin_client.call('leaderboard_totals', {}, timeout=300)
+        except Exception as e:
+            print(f"Error rebuilding leaderboards: {e}")
+            return False
+        global_scores: Dict[str, int] = defaultdict(int)
+        hackathon_scores: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for total in totals['totals']:
+            global_scores[total['user_id']] += total['points']
+            if total['hackathon_id'] is not None:
+                hackathon_scores[total['hackathon_id']][total['user_id']] = total['points']
+        self._build(
+            {profile['id']: (profile['name'], profile['institution']) for profile in totals['profiles']},
+            global_scores,
+            hackathon_scores,
+        )
+        self.last_xid = totals['last_xid']
+        self.last_seq = totals['last_seq']
+        self.reset_xid = totals['reset_xid']
+        self._loaded = True
+        self.rebuilds += 1
+        self.updated_at = datetime.now(timezone.utc)
+        await self.save_snapshot()
+        await self.prune()
+        return True
+
+    async def prune(self) -> int:
+        """Delete logged changes up to the previous rebuild's cursor; returns rows deleted
+
+        Only this worker's previous rebuild is used, about one rebuild interval
+        behind the head, so other running workers and their snapshots (replaced
+        at least that often) never lose rows they still need. A worker restored
+        from an older snapshot finds its cursor below the floor and rebuilds.
+        """
+        previous, self._rebuild_cursor = self._rebuild_cursor, (self.last_xid, self.last_seq)
+        if previous is None:
+            return 0
+        try:
+            return await db.async_admin_client.call('prune_leaderboard_deltas', {
+                'before_xid': previous[0], 'before_seq': previous[1]
+            }, timeout=300)
+        except Exception as e:
+            print(f"Error pruning leaderboard log: {e}")
+            return 0
+
+    async def _load(self) -> None:
+        if not await self.load_snapshot():
+            await self.rebuild()
+        await self.refresh()
+
+    async def ensure_loaded(self) -> None:
+        """Build the boards on first use if startup could not"""
+        if not self._loaded:
+            if self._load_lock is None:
+                self._load_lock = asyncio.Lock()
+            async with self._load_lock:
+                if not self._loaded:
+                    await self._load()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copy of the boards as of the log cursor; institution boards are derived on load"""
+        return {
+            'format': SNAPSHOT_FORMAT,
+            'last_xid': self.last_xid,
+            'last_seq': self.last_seq,
+            'reset_xid': self.reset_xid,
+            'profiles': {user_id: list(profile) for user_id, profile in self.profiles.items()},
+            'global': dict(self.global_board.scores),
+            'hackathons': {hackathon_id: dict(board.scores) for hackathon_id, board in self.hackathons.items()},
+        }
+
+    def _build(
+        self,
+        profiles: Dict[str, Tuple[Optional[str], Optional[str]]],
+        global_scores: Dict[str, int],
+        hackathon_scores: Dict[str, Dict[str, int]]
+    ) -> None:
+        self._reset()
+        self.profiles = profiles
+        self.global_board = Board(global_scores)
+        self.hackathons = {hackathon_id: Board(scores) for hackathon_id, scores in hackathon_scores.items()}
+        members: Dict[str, Dict[str, int]] = defaultdict(dict)
+        for user_id, points in self.global_board.scores.items():
+            key = _institution_key(self.institution_of(user_id))
+            if key is not None:
+                members[key][user_id] = points
+        self.institutions = {key: Board(scores) for key, scores in members.items()}
+
+    def restore(self, snapshot: Dict[str, Any]) -> None:
+        self._build(
+            {user_id: tuple(profile) for user_id, profile in snapshot['profiles'].items()},
+            snapshot['global'],
+            snapshot['hackathons'],
+        )
+        self.last_xid = snapshot['last_xid']
+        self.last_seq = snapshot['last_seq']
+        self.reset_xid = snapshot['reset_xid']
+        self._snapshot_cursor = (self.last_xid, self.last_seq)
+
+    async def load_snapshot(self) -> bool:
+        """Restore the boards from the snapshot file; returns True if one was loaded"""
+        if not self.snapshot_path:
+            return False
+        loop = asyncio.get_running_loop()
+        try:
+            snapshot = await loop.run_in_executor(None, _read_snapshot, self.snapshot_path)
+            if snapshot is None or snapshot.get('format') != SNAPSHOT_FORMAT:
+                return False
+            self.restore(snapshot)
+        except Exception as e:
+            print(f"Error loading leaderboard snapshot: {e}")
+            self._reset()
+            return False
+        return True
+
+    async def save_snapshot(self) -> bool:
+        """Write the boards to the snapshot file if they changed since the last one"""
+        if not self.snapshot_path or not self._loaded or (self.last_xid, self.last_seq) == self._snapshot_cursor:
+            return False
+        # Copied on the event loop so the boards cannot change while the file is written
+        snapshot = self.snapshot()
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, _write_snapshot, self.snapshot_path, snapshot)
+        except OSError as e:
+            print(f"Error saving leaderboard snapshot: {e}")
+            return False
+        self._snapshot_cursor = (snapshot['last_xid'], snapshot['last_seq'])
+        return True
+
+    def _entry(self, ranked: Ranked) -> LeaderboardEntry:
+        rank, user_id, points = ranked
+        return LeaderboardEntry(rank=rank, user_id=user_id, name=self.profiles.get(user_id, (None,))[0], points=points)
+
+    def _page(
+        self, scope: LeaderboardScope, key: Optional[str], board: Optional[Board], entries: List[Ranked], user_id: str
+    ) -> LeaderboardPage:
+        me = None
+        if board is not None and user_id in board:
+            me = self._entry((board.rank(user_id), user_id, board.scores[user_id]))
+        return LeaderboardPage(
+            scope=scope,
+            key=key,
+            total_users=len(board) if board is not None else 0,
+            entries=[self._entry(ranked) for ranked in entries],
+            me=me,
+            updated_at=self.updated_at
+        )
+
+    def top(self, scope: LeaderboardScope, key: Optional[str], user_id: str, limit: int = 10) -> LeaderboardPage:
+        """The first ``limit`` users of a board plus the caller's own rank"""
+        board = self.board(scope, key)
+        return self._page(scope, key, board, board.top(limit) if board is not None else [], user_id)
+
+    def around(self, scope: LeaderboardScope, key: Optional[str], user_id: str, radius: int = 5) -> LeaderboardPage:
+        """The users ranked just above and below the caller"""
+        board = self.board(scope, key)
+        return self._page(scope, key, board, board.around(user_id, radius) if board is not None else [], user_id)
+
+    async def _refresh_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        last_snapshot = last_rebuild = loop.time()
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            if self.rebuild_interval > 0 and loop.time() - last_rebuild >= self.rebuild_interval:
+                # Saves its own snapshot
+                await self.rebuild()
+                last_rebuild = last_snapshot = loop.time()
+            await self.refresh()
+            if self.snapshot_interval > 0 and loop.time() - last_snapshot >= self.snapshot_interval:
+                await self.save_snapshot()
+                last_snapshot = loop.time()
+
+    async def start(self) -> None:
+        """Restore the last snapshot, catch up, and start the background refresh task"""
+        if self._task is not None:
+            return
+        try:
+            db.async_admin_client
+        except ValueError as e:
+            print(f"Skipping leaderboards: {e}")
+            return
+        await self._load()
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await self.save_snapshot()
+
+# Shared by every request in this worker process
+leaderboard = Leaderboard()
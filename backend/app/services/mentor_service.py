@@ -0,0 +1,422 @@
+from typing import Optional, Dict, Any, Iterable, List, Set, Tuple, AsyncIterator, NamedTuple, Sequence
+from collections import Counter, OrderedDict, deque
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+import zlib
+import numpy as np
+from app.utils.cache import TTLCache
+from app.utils.llm import ModelProvider, Messages, create_provider, MENTOR_TIMEOUT_SECONDS
+from app.utils.metrics import Counter as CounterMetric, Histogram, Metric, registry
+
+# Batches being generated at once; further requests wait in the queue
+MENTOR_MAX_CONCURRENCY = int(os.getenv("MENTOR_MAX_CONCURRENCY", 4))
+MENTOR_BATCH_SIZE = int(os.getenv("MENTOR_BATCH_SIZE", 8))
+# How long the first queued request waits for others to share its batch
+MENTOR_BATCH_WINDOW_MS = float(os.getenv("MENTOR_BATCH_WINDOW_MS", 10))
+# Distinct answers queued or being generated before new questions get 429
+MENTOR_MAX_PENDING = int(os.getenv("MENTOR_MAX_PENDING", 256))
+MENTOR_CACHE_SECONDS = float(os.getenv("MENTOR_CACHE_SECONDS", 3600))
+MENTOR_CACHE_SIZE = int(os.getenv("MENTOR_CACHE_SIZE", 5000))
+MENTOR_SEMANTIC_CACHE_SIZE = int(os.getenv("MENTOR_SEMANTIC_CACHE_SIZE", 2000))
+# Cosine similarity at which two questions count as the same
+MENTOR_SEMANTIC_THRESHOLD = float(os.getenv("MENTOR_SEMANTIC_THRESHOLD", 0.9))
+EMBEDDING_DIMENSIONS = 1024
+# Recent time-to-first-token samples kept per source for percentiles
+TTFT_SAMPLES = 1000
+# Where the first token came from: a cached answer, an answer already being
+# generated for someone else, or a new generation
+TTFT_SOURCES = ("cache", "coalesced", "model")
+
+MENTOR_SYSTEM_PROMPT = (
+    "You are MedhasMind's mentor for students preparing for hackathons. Give practical, "
+    "encouraging, concise guidance. Explain concepts step by step and suggest a next action."
+)
+
+_STOPWORDS = frozenset(
+    "a an the is are am was be to of in on for and or with how do does i my me you your can could "
+    "would should what which please it this that".split()
+)
+
+class MentorBusyError(Exception):
+    """Raised when too many answers are already queued or being generated"""
+
+def prompt_key(messages: Messages) -> str:
+    """Exact-cache key: the conversation with whitespace normalised"""
+    normalised = [{"role": m["role"], "content": " ".join(m["content"].split())} for m in messages]
+    return hashlib.sha256(json.dumps(normalised, separators=(",", ":")).encode()).hexdigest()
+
+def embed(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> np.ndarray:
+    """L2-normalised hashed bag of words and word pairs"""
+    words = [word for word in re.findall(r"\w+", text.lower()) if word not in _STOPWORDS]
+    features = Counter(words + [f"{first} {second}" for first, second in zip(words, words[1:])])
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature, count in features.items():
+        vector[zlib.crc32(feature.encode()) % dimensions] += count
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class SemanticCache:
+    """Answers to questions worded almost the same way, with LRU eviction and a TTL.
+
+    Questions are embedded with ``embed`` into rows of one preallocated
+    matrix, so a lookup is a single matrix-vector product. This catches
+    changes of case, punctuation, word order and filler words, not true
+    paraphrases.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = MENTOR_SEMANTIC_CACHE_SIZE,
+        ttl: float = MENTOR_CACHE_SECONDS,
+        threshold: float = MENTOR_SEMANTIC_THRESHOLD,
+        dimensions: int = EMBEDDING_DIMENSIONS
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.dimensions = dimensions
+        self._vectors = np.zeros((maxsize, dimensions), dtype=np.float32)
+        # slot -> (expires_at, answer), least recently used first
+        self._entries: "OrderedDict[int, Tuple[float, str]]" = OrderedDict()
+        self._free = list(range(maxsize - 1, -1, -1))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _nearest(self, vector: np.ndarray) -> Optional[int]:
+        if not self._entries or not vector.any():
+            return None
+        # Free slots are zero rows and never reach the threshold
+        scores = self._vectors @ vector
+        slot = int(np.argmax(scores))
+        return slot if scores[slot] >= self.threshold and slot in self._entries else None
+
+    def _release(self, slot: int) -> None:
+        del self._entries[slot]
+        self._vectors[slot] = 0
+        self._free.append(slot)
+
+    def get(self, question: str) -> Optional[str]:
+        slot = self._nearest(embed(question, self.dimensions))
+        if slot is not None:
+            expires_at, answer = self._entries[slot]
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(slot)
+                self.hits += 1
+                return answer
+            self._release(slot)
+        self.misses += 1
+        return None
+
+    def set(self, question: str, answer: str) -> None:
+        if self.maxsize <= 0:
+            return
+        vector = embed(question, self.dimensions)
+        if not vector.any():
+            return
+        # A near-identical question replaces the stored one instead of taking a second slot
+        slot = self._nearest(vector)
+        if slot is None:
+            if not self._free:
+                self._release(next(iter(self._entries)))
+                self.evictions += 1
+            slot = self._free.pop()
+        self._vectors[slot] = vector
+        self._entries[slot] = (time.monotonic() + self.ttl, answer)
+        self._entries.move_to_end(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+class _Generation:
+    """One answer being generated, readable by any number of followers.
+
+    Followers that join late replay the chunks generated so far first.
+    """
+
+    def __init__(self, messages: Messages):
+        self.messages = messages
+        self.chunks: List[str] = []
+        self.finished = False
+        self.error: Optional[Exception] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def push(self, chunk: str) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[Exception] = None) -> None:
+        if not self.finished:
+            self.finished = True
+            self.error = error
+            self._notify()
+
+    async def follow(self) -> AsyncIterator[str]:
+        position = 0
+        while True:
+            changed = self._changed
+            while position < len(self.chunks):
+                yield self.chunks[position]
+                position += 1
+            if self.finished:
+                if self.error is not None:
+                    raise self.error
+                return
+            await changed.wait()
+
+class MentorAnswer(NamedTuple):
+    # "model" (including answers shared with an identical question), or "cache"
+    # for an answer served from the exact or semantic cache
+    source: str
+    chunks: AsyncIterator[str]
+
+def _percentiles(samples) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"samples": 0, "p50": None, "p95": None}
+    return {
+        "samples": len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)],
+    }
+
+class MentorService:
+    """Answers mentor questions through a model provider, streaming the result.
+
+    Before anything reaches the model a question is looked up in an exact
+    cache (the whole conversation) and, for first questions, a semantic
+    cache; identical questions already being answered share that answer.
+    New questions are queued and a batcher hands them to the provider in
+    batches of up to ``batch_size`` collected over ``batch_window`` seconds,
+    with at most ``max_concurrency`` batches generating at once.
+    """
+
+    def __init__(
+        self,
+        provider: Optional[ModelProvider] = None,
+        max_concurrency: int = MENTOR_MAX_CONCURRENCY,
+        batch_size: int = MENTOR_BATCH_SIZE,
+        batch_window: float = MENTOR_BATCH_WINDOW_MS / 1000,
+        max_pending: int = MENTOR_MAX_PENDING,
+        cache_size: int = MENTOR_CACHE_SIZE,
+        semantic_cache_size: int = MENTOR_SEMANTIC_CACHE_SIZE,
+        timeout: float = MENTOR_TIMEOUT_SECONDS
+    ):
+        self._provider = provider
+        self.max_concurrency = max_concurrency
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.exact_cache = TTLCache(maxsize=cache_size, ttl=MENTOR_CACHE_SECONDS)
+        self.semantic_cache = SemanticCache(maxsize=semantic_cache_size)
+        self._inflight: Dict[str, _Generation] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batches: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.cache_hits = {"exact": 0, "semantic": 0}
+        self.coalesced = 0
+        self.rejected = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self._ttft = {source: deque(maxlen=TTFT_SAMPLES) for source in TTFT_SOURCES}
+        self.ttft = Histogram(
+            "mentor_time_to_first_token_seconds",
+            "Time from a mentor question to its first streamed chunk, by source",
+            ("source",),
+        )
+
+    @property
+    def provider(self) -> ModelProvider:
+        if self._provider is None:
+            self._provider = create_provider()
+        return self._provider
+
+    @staticmethod
+    def conversation(question: str, history: Sequence[Dict[str, str]] = ()) -> Messages:
+        return [{"role": "system", "content": MENTOR_SYSTEM_PROMPT}, *history, {"role": "user", "content": question}]
+
+    def ask(self, question: str, history: Sequence[Dict[str, str]] = ()) -> MentorAnswer:
+        """Start answering a question; raises MentorBusyError when the queue is full.
+
+        Cached answers are shared between users, so conversations must not
+        carry anything private.
+        """
+        started = time.perf_counter()
+        self.requests += 1
+        messages = self.conversation(question, history)
+        key = prompt_key(messages)
+
+        answer = self.exact_cache.get(key)
+        if answer is not None:
+            self.cache_hits["exact"] += 1
+        elif not history:
+            # Follow-up questions depend on the conversation, so only first questions match loosely
+            answer = self.semantic_cache.get(question)
+            if answer is not None:
+                self.cache_hits["semantic"] += 1
+        if answer is not None:
+            return MentorAnswer("cache", self._timed("cache", self._replay(answer), started))
+
+        generation = self._inflight.get(key)
+        if generation is not None:
+            self.coalesced += 1
+            return MentorAnswer("model", self._timed("coalesced", generation.follow(), started))
+        if len(self._inflight) >= self.max_pending:
+            self.rejected += 1
+            raise MentorBusyError("The mentor is busy, please try again shortly")
+        self._ensure_started()
+        generation = _Generation(messages)
+        self._inflight[key] = generation
+        self._queue.put_nowait((key, question if not history else None, generation))
+        return MentorAnswer("model", self._timed("model", generation.follow(), started))
+
+    @staticmethod
+    async def _replay(answer: str) -> AsyncIterator[str]:
+        yield answer
+
+    async def _timed(self, source: str, chunks: AsyncIterator[str], started: float) -> AsyncIterator[str]:
+        first = True
+        async for chunk in chunks:
+            if first:
+                elapsed = time.perf_counter() - started
+                self._ttft[source].append(elapsed)
+                self.ttft.labels(source).observe(elapsed)
+                first = False
+            yield chunk
+
+    def _ensure_started(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._task = asyncio.create_task(self._batch_loop())
+
+    async def _batch_loop(self) -> None:
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            # Give concurrent questions a moment to join, unless a full batch is already waiting
+            if self.batch_window > 0 and self._queue.qsize() < self.batch_size - 1:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            task = asyncio.create_task(self._generate(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _generate(self, batch: List[Tuple[str, Optional[str], _Generation]]) -> None:
+        self.batches += 1
+        self.batched_requests += len(batch)
+        try:
+            streams = self.provider.stream_batch([generation.messages for _, _, generation in batch])
+            await asyncio.gather(*(self._pump(item, stream) for item, stream in zip(batch, streams)))
+        except Exception as e:
+            print(f"Error generating mentor answers: {e}")
+            for key, _, generation in batch:
+                self._finish(key, generation, e)
+        finally:
+            self._slots.release()
+
+    async def _pump(self, item: Tuple[str, Optional[str], _Generation], stream: AsyncIterator[str]) -> None:
+        key, question, generation = item
+        iterator = stream.__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=self.timeout)
+                except StopAsyncIteration:
+                    break
+                generation.push(chunk)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error generating mentor answer: {e!r}")
+            self._finish(key, generation, e)
+            return
+        finally:
+            close = getattr(iterator, "aclose", None)
+            if close is not None:
+                await close()
+        answer = "".join(generation.chunks)
+        if answer:
+            self.exact_cache.set(key, answer)
+            if question is not None:
+                self.semantic_cache.set(question, answer)
+        self._finish(key, generation)
+
+    def _finish(self, key: str, generation: _Generation, error: Optional[Exception] = None) -> None:
+        generation.finish(error)
+        if self._inflight.get(key) is generation:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        hits = sum(self.cache_hits.values())
+        return {
+            "provider": self.provider.stats(),
+            "requests": self.requests,
+            "cache_hits": dict(self.cache_hits),
+            "cache_hit_rate": hits / self.requests if self.requests else 0.0,
+            "coalesced": self.coalesced,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "pending": len(self._inflight),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "average_batch_size": self.batched_requests / self.batches if self.batches else 0.0,
+            "ttft_seconds": {source: _percentiles(samples) for source, samples in self._ttft.items()},
+            "exact_cache": self.exact_cache.stats(),
+            "semantic_cache": self.semantic_cache.stats(),
+        }
+
+    def metrics(self) -> Iterable[Metric]:
+        """Collector for /metrics: time to first token and cache hits and misses"""
+        requests = CounterMetric("mentor_requests_total", "Mentor questions asked")
+        coalesced = CounterMetric("mentor_coalesced_total", "Questions that joined an answer already being generated")
+        hits = CounterMetric("mentor_cache_hits_total", "Mentor questions answered from a cache, by cache", ("cache",))
+        misses = CounterMetric("mentor_cache_misses_total", "Mentor cache lookups that found nothing, by cache", ("cache",))
+        requests.inc(self.requests)
+        coalesced.inc(self.coalesced)
+        for name, cache in (("exact", self.exact_cache), ("semantic", self.semantic_cache)):
+            hits.labels(name).inc(cache.hits)
+            misses.labels(name).inc(cache.misses)
+        return [self.ttft, requests, coalesced, hits, misses]
+
+    async def start(self) -> None:
+        """Start the batcher"""
+        self._ensure_started()
+
+    async def aclose(self) -> None:
+        tasks = [self._task, *self._batches] if self._task is not None else list(self._batches)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        for key, generation in list(self._inflight.items()):
+            self._finish(key, generation, RuntimeError("The mentor is shutting down"))
+        if self._provider is not None:
+            await self._provider.aclose()
+
+# Shared by every request in this worker process
+mentor = MentorService()
+registry.register_collector(mentor.metrics)
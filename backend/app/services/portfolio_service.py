@@ -0,0 +1,125 @@
+from typing import Optional, Dict, Any, List, NamedTuple
+import asyncio
+import os
+from app.utils.cache import create_cache
+from app.utils.database import db, execute
+from app.utils.etag import make_etag
+from app.schemas.portfolio import (
+    ProjectCreate, ProjectUpdate, ProjectResponse, PublicProfile, PublicPortfolio
+)
+
+PORTFOLIO_CACHE_TTL_SECONDS = float(os.getenv("PORTFOLIO_CACHE_TTL_SECONDS", 300))
+PORTFOLIO_CACHE_MAX_SIZE = int(os.getenv("PORTFOLIO_CACHE_MAX_SIZE", 10000))
+PUBLIC_PROFILE_COLUMNS = ",".join(PublicProfile.model_fields)
+
+class PortfolioPage(NamedTuple):
+    """A public portfolio serialized once, ready to be written to the response as is"""
+    body: bytes
+    etag: str
+
+def _encode_page(page: PortfolioPage) -> str:
+    return f"{page.etag}\n{page.body.decode()}"
+
+def _decode_page(raw: str) -> PortfolioPage:
+    etag, _, body = raw.partition("\n")
+    return PortfolioPage(body=body.encode(), etag=etag)
+
+# user_id -> PortfolioPage; backed by Redis when CACHE_BACKEND=redis. Edits
+# evict the page on every worker, the TTL bounds staleness of profile counters.
+portfolio_pages = create_cache(
+    "portfolio-pages",
+    maxsize=PORTFOLIO_CACHE_MAX_SIZE,
+    ttl=PORTFOLIO_CACHE_TTL_SECONDS,
+    encode=_encode_page,
+    decode=_decode_page,
+)
+
+def _project_from_row(row: Dict[str, Any]) -> ProjectResponse:
+    # Array columns are nullable in the table
+    for column in ("technologies", "images"):
+        row[column] = row.get(column) or []
+    return ProjectResponse(**row)
+
+async def invalidate_portfolio(user_id: str) -> None:
+    """Evict a user's public portfolio page after their profile or projects changed"""
+    await portfolio_pages.delete(user_id)
+
+class PortfolioService:
+    async def _fetch_projects(self, user_id: str) -> List[ProjectResponse]:
+        response = await execute(
+            db.async_admin_client.table('portfolio_projects').select('*').eq('user_id', user_id)
+            .order('featured', desc=True).order('created_at', desc=True).order('id')
+        )
+        return [_project_from_row(row) for row in response.data]
+
+    async def list_projects(self, user_id: str) -> List[ProjectResponse]:
+        """A user's projects, featured first, then newest first"""
+        try:
+            return await self._fetch_projects(user_id)
+        except Exception as e:
+            print(f"Error listing portfolio projects: {e}")
+            return []
+
+    async def create_project(self, user_id: str, project: ProjectCreate) -> Optional[ProjectResponse]:
+        try:
+            row = {**project.model_dump(mode="json"), 'user_id': user_id}
+            response = await execute(db.async_admin_client.table('portfolio_projects').insert(row))
+            return _project_from_row(response.data[0]) if response.data else None
+        except Exception as e:
+            print(f"Error creating portfolio project: {e}")
+            return None
+        finally:
+            await invalidate_portfolio(user_id)
+
+    async def update_project(self, user_id: str, project_id: str, update: ProjectUpdate) -> Optional[ProjectResponse]:
+        """Update one of the user's projects; None if it is not theirs"""
+        try:
+            # updated_at is set by the update_portfolio_projects_updated_at trigger
+            response = await execute(
+                db.async_admin_client.table('portfolio_projects')
+                .update(update.model_dump(exclude_unset=True, mode="json"))
+                .eq('id', project_id).eq('user_id', user_id)
+            )
+            return _project_from_row(response.data[0]) if response.data else None
+        except Exception as e:
+            print(f"Error updating portfolio project: {e}")
+            return None
+        finally:
+            await invalidate_portfolio(user_id)
+
+    async def delete_project(self, user_id: str, project_id: str) -> bool:
+        try:
+            response = await execute(
+                db.async_admin_client.table('portfolio_projects').delete()
+                .eq('id', project_id).eq('user_id', user_id)
+            )
+            return bool(response.data)
+        except Exception as e:
+            print(f"Error deleting portfolio project: {e}")
+            return False
+        finally:
+            await invalidate_portfolio(user_id)
+
+    async def _render_page(self, user_id: str) -> Optional[PortfolioPage]:
+        profile, projects = await asyncio.gather(
+            execute(
+                db.async_admin_client.table('profiles').select(PUBLIC_PROFILE_COLUMNS)
+                .eq('id', user_id).eq('is_active', True).limit(1)
+            ),
+            self._fetch_projects(user_id)
+        )
+        if not profile.data:
+            return None
+        # Counter columns are nullable; missing values fall back to the schema defaults
+        public = PublicProfile(**{column: value for column, value in profile.data[0].items() if value is not None})
+        body = PublicPortfolio(profile=public, projects=projects).model_dump_json()
+        # The ETag is a digest of the exact bytes served, so it is strong and the same on every worker
+        return PortfolioPage(body=body.encode(), etag=make_etag(body))
+
+    async def get_public_page(self, user_id: str) -> Optional[PortfolioPage]:
+        """A user's serialized public portfolio; None if there is no such active user"""
+        try:
+            return await portfolio_pages.get_or_load(user_id, lambda: self._render_page(user_id))
+        except Exception as e:
+            print(f"Error rendering portfolio: {e}")
+            return None
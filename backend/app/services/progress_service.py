@@ -0,0 +1,97 @@
+from typing import Dict, Any, List, Tuple
+from datetime import timezone
+import os
+from app.utils.cache import TTLCache, register_local_cache
+from app.utils.database import db
+from app.utils.write_behind import WriteBehindBuffer, BufferFullError
+from app.schemas.course import ProgressEvent, ProgressIngestResult
+from app.services.recommendation_service import course_recommender
+
+PROGRESS_BATCH_SIZE = int(os.getenv("PROGRESS_BATCH_SIZE", 500))
+PROGRESS_FLUSH_SECONDS = float(os.getenv("PROGRESS_FLUSH_SECONDS", 2.0))
+# Enrollments waiting to be written before ingestion answers 429
+PROGRESS_MAX_PENDING = int(os.getenv("PROGRESS_MAX_PENDING", 50000))
+PROGRESS_DEDUPE_TTL_SECONDS = float(os.getenv("PROGRESS_DEDUPE_TTL_SECONDS", 600))
+PROGRESS_DEDUPE_MAX_SIZE = int(os.getenv("PROGRESS_DEDUPE_MAX_SIZE", 200000))
+
+# Recently accepted events per worker, so client retries are not counted twice
+_seen_events = register_local_cache(
+    "progress-dedupe", TTLCache(maxsize=PROGRESS_DEDUPE_MAX_SIZE, ttl=PROGRESS_DEDUPE_TTL_SECONDS)
+)
+
+def merge_progress(pending: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine two coalesced updates for one enrollment"""
+    latest = update if update['occurred_at'] >= pending['occurred_at'] else pending
+    return {
+        'user_id': pending['user_id'],
+        'course_id': pending['course_id'],
+        'seconds': pending['seconds'] + update['seconds'],
+        'progress': max(pending['progress'], update['progress']),
+        'lesson': latest['lesson'] or pending['lesson'] or update['lesson'],
+        'occurred_at': latest['occurred_at'],
+        'events': pending['events'] + update['events'],
+    }
+
+def _event_key(user_id: str, event: ProgressEvent) -> Tuple[str, ...]:
+    # Without a client id, a retried heartbeat still repeats its timestamp
+    return (user_id, event.event_id or f"{event.course_id}@{event.occurred_at.isoformat()}")
+
+class ProgressService:
+    def ingest(self, user_id: str, events: List[ProgressEvent]) -> ProgressIngestResult:
+        """Dedupe and coalesce heartbeats per enrollment and queue them for a bulk write.
+
+        Raises BufferFullError without accepting anything when the queue is
+        saturated, so the client can retry the whole batch later.
+        """
+        updates: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        accepted_keys = set()
+        duplicates = 0
+        for event in events:
+            key = _event_key(user_id, event)
+            if key in accepted_keys or _seen_events.get(key) is not None:
+                duplicates += 1
+                continue
+            accepted_keys.add(key)
+            course_id = str(event.course_id)
+            occurred_at = event.occurred_at
+            if occurred_at.tzinfo is None:
+                occurred_at = occurred_at.replace(tzinfo=timezone.utc)
+            update = {
+                'user_id': user_id,
+                'course_id': course_id,
+                'seconds': event.seconds_watched,
+                'progress': event.progress_percentage,
+                'lesson': event.current_lesson,
+                'occurred_at': occurred_at,
+                'events': 1,
+            }
+            pending = updates.get((user_id, course_id))
+            updates[(user_id, course_id)] = merge_progress(pending, update) if pending else update
+
+        new_keys = sum(1 for key in updates if not progress_writer.is_pending(key))
+        if not progress_writer.has_capacity(new_keys):
+            raise BufferFullError("Progress ingestion queue is full")
+        for key, update in updates.items():
+            progress_writer.add(update, key=key)
+        for key in accepted_keys:
+            _seen_events.set(key, True)
+        return ProgressIngestResult(
+            accepted=len(accepted_keys), duplicates=duplicates, enrollments=len(updates)
+        )
+
+async def _flush_progress(rows: List[Dict[str, Any]]) -> None:
+    """Upsert a batch of coalesced enrollment updates in one round-trip"""
+    payload = [{**row, 'occurred_at': row['occurred_at'].isoformat()} for row in rows]
+    await db.async_admin_client.call('ingest_progress', {'updates': payload})
+    # A completed course changes what this worker should recommend next
+    for user_id in {row['user_id'] for row in rows if row['progress'] >= 100}:
+        course_recommender.forget(user_id)
+
+progress_writer = WriteBehindBuffer(
+    "progress",
+    flush=_flush_progress,
+    max_batch=PROGRESS_BATCH_SIZE,
+    flush_interval=PROGRESS_FLUSH_SECONDS,
+    merge=merge_progress,
+    max_pending=PROGRESS_MAX_PENDING,
+)
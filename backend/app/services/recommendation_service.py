@@ -0,0 +1,512 @@
+from typing import Optional, Dict, Any, List, Set, Tuple
+from collections import Counter
+import asyncio
+import heapq
+import math
+import os
+import tempfile
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+from app.utils.cache import TTLCache, register_local_cache
+from app.utils.database import db, fetch_all
+from app.schemas.course import CourseRecommendation, LearningPath
+from app.services.course_service import course_catalog
+from app.services.team_matching_service import normalize_skill
+
+# Built by `python build_recommendations.py` (never by the workers) and
+# reloaded by every worker when the file changes
+RECOMMENDER_MODEL_PATH = os.getenv(
+    "RECOMMENDER_MODEL_PATH", os.path.join(tempfile.gettempdir(), "course_recommender.npz")
+)
+RECOMMENDER_RELOAD_SECONDS = float(os.getenv("RECOMMENDER_RELOAD_SECONDS", 60))
+RECOMMENDER_CACHE_SECONDS = float(os.getenv("RECOMMENDER_CACHE_SECONDS", 300))
+RECOMMENDER_CACHE_SIZE = int(os.getenv("RECOMMENDER_CACHE_SIZE", 10000))
+# Most similar courses kept per course
+RECOMMENDER_NEIGHBORS = int(os.getenv("RECOMMENDER_NEIGHBORS", 50))
+# Share of the similarity from co-enrollment; tags and category make up the rest
+COENROLLMENT_WEIGHT = 0.7
+# Co-enrollment counts are shrunk by count / (count + this) so a handful of
+# shared learners does not make two courses look identical
+COENROLLMENT_SHRINKAGE = 10.0
+# Courses with prerequisites still to complete rank lower, not out
+UNREADY_PENALTY = 0.5
+# A course in progress says less about a learner than a completed one
+IN_PROGRESS_WEIGHT = 0.5
+MAX_RECOMMENDATIONS = 50
+MODEL_FORMAT = 1
+
+DIFFICULTY_ORDER = {"beginner": 0, "intermediate": 1, "advanced": 2}
+
+def _top(scores: np.ndarray, eligible: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the ``limit`` best positive scores among eligible courses, best first"""
+    scores = np.where(eligible, scores, 0.0)
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+def _without_diagonal(matrix: csr_matrix) -> csr_matrix:
+    matrix = matrix.tocsr()
+    matrix.setdiag(0)
+    matrix.eliminate_zeros()
+    return matrix
+
+def _coenrollment_similarity(
+    rows: Dict[str, int], enrollments: List[Dict[str, Any]]
+) -> Tuple[csr_matrix, np.ndarray]:
+    """Shrunk cosine similarity of courses' learner sets, and learners per course"""
+    users: Dict[str, int] = {}
+    user_rows, course_columns = [], []
+    for enrollment in enrollments:
+        column = rows.get(enrollment['course_id'])
+        if column is None:
+            continue
+        user_rows.append(users.setdefault(enrollment['user_id'], len(users)))
+        course_columns.append(column)
+    learners = csr_matrix(
+        (np.ones(len(user_rows), dtype=np.float64), (user_rows, course_columns)), shape=(len(users), len(rows))
+    )
+    learners.data[:] = 1.0  # duplicates were summed
+    popularity = np.asarray(learners.sum(axis=0)).ravel()
+
+    shared = _without_diagonal(learners.T @ learners).tocoo()
+    norms = np.sqrt(popularity[shared.row] * popularity[shared.col])
+    data = shared.data / norms * (shared.data / (shared.data + COENROLLMENT_SHRINKAGE))
+    similarity = csr_matrix((data, (shared.row, shared.col)), shape=shared.shape)
+    return similarity, popularity
+
+def _tag_similarity(courses: List[Dict[str, Any]]) -> csr_matrix:
+    """Cosine similarity of IDF-weighted tag (and category) vectors"""
+    documents = []
+    for course in courses:
+        terms = {normalize_skill(tag) for tag in course.get('tags') or () if tag and tag.strip()}
+        if course.get('category'):
+            terms.add(f"category:{normalize_skill(course['category'])}")
+        documents.append(terms)
+    frequencies = Counter(term for terms in documents for term in terms)
+    vocabulary = {term: column for column, term in enumerate(frequencies)}
+    weights = {term: math.log((1 + len(documents)) / (1 + count)) + 1 for term, count in frequencies.items()}
+
+    indptr, indices, data = [0], [], []
+    for terms in documents:
+        norm = math.sqrt(sum(weights[term] ** 2 for term in terms)) or 1.0
+        indices.extend(vocabulary[term] for term in terms)
+        data.extend(weights[term] / norm for term in terms)
+        indptr.append(len(indices))
+    vectors = csr_matrix((data, indices, indptr), shape=(len(documents), len(vocabulary)), dtype=np.float64)
+    return _without_diagonal(vectors @ vectors.T)
+
+def _nearest(similarity: csr_matrix, neighbors: int) -> csr_matrix:
+    """Keep each course's ``neighbors`` most similar courses, most similar first"""
+    indptr, indices, data = [0], [], []
+    for row in range(similarity.shape[0]):
+        start, end = similarity.indptr[row], similarity.indptr[row + 1]
+        columns, values = similarity.indices[start:end], similarity.data[start:end]
+        if len(values) > neighbors:
+            keep = np.argpartition(-values, neighbors - 1)[:neighbors]
+            columns, values = columns[keep], values[keep]
+        order = np.argsort(-values, kind="stable")
+        indices.extend(columns[order])
+        data.extend(values[order])
+        indptr.append(len(indices))
+    return csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=similarity.shape
+    )
+
+def _prerequisite_matrix(courses: List[Dict[str, Any]], rows: Dict[str, int]) -> csr_matrix:
+    """Row i lists the courses that course i requires.
+
+    ``prerequisites`` is free text: entries naming another course by id or
+    title become edges, anything else ("basic Python") is ignored.
+    """
+    titles = {normalize_skill(course['title']): rows[course['id']] for course in courses if course.get('title')}
+    indptr, indices = [0], []
+    for row, course in enumerate(courses):
+        required = set()
+        for entry in course.get('prerequisites') or ():
+            if not entry:
+                continue
+            column = rows.get(entry.strip(), titles.get(normalize_skill(entry)))
+            if column is not None and column != row:
+                required.add(column)
+        indices.extend(sorted(required))
+        indptr.append(len(indices))
+    return csr_matrix(
+        (np.ones(len(indices), dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(len(courses), len(courses))
+    )
+
+def _topological_rank(courses: List[Dict[str, Any]], prerequisites: csr_matrix) -> np.ndarray:
+    """Position of each course in a prerequisites-first order (Kahn's algorithm).
+
+    Among courses that are ready at the same time, easier and then
+    alphabetically earlier courses come first. Courses caught in a
+    prerequisite cycle are placed after everything else.
+    """
+    def key(row: int):
+        course = courses[row]
+        return (DIFFICULTY_ORDER.get(course.get('difficulty'), 0), (course.get('title') or "").lower(), row)
+
+    dependents = prerequisites.T.tocsr()
+    pending = np.diff(prerequisites.indptr).astype(np.int64)
+    ready = [key(row) for row in np.flatnonzero(pending == 0)]
+    heapq.heapify(ready)
+    rank = np.full(len(courses), -1, dtype=np.int32)
+    position = 0
+    while ready:
+        row = heapq.heappop(ready)[-1]
+        rank[row] = position
+        position += 1
+        for dependent in dependents.indices[dependents.indptr[row]:dependents.indptr[row + 1]]:
+            pending[dependent] -= 1
+            if pending[dependent] == 0:
+                heapq.heappush(ready, key(dependent))
+
+    cyclic = sorted(np.flatnonzero(rank < 0), key=key)
+    if cyclic:
+        print(f"Warning: {len(cyclic)} course(s) are in a prerequisite cycle")
+    for row in cyclic:
+        rank[row] = position
+        position += 1
+    return rank
+
+class RecommenderModel:
+    """Course-course similarities and the prerequisite DAG as flat arrays.
+
+    ``similarity`` holds each course's nearest neighbours by co-enrollment and
+    tags, and ``prerequisites`` the required courses of each course, both in
+    CSR form. Recommending for a learner sums the neighbour rows of their
+    enrolled courses and ranks the result; a learning path walks the DAG and
+    orders the courses by ``topological_rank``. Everything is saved to and
+    loaded from a single ``.npz`` file.
+    """
+
+    def __init__(
+        self,
+        course_ids: List[str],
+        popularity: np.ndarray,
+        similarity: csr_matrix,
+        prerequisites: csr_matrix,
+        topological_rank: np.ndarray,
+        built_at: float
+    ):
+        self.course_ids = course_ids
+        self.rows = {course_id: row for row, course_id in enumerate(course_ids)}
+        self.popularity = popularity
+        self.similarity = similarity
+        self.prerequisites = prerequisites
+        self.topological_rank = topological_rank
+        self.built_at = built_at
+        self.version = f"{built_at:.6f}"
+        # Learners with no enrollments get popular courses, each with a small positive score
+        self._cold_start = ((1 + np.log1p(popularity)) / (1 + np.log1p(popularity.max(initial=0)))).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.course_ids)
+
+    @classmethod
+    def build(
+        cls,
+        courses: List[Dict[str, Any]],
+        enrollments: List[Dict[str, Any]],
+        neighbors: int = RECOMMENDER_NEIGHBORS
+    ) -> "RecommenderModel":
+        """Precompute the model from published courses and (user_id, course_id) enrollments"""
+        rows = {course['id']: row for row, course in enumerate(courses)}
+        coenrollment, popularity = _coenrollment_similarity(rows, enrollments)
+        similarity = COENROLLMENT_WEIGHT * coenrollment + (1 - COENROLLMENT_WEIGHT) * _tag_similarity(courses)
+        prerequisites = _prerequisite_matrix(courses, rows)
+        return cls(
+            course_ids=[course['id'] for course in courses],
+            popularity=popularity.astype(np.int32),
+            similarity=_nearest(similarity.tocsr(), neighbors),
+            prerequisites=prerequisites,
+            topological_rank=_topological_rank(courses, prerequisites),
+            built_at=time.time()
+        )
+
+    def save(self, path: str) -> None:
+        # Written beside the target and renamed so workers never load a partial file
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            np.savez(
+                f,
+                format=np.int32(MODEL_FORMAT),
+                built_at=np.float64(self.built_at),
+                course_ids=np.array(self.course_ids, dtype=str),
+                popularity=self.popularity,
+                similarity_indptr=self.similarity.indptr,
+                similarity_indices=self.similarity.indices,
+                similarity_data=self.similarity.data,
+                prerequisite_indptr=self.prerequisites.indptr,
+                prerequisite_indices=self.prerequisites.indices,
+                topological_rank=self.topological_rank,
+            )
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RecommenderModel":
+        with np.load(path, allow_pickle=False) as arrays:
+            if int(arrays['format']) != MODEL_FORMAT:
+                raise ValueError(f"unsupported recommender model format {int(arrays['format'])}")
+            size = len(arrays['course_ids'])
+            prerequisite_indices = arrays['prerequisite_indices']
+            return cls(
+                course_ids=arrays['course_ids'].tolist(),
+                popularity=arrays['popularity'],
+                similarity=csr_matrix(
+                    (arrays['similarity_data'], arrays['similarity_indices'], arrays['similarity_indptr']),
+                    shape=(size, size)
+                ),
+                prerequisites=csr_matrix(
+                    (np.ones(len(prerequisite_indices), dtype=np.float32), prerequisite_indices,
+                     arrays['prerequisite_indptr']),
+                    shape=(size, size)
+                ),
+                topological_rank=arrays['topological_rank'],
+                built_at=float(arrays['built_at'])
+            )
+
+    def required(self, row: int) -> np.ndarray:
+        return self.prerequisites.indices[self.prerequisites.indptr[row]:self.prerequisites.indptr[row + 1]]
+
+    def recommend(
+        self, enrolled: Dict[str, float], completed: Set[str], limit: int = 10
+    ) -> List[Tuple[str, float, bool, Optional[str]]]:
+        """(course_id, score, ready, because_of) for the best courses a learner is not enrolled in.
+
+        ``enrolled`` maps course ids to how much each says about the learner.
+        """
+        known = [(self.rows[course_id], weight) for course_id, weight in enrolled.items() if course_id in self.rows]
+        rows = np.array([row for row, _ in known], dtype=np.int64)
+        weights = np.array([weight for _, weight in known], dtype=np.float32)
+        done = np.zeros(len(self), dtype=bool)
+        done[[self.rows[course_id] for course_id in completed if course_id in self.rows]] = True
+
+        # Unmet prerequisites per course, in one sparse product
+        ready = (self.prerequisites @ (~done).astype(np.float32)) == 0
+        if len(rows):
+            neighbours = self.similarity[rows]
+            scores = np.asarray(neighbours.T @ weights).ravel()
+        else:
+            scores = self._cold_start
+        scores = np.where(ready, scores, scores * UNREADY_PENALTY)
+        eligible = np.ones(len(self), dtype=bool)
+        eligible[rows] = False
+        top = _top(scores, eligible, limit)
+
+        because: List[Optional[str]] = [None] * len(top)
+        if len(rows) and len(top):
+            contributions = neighbours[:, top].toarray() * weights[:, None]
+            best = contributions.argmax(axis=0)
+            because = [
+                self.course_ids[rows[source]] if contributions[source, column] > 0 else None
+                for column, source in enumerate(best)
+            ]
+        return [
+            (self.course_ids[row], round(float(scores[row]), 4), bool(ready[row]), because[position])
+            for position, row in enumerate(top)
+        ]
+
+    def learning_path(self, course_id: str, completed: Set[str]) -> Optional[List[str]]:
+        """Prerequisites still to complete for a course in taking order, then the course itself"""
+        target = self.rows.get(course_id)
+        if target is None:
+            return None
+        done = {self.rows[completed_id] for completed_id in completed if completed_id in self.rows}
+        if target in done:
+            return []
+        # A completed course's own prerequisites are not walked again
+        needed: Set[int] = set()
+        stack = [target]
+        while stack:
+            for row in self.required(stack.pop()).tolist():
+                if row != target and row not in done and row not in needed:
+                    needed.add(row)
+                    stack.append(row)
+        steps = sorted(needed, key=self.topological_rank.__getitem__) + [target]
+        return [self.course_ids[row] for row in steps]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "courses": len(self),
+            "similarities": int(self.similarity.nnz),
+            "prerequisites": int(self.prerequisites.nnz),
+            "built_at": self.built_at,
+        }
+
+class CourseRecommender:
+    """Serves recommendations and learning paths from a RecommenderModel file.
+
+    The model is rebuilt offline by ``build_recommendations.py``; each worker
+    loads it at startup and again whenever the file changes. A learner's
+    enrollments and ranked recommendations are cached per user, so repeat
+    requests need neither the database nor any scoring.
+    """
+
+    def __init__(
+        self,
+        model_path: str = RECOMMENDER_MODEL_PATH,
+        reload_interval: float = RECOMMENDER_RELOAD_SECONDS
+    ):
+        self.model_path = model_path
+        self.reload_interval = reload_interval
+        self.model: Optional[RecommenderModel] = None
+        self._model_mtime: Optional[int] = None
+        self._learners = TTLCache(maxsize=RECOMMENDER_CACHE_SIZE, ttl=RECOMMENDER_CACHE_SECONDS)
+        self._recommendations = TTLCache(maxsize=RECOMMENDER_CACHE_SIZE, ttl=RECOMMENDER_CACHE_SECONDS)
+        self._task: Optional[asyncio.Task] = None
+
+    async def rebuild(self) -> RecommenderModel:
+        """Build the model from the database, save it and start serving it"""
+        client = db.async_admin_client
+        courses = await fetch_all(
+            lambda: client.table('courses')
+            .select('id,title,category,difficulty,tags,prerequisites')
+            .eq('is_published', True).order('id')
+        )
+        enrollments = await fetch_all(
+            lambda: client.table('course_enrollments').select('user_id,course_id').order('id')
+        )
+        loop = asyncio.get_running_loop()
+        model = await loop.run_in_executor(None, RecommenderModel.build, courses, enrollments)
+        if self.model_path:
+            await loop.run_in_executor(None, model.save, self.model_path)
+            self._model_mtime = os.stat(self.model_path).st_mtime_ns
+        self.model = model
+        return model
+
+    async def reload(self) -> bool:
+        """Load the model file if it changed since the last load; returns True if swapped"""
+        if not self.model_path:
+            return False
+        try:
+            mtime = os.stat(self.model_path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime == self._model_mtime:
+            return False
+        try:
+            loop = asyncio.get_running_loop()
+            model = await loop.run_in_executor(None, RecommenderModel.load, self.model_path)
+        except Exception as e:
+            # Keep serving the previous model
+            print(f"Error loading recommender model: {e}")
+            return False
+        self.model = model
+        self._model_mtime = mtime
+        return True
+
+    async def _load_learner(self, user_id: str) -> Tuple[Dict[str, float], Set[str]]:
+        rows = await fetch_all(
+            lambda: db.async_admin_client.table('course_enrollments')
+            .select('course_id,completed_at,progress_percentage')
+            .eq('user_id', user_id).order('course_id')
+        )
+        enrolled: Dict[str, float] = {}
+        completed: Set[str] = set()
+        for row in rows:
+            if row.get('completed_at') or (row.get('progress_percentage') or 0) >= 100:
+                completed.add(row['course_id'])
+                enrolled[row['course_id']] = 1.0
+            else:
+                enrolled[row['course_id']] = IN_PROGRESS_WEIGHT
+        return enrolled, completed
+
+    async def _learner(self, user_id: str) -> Tuple[Dict[str, float], Set[str]]:
+        return await self._learners.get_or_load(user_id, lambda: self._load_learner(user_id))
+
+    def forget(self, user_id: str) -> None:
+        """Drop a learner's cached state, e.g. after they enroll in or complete a course"""
+        self._learners.invalidate(user_id)
+        if self.model is not None:
+            self._recommendations.invalidate((user_id, self.model.version))
+
+    async def recommend(self, user_id: str, limit: int = 10) -> List[CourseRecommendation]:
+        """Published courses the learner is most likely to take next"""
+        model = self.model
+        if model is None:
+            return []
+
+        async def rank():
+            enrolled, completed = await self._learner(user_id)
+            return model.recommend(enrolled, completed, MAX_RECOMMENDATIONS)
+
+        try:
+            # Keyed by model version so a reloaded model is used straight away
+            ranked = await self._recommendations.get_or_load((user_id, model.version), rank)
+        except Exception as e:
+            print(f"Error recommending courses: {e}")
+            return []
+        # Courses unpublished since the model was built are skipped
+        catalog = await course_catalog.get_index()
+        recommendations = []
+        for course_id, score, ready, because_of in ranked:
+            course = catalog.get(course_id)
+            if course is not None:
+                recommendations.append(
+                    CourseRecommendation(course=course, score=score, ready=ready, because_of=because_of)
+                )
+                if len(recommendations) == limit:
+                    break
+        return recommendations
+
+    async def learning_path(self, user_id: str, course_id: str) -> Optional[LearningPath]:
+        """Courses to take, in order, before (and including) ``course_id``; None if unknown"""
+        model = self.model
+        if model is None:
+            return None
+        try:
+            _, completed = await self._learner(user_id)
+        except Exception as e:
+            print(f"Error loading enrollments: {e}")
+            return None
+        steps = model.learning_path(course_id, completed)
+        if steps is None:
+            return None
+        catalog = await course_catalog.get_index()
+        courses = [course for course in map(catalog.get, steps) if course is not None]
+        return LearningPath(
+            course_id=course_id,
+            steps=courses,
+            total_hours=sum(course.duration_hours for course in courses)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "model": self.model.stats() if self.model is not None else None,
+            "learners": self._learners.stats(),
+            "recommendations": self._recommendations.stats(),
+        }
+
+    async def _reload_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            await self.reload()
+
+    async def start(self) -> None:
+        """Load the model and watch the file for rebuilds"""
+        if self._task is not None:
+            return
+        if not await self.reload():
+            # Building here would run the whole build in every worker at once
+            print(f"No recommender model at {self.model_path or '(RECOMMENDER_MODEL_PATH unset)'}; "
+                  "recommendations are unavailable until build_recommendations.py runs")
+        if self.model_path and self.reload_interval > 0:
+            self._task = asyncio.create_task(self._reload_loop())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Shared by every request in this worker process
+course_recommender = CourseRecommender()
+register_local_cache("recommender-learners", course_recommender._learners)
+register_local_cache("recommender-results", course_recommender._recommendations)
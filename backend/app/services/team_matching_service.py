@@ -0,0 +1,238 @@
+from typing import Optional, Dict, Any, List, Set, Iterable
+from collections import Counter
+import asyncio
+import math
+import os
+import numpy as np
+from scipy.sparse import csr_matrix
+from app.utils.cache import TTLCache, register_local_cache
+from app.utils.database import db, execute, fetch_all
+from app.schemas.hackathon import TeamMatch, ParticipantMatch
+
+# A hackathon's index is rebuilt at most this often
+MATCHMAKING_CACHE_SECONDS = float(os.getenv("MATCHMAKING_CACHE_SECONDS", 30))
+# Registrations show up in matches within this many seconds; a burst of them
+# causes one rebuild rather than one each
+MATCHMAKING_REGISTRATION_DELAY = float(os.getenv("MATCHMAKING_REGISTRATION_DELAY", 2))
+MATCHMAKING_MAX_HACKATHONS = int(os.getenv("MATCHMAKING_MAX_HACKATHONS", 100))
+# A technology the hackathon itself lists counts this much more than others
+HACKATHON_TECHNOLOGY_WEIGHT = 1.5
+# A team technology its members already cover still counts, but much less
+COVERED_TECHNOLOGY_WEIGHT = 0.25
+
+_indexes = register_local_cache(
+    "match-indexes", TTLCache(maxsize=MATCHMAKING_MAX_HACKATHONS, ttl=MATCHMAKING_CACHE_SECONDS)
+)
+
+def normalize_skill(skill: str) -> str:
+    """Skills and technologies are free text: compare them case- and space-insensitively"""
+    return " ".join(skill.lower().split())
+
+def _skill_set(values: Optional[Iterable[str]]) -> Set[str]:
+    return {normalize_skill(value) for value in values or () if value and value.strip()}
+
+def _top(scores: np.ndarray, eligible: np.ndarray, limit: int) -> np.ndarray:
+    """Indices of the ``limit`` best positive scores among eligible rows, best first"""
+    scores = np.where(eligible, scores, 0.0)
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+class MatchIndex:
+    """Participants and teams of one hackathon as sparse skill vectors.
+
+    Each participant is a vector over the hackathon's skill vocabulary, and
+    each team a vector of the technologies it still needs (those its members
+    already cover are down-weighted). Terms are IDF-weighted, so rare skills
+    count for more, and rows are L2-normalised, so one sparse matrix-vector
+    product scores a participant against every team (or a team against every
+    participant) by cosine similarity.
+    """
+
+    def __init__(
+        self,
+        technologies: Optional[List[str]],
+        participants: List[Dict[str, Any]],
+        teams: List[Dict[str, Any]],
+        organizer_id: Optional[str] = None
+    ):
+        self.organizer_id = organizer_id
+        self.participants = []
+        for row in participants:
+            profile = row.get('profiles') or {}
+            self.participants.append({
+                'user_id': row['user_id'],
+                'name': profile.get('name'),
+                'skill_level': profile.get('skill_level'),
+                'skills': _skill_set(profile.get('skills')),
+                'looking_for_team': row.get('looking_for_team', True),
+            })
+        hackathon_technologies = _skill_set(technologies)
+        self.teams = []
+        for row in teams:
+            members = row.get('team_members') or []
+            covered: Set[str] = set()
+            for member in members:
+                covered |= _skill_set((member.get('profiles') or {}).get('skills'))
+            # Teams that list nothing are matched on the hackathon's own technologies
+            needs = _skill_set(row.get('technologies')) or hackathon_technologies
+            self.teams.append({
+                'id': row['id'],
+                'name': row['name'],
+                'max_members': row.get('max_members') or 4,
+                'looking_for_members': bool(row.get('looking_for_members')),
+                'members': {member['user_id'] for member in members},
+                'needs': needs,
+                'wanted': needs - covered,
+            })
+
+        self._participant_rows = {participant['user_id']: row for row, participant in enumerate(self.participants)}
+        self._team_rows = {team['id']: row for row, team in enumerate(self.teams)}
+        self._team_of: Dict[str, int] = {}
+        for row, team in enumerate(self.teams):
+            for user_id in team['members']:
+                self._team_of[user_id] = row
+
+        documents = [participant['skills'] for participant in self.participants] + [team['needs'] for team in self.teams]
+        frequencies = Counter(term for document in documents for term in document)
+        self.vocabulary = {term: column for column, term in enumerate(frequencies)}
+        self._weights = {
+            term: (math.log((1 + len(documents)) / (1 + count)) + 1)
+            * (HACKATHON_TECHNOLOGY_WEIGHT if term in hackathon_technologies else 1.0)
+            for term, count in frequencies.items()
+        }
+
+        self.participant_vectors = self._matrix(
+            {term: 1.0 for term in participant['skills']} for participant in self.participants
+        )
+        self.team_vectors = self._matrix(
+            {term: 1.0 if term in team['wanted'] else COVERED_TECHNOLOGY_WEIGHT for term in team['needs']}
+            for team in self.teams
+        )
+        self._open_teams = np.array(
+            [team['looking_for_members'] and len(team['members']) < team['max_members'] for team in self.teams],
+            dtype=bool
+        )
+        self._free_participants = np.array(
+            [p['looking_for_team'] and p['user_id'] not in self._team_of for p in self.participants],
+            dtype=bool
+        )
+
+    def _matrix(self, rows: Iterable[Dict[str, float]]) -> csr_matrix:
+        indptr, indices, data = [0], [], []
+        for row in rows:
+            weights = {self.vocabulary[term]: value * self._weights[term] for term, value in row.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+            indices.extend(weights)
+            data.extend(weight / norm for weight in weights.values())
+            indptr.append(len(indices))
+        return csr_matrix(
+            (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+            shape=(len(indptr) - 1, len(self.vocabulary))
+        )
+
+    def is_participant(self, user_id: str) -> bool:
+        return user_id in self._participant_rows
+
+    def is_organizer(self, user_id: str) -> bool:
+        return self.organizer_id is not None and user_id == self.organizer_id
+
+    def has_team(self, team_id: str) -> bool:
+        return team_id in self._team_rows
+
+    def is_member(self, team_id: str, user_id: str) -> bool:
+        row = self._team_rows.get(team_id)
+        return row is not None and user_id in self.teams[row]['members']
+
+    @staticmethod
+    def _matched(skills: Set[str], team: Dict[str, Any]) -> List[str]:
+        return sorted(skills & team['wanted']) or sorted(skills & team['needs'])
+
+    def teams_for(self, user_id: str, limit: int = 10) -> List[TeamMatch]:
+        """Open teams that need what a participant brings, best match first"""
+        row = self._participant_rows.get(user_id)
+        if row is None or not self.teams:
+            return []
+        scores = (self.team_vectors @ self.participant_vectors[row].T).toarray().ravel()
+        eligible = self._open_teams.copy()
+        if user_id in self._team_of:
+            eligible[self._team_of[user_id]] = False
+        skills = self.participants[row]['skills']
+        return [
+            TeamMatch(
+                team_id=team['id'],
+                name=team['name'],
+                score=round(float(scores[index]), 4),
+                members=len(team['members']),
+                max_members=team['max_members'],
+                matched_skills=self._matched(skills, team)
+            )
+            for index in _top(scores, eligible, limit)
+            for team in (self.teams[index],)
+        ]
+
+    def participants_for(self, team_id: str, limit: int = 10) -> List[ParticipantMatch]:
+        """Participants without a team whose skills fill a team's gaps, best match first"""
+        row = self._team_rows.get(team_id)
+        if row is None or not self.participants:
+            return []
+        scores = (self.participant_vectors @ self.team_vectors[row].T).toarray().ravel()
+        team = self.teams[row]
+        return [
+            ParticipantMatch(
+                user_id=participant['user_id'],
+                name=participant['name'],
+                skill_level=participant['skill_level'],
+                score=round(float(scores[index]), 4),
+                matched_skills=self._matched(participant['skills'], team)
+            )
+            for index in _top(scores, self._free_participants, limit)
+            for participant in (self.participants[index],)
+        ]
+
+class TeamMatchingService:
+    async def _load_index(self, hackathon_id: str) -> Optional[MatchIndex]:
+        client = db.async_admin_client
+        response = await execute(client.table('hackathons').select('technologies,created_by').eq('id', hackathon_id).limit(1))
+        if not response.data:
+            return None
+        participants = await fetch_all(
+            lambda: client.table('hackathon_participants')
+            .select('user_id,looking_for_team,profiles(name,skills,skill_level)')
+            .eq('hackathon_id', hackathon_id).order('user_id')
+        )
+        teams = await fetch_all(
+            lambda: client.table('teams')
+            .select('id,name,technologies,max_members,looking_for_members,team_members(user_id,profiles(skills))')
+            .eq('hackathon_id', hackathon_id).order('id')
+        )
+        # Building the matrices is CPU-bound; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        hackathon = response.data[0]
+        return await loop.run_in_executor(
+            None, MatchIndex, hackathon['technologies'], participants, teams, hackathon['created_by']
+        )
+
+    async def get_index(self, hackathon_id: str) -> Optional[MatchIndex]:
+        """Cached match index for a hackathon, or None if it does not exist"""
+        try:
+            return await _indexes.get_or_load(hackathon_id, lambda: self._load_index(hackathon_id))
+        except Exception as e:
+            print(f"Error building match index: {e}")
+            return None
+
+    async def hackathon_exists(self, hackathon_id: str) -> bool:
+        response = await execute(
+            db.async_admin_client.table('hackathons').select('id').eq('id', hackathon_id).limit(1)
+        )
+        return bool(response.data)
+
+    async def register_participant(self, hackathon_id: str, user_id: str, looking_for_team: bool = True) -> None:
+        """Register (or update) a participant; matches see them within MATCHMAKING_REGISTRATION_DELAY"""
+        await execute(db.async_admin_client.table('hackathon_participants').upsert({
+            'hackathon_id': hackathon_id,
+            'user_id': user_id,
+            'looking_for_team': looking_for_team
+        }, on_conflict='hackathon_id,user_id'))
+        _indexes.expire_within(hackathon_id, MATCHMAKING_REGISTRATION_DELAY)
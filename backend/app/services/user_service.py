@@ -1,31 +1,106 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple, Sequence, AsyncIterator
 from datetime import datetime
-from app.utils.database import supabase, supabase_admin
+import asyncio
+import base64
+import json
+import os
+import re
+from app.utils.cache import create_cache
+from app.utils.write_behind import WriteBehindBuffer
+from app.utils.database import db, execute, or_filter
+from app.utils.metrics import timed_service
+from app.services.portfolio_service import invalidate_portfolio
 from app.schemas.user import UserResponse, UserCreate, UserUpdate, UserProfile, UserRole
 
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", 60))
+PROFILE_CACHE_MAX_SIZE = int(os.getenv("PROFILE_CACHE_MAX_SIZE", 10000))
+STAT_COLUMNS = (
+    "total_courses", "completed_courses", "total_hours", "hackathons_participated",
+    "hackathons_won", "badges_earned", "skill_level",
+)
+# Columns written by the admin export, in output order
+EXPORT_COLUMNS = (
+    "id", "email", "name", "role", "user_type", "institution", "location",
+    "created_at", "updated_at", "last_login", "is_active", "email_confirmed",
+)
+LAST_LOGIN_BATCH_SIZE = int(os.getenv("LAST_LOGIN_BATCH_SIZE", 500))
+LAST_LOGIN_FLUSH_SECONDS = float(os.getenv("LAST_LOGIN_FLUSH_SECONDS", 1.0))
+
+# Shared by every UserService instance; backed by Redis when CACHE_BACKEND=redis.
+# profile_cache maps user_id -> UserResponse, email_index maps email -> user_id.
+profile_cache = create_cache(
+    "profiles",
+    maxsize=PROFILE_CACHE_MAX_SIZE,
+    ttl=PROFILE_CACHE_TTL_SECONDS,
+    encode=lambda user: user.model_dump_json(),
+    decode=UserResponse.model_validate_json,
+)
+email_index = create_cache("profile-emails", maxsize=PROFILE_CACHE_MAX_SIZE, ttl=PROFILE_CACHE_TTL_SECONDS)
+
+_TIMESTAMP_RE = re.compile(r"^[0-9T:. +-]+$")
+_ID_RE = re.compile(r"^[0-9A-Za-z-]+$")
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque keyset cursor pointing just after ``row``"""
+    raw = json.dumps([row['created_at'], row['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, user_id = json.loads(raw)
+        # Both values are interpolated into a PostgREST filter; reject anything odd
+        if not _TIMESTAMP_RE.match(created_at) or not _ID_RE.match(user_id):
+            raise ValueError
+        return created_at, user_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
 class UserService:
+    async def _fetch_profile(self, column: str, value: str) -> Optional[UserResponse]:
+        response = await execute(db.async_client.table('profiles').select('*').eq(column, value).single())
+        if response.data:
+            user = UserResponse.model_validate(response.data)
+            await email_index.set(user.email, user.id)
+            return user
+        return None
+
+    async def _remember(self, user: UserResponse) -> UserResponse:
+        await profile_cache.set(user.id, user)
+        await email_index.set(user.email, user.id)
+        return user
+
+    async def invalidate_user(self, user_id: str) -> None:
+        """Evict a cached profile on every worker after it has been written"""
+        await profile_cache.delete(user_id)
+
+    @timed_service("user_service")
     async def get_user_by_id(self, user_id: str) -> Optional[UserResponse]:
         """Get user by ID"""
         try:
-            response = supabase.table('profiles').select('*').eq('id', user_id).single().execute()
-            if response.data:
-                return UserResponse(**response.data)
-            return None
+            return await profile_cache.get_or_load(user_id, lambda: self._fetch_profile('id', user_id))
         except Exception as e:
             print(f"Error getting user by ID: {e}")
             return None
 
+    @timed_service("user_service")
     async def get_user_by_email(self, email: str) -> Optional[UserResponse]:
         """Get user by email"""
+        user_id = await email_index.get(email)
+        if user_id is not None:
+            user = await self.get_user_by_id(user_id)
+            if user is not None and user.email == email:
+                return user
         try:
-            response = supabase.table('profiles').select('*').eq('email', email).single().execute()
-            if response.data:
-                return UserResponse(**response.data)
-            return None
+            # Profiles are cached by id only; concurrent email lookups share one fetch
+            return await profile_cache.get_or_load(
+                ('email', email), lambda: self._fetch_profile('email', email), store=False
+            )
         except Exception as e:
             print(f"Error getting user by email: {e}")
             return None
 
+    @timed_service("user_service")
     async def create_user_profile(self, user_data: Dict[str, Any]) -> UserResponse:
         """Create user profile"""
         try:
@@ -37,104 +112,200 @@ class UserService:
                 "email_confirmed": False
             }
 
-            response = supabase.table('profiles').insert(profile_data).execute()
-            return UserResponse(**response.data[0])
+            response = await execute(db.async_client.table('profiles').insert(profile_data))
+            return await self._remember(UserResponse.model_validate(response.data[0]))
         except Exception as e:
             raise Exception(f"Failed to create user profile: {str(e)}")
 
+    @timed_service("user_service")
     async def update_user_profile(self, user_id: str, update_data: UserUpdate) -> Optional[UserResponse]:
         """Update user profile"""
         try:
-            update_dict = update_data.dict(exclude_unset=True)
+            update_dict = update_data.model_dump(exclude_unset=True)
             update_dict["updated_at"] = datetime.utcnow().isoformat()
 
-            response = supabase.table('profiles').update(update_dict).eq('id', user_id).execute()
+            response = await execute(db.async_client.table('profiles').update(update_dict).eq('id', user_id))
 
             if response.data:
-                return UserResponse(**response.data[0])
+                # The public portfolio shows profile fields too
+                await invalidate_portfolio(user_id)
+                # Write-through: the returned row replaces the cached profile
+                return await self._remember(UserResponse.model_validate(response.data[0]))
             return None
         except Exception as e:
             print(f"Error updating user profile: {e}")
+            await self.invalidate_user(user_id)
             return None
 
+    @timed_service("user_service")
     async def update_last_login(self, user_id: str) -> bool:
         """Update user's last login timestamp"""
         try:
-            supabase.table('profiles').update({
+            await execute(db.async_client.table('profiles').update({
                 'last_login': datetime.utcnow().isoformat()
-            }).eq('id', user_id).execute()
+            }).eq('id', user_id))
             return True
         except Exception as e:
             print(f"Error updating last login: {e}")
             return False
+        finally:
+            await self.invalidate_user(user_id)
 
+    def record_login(self, user_id: str) -> None:
+        """Queue a last login update; repeated logins for a user are coalesced"""
+        last_login_writer.add({'id': user_id, 'last_login': datetime.utcnow().isoformat()}, key=user_id)
+
+    @timed_service("user_service")
     async def get_user_profile_with_stats(self, user_id: str) -> Optional[UserProfile]:
         """Get user profile with statistics"""
         try:
-            # Get basic profile
-            profile = await self.get_user_by_id(user_id)
-            if not profile:
+            # The counters live on the profile row and are kept current by database
+            # triggers (see reconcile_profile_stats), so one row read is enough.
+            response = await execute(db.async_client.table('profiles').select('*').eq('id', user_id).single())
+            if not response.data:
                 return None
-
-            # Get user statistics (simplified - in real app, these would come from various tables)
-            # For now, returning mock data - replace with actual queries
-            profile_dict = profile.dict()
-            profile_dict.update({
-                "total_courses": 12,  # Replace with actual query
-                "completed_courses": 8,  # Replace with actual query
-                "total_hours": 156,  # Replace with actual query
-                "hackathons_participated": 3,  # Replace with actual query
-                "hackathons_won": 1,  # Replace with actual query
-                "badges_earned": 24,  # Replace with actual query
-                "skill_level": "intermediate"  # Replace with actual calculation
-            })
-
-            return UserProfile(**profile_dict)
+            profile_dict = {
+                key: value for key, value in response.data.items()
+                if value is not None or key not in STAT_COLUMNS
+            }
+            return UserProfile.model_validate(profile_dict)
         except Exception as e:
             print(f"Error getting user profile with stats: {e}")
             return None
 
-    async def search_users(self, query: str, limit: int = 20) -> List[UserResponse]:
-        """Search users by name or email"""
-        try:
-            response = supabase.table('profiles').select('*').or_(
-                f"name.ilike.%{query}%,email.ilike.%{query}%"
-            ).limit(limit).execute()
+    @timed_service("user_service")
+    async def reconcile_profile_stats(self) -> int:
+        """Recompute every profile's counters from source tables; returns rows repaired"""
+        return await db.async_admin_client.call('reconcile_profile_stats', {}, timeout=300) or 0
+
+    @timed_service("user_service")
+    async def list_users(
+        self,
+        role: Optional[UserRole] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        columns: str = '*'
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Get one page of profiles ordered by (created_at, id).
+
+        Returns the raw rows and an opaque cursor for the next page, or None on
+        the last page. Raises ValueError for a malformed cursor.
+        """
+        builder = db.async_admin_client.table('profiles').select(columns)
+        if role:
+            builder = builder.eq('role', role.value)
+        if cursor:
+            created_at, user_id = decode_cursor(cursor)
+            builder = or_filter(
+                builder,
+                f'created_at.gt."{created_at}",and(created_at.eq."{created_at}",id.gt.{user_id})'
+            )
+        # Fetch one extra row to learn whether another page exists
+        response = await execute(builder.order('created_at,id').limit(limit + 1))
+        rows = response.data
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, encode_cursor(rows[-1])
+        return rows, None
+
+    async def iter_users(
+        self,
+        role: Optional[UserRole] = None,
+        page_size: int = 1000,
+        columns: Sequence[str] = EXPORT_COLUMNS
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Walk every matching profile page by page without holding them all in memory"""
+        cursor = None
+        while True:
+            rows, cursor = await self.list_users(role=role, cursor=cursor, limit=page_size, columns=','.join(columns))
+            for row in rows:
+                yield row
+            if cursor is None:
+                return
 
-            return [UserResponse(**user) for user in response.data]
+    @timed_service("user_service")
+    async def search_users(self, query: str, limit: int = 20, role: Optional[UserRole] = None) -> List[UserResponse]:
+        """Search users by name or email, best matches first.
+
+        Every word of the query matches as a prefix of a name or email word,
+        using the full-text index behind the search_profiles RPC.
+        """
+        try:
+            response = await execute(db.async_admin_client.rpc('search_profiles', {
+                'search_query': query,
+                'role_filter': role.value if role else None,
+                'result_limit': limit
+            }))
+            return [UserResponse.model_validate(user) for user in response.data]
         except Exception as e:
             print(f"Error searching users: {e}")
             return []
 
+    @timed_service("user_service")
+    async def autocomplete_users(
+        self, prefix: str, limit: int = 10, role: Optional[UserRole] = None
+    ) -> List[Dict[str, Any]]:
+        """Suggest users (id, name, email, role) while an admin types"""
+        try:
+            response = await execute(db.async_admin_client.rpc('autocomplete_profiles', {
+                'prefix': prefix,
+                'role_filter': role.value if role else None,
+                'result_limit': limit
+            }))
+            return response.data
+        except Exception as e:
+            print(f"Error autocompleting users: {e}")
+            return []
+
+    @timed_service("user_service")
     async def get_users_by_role(self, role: UserRole, limit: int = 50) -> List[UserResponse]:
         """Get users by role"""
         try:
-            response = supabase.table('profiles').select('*').eq('role', role.value).limit(limit).execute()
-            return [UserResponse(**user) for user in response.data]
+            rows, _ = await self.list_users(role=role, limit=limit)
+            return [UserResponse.model_validate(user) for user in rows]
         except Exception as e:
             print(f"Error getting users by role: {e}")
             return []
 
+    @timed_service("user_service")
     async def deactivate_user(self, user_id: str) -> bool:
         """Deactivate user account"""
         try:
-            supabase.table('profiles').update({
+            await execute(db.async_client.table('profiles').update({
                 'is_active': False,
                 'updated_at': datetime.utcnow().isoformat()
-            }).eq('id', user_id).execute()
+            }).eq('id', user_id))
             return True
         except Exception as e:
             print(f"Error deactivating user: {e}")
             return False
+        finally:
+            await self.invalidate_user(user_id)
 
+    @timed_service("user_service")
     async def activate_user(self, user_id: str) -> bool:
         """Activate user account"""
         try:
-            supabase.table('profiles').update({
+            await execute(db.async_client.table('profiles').update({
                 'is_active': True,
                 'updated_at': datetime.utcnow().isoformat()
-            }).eq('id', user_id).execute()
+            }).eq('id', user_id))
             return True
         except Exception as e:
             print(f"Error activating user: {e}")
-            return False
\ No newline at end of file
+            return False
+        finally:
+            await self.invalidate_user(user_id)
+
+
+async def _flush_last_logins(rows: List[Dict[str, Any]]) -> None:
+    """Write a batch of last login timestamps in one round-trip"""
+    await db.async_admin_client.call('bulk_update_last_login', {'updates': rows})
+    await asyncio.gather(*(profile_cache.delete(row['id']) for row in rows))
+
+last_login_writer = WriteBehindBuffer(
+    "last_login",
+    flush=_flush_last_logins,
+    max_batch=LAST_LOGIN_BATCH_SIZE,
+    flush_interval=LAST_LOGIN_FLUSH_SECONDS,
+)
@@ -0,0 +1,106 @@
+import random
+from typing import Any, Dict, List
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+
+from app.services.github_sync_service import GitHubSync
+from app.utils.github import GitHubClient, ResponseCache
+from benchmarks.load_github_sync import MemoryStore, StubGitHub
+
+
+class FailingStore(MemoryStore):
+    """Fails the next ``failures`` project writes, like a PostgREST timeout"""
+
+    def __init__(self, failures: int = 0):
+        super().__init__()
+        self.failures = failures
+
+    async def save_projects(self, user_id: str, rows: List[Dict[str, Any]]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise httpx.ReadTimeout("upsert timed out")
+        await super().save_projects(user_id, rows)
+
+
+@pytest.fixture
+def stub() -> StubGitHub:
+    random.seed(7)
+    return StubGitHub(users=3, max_repos=30, latency=0, rate_limit=10000, window=60, per_page=10)
+
+
+@pytest.fixture
+def cache_dir(tmp_path) -> str:
+    # One response cache shared by every pipeline in a test, as on one server
+    return str(tmp_path / "github-cache")
+
+
+def pipeline(stub: StubGitHub, cache_dir: str, store: MemoryStore) -> GitHubSync:
+    app = Starlette(routes=[Route("/users/{login}/repos", stub.list_repos)])
+    client = GitHubClient(
+        base_url="http://github.test", cache=ResponseCache(cache_dir), transport=httpx.ASGITransport(app=app)
+    )
+    return GitHubSync(client=client, store=store, max_repos=100)
+
+
+def imported(store: MemoryStore, user_id: str) -> int:
+    return sum(1 for owner, _ in store.projects if owner == user_id)
+
+
+def own_repos(stub: StubGitHub, login: str) -> int:
+    return sum(1 for repo in stub.repos[login] if not repo["fork"])
+
+
+@pytest.mark.asyncio
+async def test_unchanged_list_is_not_rewritten(stub, cache_dir):
+    store = MemoryStore()
+    sync = pipeline(stub, cache_dir, store)
+    assert await sync.sync_user("u1", "https://github.com/hacker0") == own_repos(stub, "hacker0")
+    assert await sync.sync_user("u1", "https://github.com/hacker0") == 0
+    assert store.writes == 1
+    stub.push("hacker0")
+    assert await sync.sync_user("u1", "https://github.com/hacker0") == own_repos(stub, "hacker0")
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried_after_304(stub, cache_dir):
+    store = FailingStore(failures=1)
+    sync = pipeline(stub, cache_dir, store)
+    with pytest.raises(httpx.ReadTimeout):
+        await sync.sync_user("u1", "https://github.com/hacker0")
+    # The claim comes round again; GitHub now answers 304 for every page
+    not_modified = stub.not_modified
+    assert await sync.sync_user("u1", "https://github.com/hacker0") == own_repos(stub, "hacker0")
+    assert stub.not_modified > not_modified
+    assert imported(store, "u1") == own_repos(stub, "hacker0")
+
+
+@pytest.mark.asyncio
+async def test_second_account_with_same_url_is_imported(stub, cache_dir):
+    store = MemoryStore()
+    await pipeline(stub, cache_dir, store).sync_user("u1", "https://github.com/hacker0")
+    # Another worker (fresh client) with the same on-disk cache
+    assert await pipeline(stub, cache_dir, store).sync_user("u2", "github.com/hacker0") == own_repos(stub, "hacker0")
+    assert imported(store, "u2") == own_repos(stub, "hacker0")
+
+
+@pytest.mark.asyncio
+async def test_relinked_login_is_imported_again(stub, cache_dir):
+    store = MemoryStore()
+    sync = pipeline(stub, cache_dir, store)
+    await sync.sync_user("u1", "https://github.com/hacker0")
+    await sync.sync_user("u1", "https://github.com/hacker1")
+    assert await sync.sync_user("u1", "https://github.com/hacker0") == own_repos(stub, "hacker0")
+
+
+@pytest.mark.asyncio
+async def test_forced_sync_restores_deleted_project(stub, cache_dir):
+    store = MemoryStore()
+    sync = pipeline(stub, cache_dir, store)
+    await sync.sync_user("u1", "https://github.com/hacker0")
+    deleted = next(key for key in store.projects if key[0] == "u1")
+    del store.projects[deleted]
+    assert await sync.sync_user("u1", "https://github.com/hacker0", force=True) == own_repos(stub, "hacker0")
+    assert deleted in store.projects
@@ -0,0 +1,67 @@
+import uuid
+from datetime import timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.routes import hackathons
+from app.utils.auth import create_access_token
+from app.utils.realtime import CLOSE_POLICY_VIOLATION
+
+
+def token(lifetime: timedelta) -> str:
+    # Admins may join any hackathon channel, so no participants are looked up
+    return create_access_token(
+        {"sub": str(uuid.uuid4()), "email": "organizer@example.com", "role": "admin"}, expires_delta=lifetime
+    )
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(hackathons.router, prefix="/api/v1/hackathons")
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def channel() -> str:
+    return f"/api/v1/hackathons/{uuid.uuid4()}/ws"
+
+
+def assert_refused(client: TestClient, channel: str, **kwargs) -> None:
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(channel, **kwargs) as socket:
+            socket.receive_text()
+    assert closed.value.code == CLOSE_POLICY_VIOLATION
+
+
+def assert_joined(socket) -> None:
+    socket.send_json({"type": "ping"})
+    assert socket.receive_json()["type"] == "pong"
+
+
+def test_subprotocol_token_is_accepted_without_echoing_it(client, channel):
+    with client.websocket_connect(channel, subprotocols=["bearer", token(timedelta(hours=1))]) as socket:
+        assert socket.accepted_subprotocol == "bearer"
+        assert_joined(socket)
+
+
+def test_authorization_header_is_accepted(client, channel):
+    headers = {"Authorization": f"Bearer {token(timedelta(hours=1))}"}
+    with client.websocket_connect(channel, headers=headers) as socket:
+        assert socket.accepted_subprotocol is None
+        assert_joined(socket)
+
+
+def test_query_token_must_be_short_lived(client, channel):
+    with client.websocket_connect(f"{channel}?token={token(timedelta(seconds=30))}") as socket:
+        assert_joined(socket)
+    assert_refused(client, f"{channel}?token={token(timedelta(hours=1))}")
+
+
+def test_missing_or_invalid_token_is_refused(client, channel):
+    assert_refused(client, channel)
+    assert_refused(client, channel, subprotocols=["bearer", "not-a-token"])
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+import pytest
+import pytest_asyncio
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from app.utils import auth
+from app.utils.jwks import JWKSKeySet
+
+
+class SigningKey:
+    """A private key that signs tokens and publishes its public half as a JWK"""
+
+    def __init__(self, kid: str, algorithm: str):
+        self.kid = kid
+        self.algorithm = algorithm
+        if algorithm.startswith("RS"):
+            private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        else:
+            private = ec.generate_private_key(ec.SECP256R1())
+        self.pem = private.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ).decode()
+        public_pem = private.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+        self.public = {**jwk.construct(public_pem, algorithm).to_dict(), "kid": kid, "alg": algorithm, "use": "sig"}
+
+    def sign(self, **claims: Any) -> str:
+        return jwt.encode(claims_for(**claims), self.pem, algorithm=self.algorithm, headers={"kid": self.kid})
+
+
+class CountingKeySet(JWKSKeySet):
+    """Counts every fetch of the JWKS document"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loads = 0
+
+    async def _load_document(self) -> Dict[str, Any]:
+        self.loads += 1
+        return await super()._load_document()
+
+
+def claims_for(**claims: Any) -> Dict[str, Any]:
+    return {"sub": "user-1", "aud": "authenticated", "role": "authenticated", "exp": int(time.time()) + 300, **claims}
+
+
+def publish(path, keys: List[SigningKey]) -> None:
+    path.write_text(json.dumps({"keys": [key.public for key in keys]}))
+
+
+async def settle(keyset: CountingKeySet, loads: int) -> None:
+    """Wait until the background task has fetched the JWKS ``loads`` times in total"""
+    for _ in range(200):
+        if keyset.loads >= loads:
+            # Let the refresh that was fetched swap the keys in
+            await asyncio.sleep(0.01)
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"JWKS fetched {keyset.loads} times, expected {loads}")
+
+
+@pytest.fixture
+def jwks_path(tmp_path):
+    return tmp_path / "jwks.json"
+
+
+@pytest_asyncio.fixture
+async def keyset(jwks_path, monkeypatch):
+    # Served from a local file, read through the same loader as the Supabase URL
+    keyset = CountingKeySet(source=f"file://{jwks_path}", refresh_interval=3600, min_refresh_interval=60)
+    monkeypatch.setattr(auth, "supabase_jwks", keyset)
+    yield keyset
+    await keyset.aclose()
+
+
+def rejected(token: str) -> str:
+    with pytest.raises(HTTPException) as error:
+        auth.verify_supabase_token(token)
+    assert error.value.status_code == 401
+    return error.value.detail
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("algorithm", ["RS256", "ES256"])
+async def test_asymmetric_tokens_are_verified_against_the_jwks(jwks_path, keyset, algorithm):
+    key = SigningKey("key-1", algorithm)
+    publish(jwks_path, [key])
+    await keyset.start()
+
+    assert auth.verify_supabase_token(key.sign())["sub"] == "user-1"
+    assert rejected(key.sign(aud="someone-else")) == "Invalid Supabase token"
+    assert rejected(key.sign(exp=int(time.time()) - 10)) == "Token has expired"
+    # Signed by a key that was never published under that kid
+    assert rejected(SigningKey("key-1", algorithm).sign()) == "Invalid Supabase token"
+
+
+@pytest.mark.asyncio
+async def test_unknown_kid_triggers_one_throttled_refresh(jwks_path, keyset):
+    key = SigningKey("key-1", "RS256")
+    publish(jwks_path, [key])
+    await keyset.start()
+    assert keyset.loads == 1
+
+    # Within min_refresh_interval of the startup fetch: rejected without a fetch
+    stranger = SigningKey("unknown", "RS256")
+    rejected(stranger.sign())
+    await asyncio.sleep(0.05)
+    assert keyset.loads == 1
+
+    # Once the interval has passed, a burst of unknown kids causes a single fetch
+    keyset._last_refresh -= keyset.min_refresh_interval
+    for _ in range(20):
+        rejected(stranger.sign())
+    await settle(keyset, 2)
+    for _ in range(20):
+        rejected(stranger.sign())
+    await asyncio.sleep(0.05)
+    assert keyset.loads == 2
+    assert auth.verify_supabase_token(key.sign())["sub"] == "user-1"
+
+
+@pytest.mark.asyncio
+async def test_rotated_key_is_picked_up_and_retired_key_rejected(jwks_path, keyset):
+    old, new = SigningKey("old", "RS256"), SigningKey("new", "ES256")
+    publish(jwks_path, [old])
+    await keyset.start()
+    assert auth.verify_supabase_token(old.sign())["sub"] == "user-1"
+
+    # Supabase publishes the new key and retires the old one
+    publish(jwks_path, [new])
+    keyset._last_refresh -= keyset.min_refresh_interval
+    # The first token signed with the new kid is rejected and schedules the refresh
+    rejected(new.sign())
+    await settle(keyset, 2)
+
+    assert keyset.kids == ["new"]
+    assert auth.verify_supabase_token(new.sign(sub="user-2"))["sub"] == "user-2"
+    assert rejected(old.sign()) == "Invalid Supabase token"
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_serving_the_previous_keys(jwks_path, keyset):
+    key = SigningKey("key-1", "RS256")
+    publish(jwks_path, [key])
+    await keyset.start()
+
+    jwks_path.write_text("not json")
+    assert not await keyset.refresh()
+    assert auth.verify_supabase_token(key.sign())["sub"] == "user-1"
+
+
+def test_hs256_falls_back_to_the_shared_secret_with_audience(monkeypatch):
+    monkeypatch.setattr(auth, "SUPABASE_JWT_SECRET", "legacy-secret")
+    # No JWKS loaded at all: HS256 never consults it
+    monkeypatch.setattr(auth, "supabase_jwks", JWKSKeySet(source=""))
+
+    token = jwt.encode(claims_for(), "legacy-secret", algorithm="HS256")
+    assert auth.verify_supabase_token(token)["sub"] == "user-1"
+
+    assert rejected(jwt.encode(claims_for(aud="someone-else"), "legacy-secret", algorithm="HS256")) == "Invalid Supabase token"
+    no_audience = claims_for()
+    del no_audience["aud"]
+    assert rejected(jwt.encode(no_audience, "legacy-secret", algorithm="HS256")) == "Invalid Supabase token"
+    assert rejected(jwt.encode(claims_for(), "wrong-secret", algorithm="HS256")) == "Invalid Supabase token"
+    # An asymmetric header without any published key is not retried as HS256
+    assert rejected(SigningKey("key-1", "RS256").sign()) == "Invalid Supabase token"
@@ -3,18 +3,40 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 from pydantic import BaseModel
 from dotenv import load_dotenv
+import base64
+import binascii
+import hashlib
+import hmac
+import json
 import os
+import time
 
 from app.schemas.user import UserRole, TokenData
-from app.utils.database import supabase
+from app.utils.cache import TTLCache, register_local_cache
+from app.utils.jwks import ASYMMETRIC_ALGORITHMS, supabase_jwks
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key")
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("JWT_ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET", SECRET_KEY)
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+# "fast" verifies HMAC tokens with the standard library, "jose" always uses python-jose
+JWT_VERIFIER = os.getenv("JWT_VERIFIER", "fast")
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("JWT_TOKEN_CACHE_MAX_SIZE", 10000))
+
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+# python-jose skips the audience check for tokens without an aud claim unless told otherwise
+_REQUIRE_AUDIENCE = {"require_aud": True}
+
+# Verified tokens, keyed by SHA-256 of the token and kept until the token's exp
+_token_cache = register_local_cache(
+    "jwt-tokens", TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+)
 
 security = HTTPBearer()
 
@@ -30,13 +52,67 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "iat": datetime.utcnow()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def fast_decode(token: str, key: str, algorithm: str) -> dict:
+    """Verify an HMAC-signed JWT using only the standard library.
+
+    Applies the same checks python-jose does for our tokens (algorithm,
+    signature, exp, nbf, unexpected aud) and raises the same JWTError types.
+    """
+    digest = _HMAC_DIGESTS.get(algorithm)
+    if digest is None:
+        raise JWTError(f"Unsupported algorithm for fast verification: {algorithm}")
+    try:
+        signing_input, _, signature = token.rpartition(".")
+        header_segment, _, payload_segment = signing_input.partition(".")
+        header = json.loads(_b64url_decode(header_segment))
+        if not isinstance(header, dict) or header.get("alg") != algorithm:
+            raise JWTError("The specified alg value is not allowed")
+        expected = hmac.new(key.encode(), signing_input.encode(), digest).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            raise JWTError("Signature verification failed.")
+        payload = json.loads(_b64url_decode(payload_segment))
+    except (ValueError, TypeError, binascii.Error):
+        raise JWTError("Error decoding token")
+    if not isinstance(payload, dict):
+        raise JWTError("Invalid payload string: must be a json object")
+
+    now = time.time()
+    for claim in ("exp", "nbf", "iat"):
+        if claim in payload and not isinstance(payload[claim], (int, float)):
+            raise JWTClaimsError(f"{claim} claim must be a number")
+    if "exp" in payload and payload["exp"] < int(now):
+        raise ExpiredSignatureError("Signature has expired.")
+    if "nbf" in payload and payload["nbf"] > now:
+        raise JWTClaimsError("The token is not yet valid (nbf)")
+    if "aud" in payload:
+        raise JWTClaimsError("Invalid audience")
+    if "sub" in payload and not isinstance(payload["sub"], str):
+        raise JWTClaimsError("Subject must be a string.")
+    return payload
+
+def decode_token(token: str) -> dict:
+    """Decode and verify an access token with the configured verifier"""
+    if JWT_VERIFIER == "fast" and ALGORITHM in _HMAC_DIGESTS:
+        return fast_decode(token, SECRET_KEY, ALGORITHM)
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
 def verify_token(token: str) -> TokenData:
+    cache_key = hashlib.sha256(token.encode()).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        exp, token_data = cached
+        if exp > time.time():
+            return token_data
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = decode_token(token)
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
         role: str = payload.get("role")
@@ -44,7 +120,11 @@ def verify_token(token: str) -> TokenData:
         if user_id is None or email is None:
             raise JWTError("Invalid token")
 
-        return TokenData(user_id=user_id, email=email, role=UserRole(role))
+        token_data = TokenData(user_id=user_id, email=email, role=UserRole(role))
+        exp = payload.get("exp")
+        if exp is not None:
+            _token_cache.set(cache_key, (exp, token_data), ttl=exp - time.time())
+        return token_data
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -85,21 +165,27 @@ async def get_current_admin(current_user: TokenData = Depends(get_current_user))
     return current_user
 
 def verify_supabase_token(token: str) -> dict:
-    """Verify Supabase JWT token"""
+    """Verify Supabase JWT token.
+
+    Asymmetric (RS256/ES256) tokens are checked against the public keys
+    published in the project's JWKS, which are parsed once and refreshed in
+    the background. HS256 tokens from projects still on the legacy shared
+    secret are checked against SUPABASE_JWT_SECRET.
+    """
     try:
-        # Supabase uses RS256, but we'll use HS256 for simplicity
-        # In production, you'd verify against Supabase's public key
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-
-        # Verify token hasn't expired
-        exp = payload.get('exp')
-        if exp and datetime.utcnow().timestamp() > exp:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has expired"
-            )
-
-        return payload
+        header = jwt.get_unverified_header(token)
+        algorithm = header.get("alg")
+        if algorithm in ASYMMETRIC_ALGORITHMS:
+            key = supabase_jwks.get_key(header.get("kid"), algorithm)
+            if key is None:
+                raise JWTError("Unknown signing key")
+            return jwt.decode(token, key, algorithms=[algorithm], audience=SUPABASE_JWT_AUDIENCE, options=_REQUIRE_AUDIENCE)
+        return jwt.decode(token, SUPABASE_JWT_SECRET, algorithms=["HS256"], audience=SUPABASE_JWT_AUDIENCE, options=_REQUIRE_AUDIENCE)
+    except ExpiredSignatureError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has expired"
+        )
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -0,0 +1,414 @@
+import asyncio
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+
+class TTLCache:
+    """Bounded in-process cache with per-entry TTL and LRU eviction.
+
+    ``get_or_load`` collapses concurrent misses for the same key into a single
+    call of the loader (single-flight). ``None`` results are never cached.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a fresh cached value, or None"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full"""
+        if value is None:
+            return
+        # An explicit write supersedes any load still in flight for the key
+        self._inflight.pop(key, None)
+        self._data[key] = (time.monotonic() + (ttl if ttl is not None else self.ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a key; a load already in flight for it will not be stored"""
+        self._data.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def expire_within(self, key: Hashable, seconds: float) -> None:
+        """Let a key live at most ``seconds`` more, so a burst of writes causes one reload.
+
+        A load already in flight for it will not be stored, since it may
+        predate the write.
+        """
+        self._inflight.pop(key, None)
+        entry = self._data.get(key)
+        if entry is not None and entry[0] > time.monotonic() + seconds:
+            self._data[key] = (time.monotonic() + seconds, entry[1])
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._inflight.clear()
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]], store: bool = True
+    ) -> Any:
+        """Return the cached value or load it once for all concurrent callers.
+
+        With ``store=False`` only the single-flight behaviour applies: the
+        loader result is shared with concurrent callers but not cached.
+        """
+        while True:
+            value = self.get(key) if store else None
+            if value is not None:
+                return value
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leading caller was cancelled; retry unless we were too
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except BaseException as e:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                future.exception()  # waiters re-raise it; silence "never retrieved"
+            else:
+                future.cancel()
+            raise
+
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+            if store:
+                self.set(key, value)
+        future.set_result(value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CacheBackend(ABC):
+    """Async cache interface shared by services.
+
+    Keys are strings scoped to the backend's namespace. ``delete`` and
+    ``set`` must make every worker stop serving the previous value.
+    """
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]], store: bool = True
+    ) -> Any:
+        ...
+
+    async def start(self) -> None:
+        """Open connections and background listeners"""
+
+    async def aclose(self) -> None:
+        """Release connections and stop background listeners"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Per-process backend; the default when no shared cache is configured"""
+
+    def __init__(self, namespace: str, maxsize: int = 10000, ttl: float = 60.0):
+        super().__init__(namespace)
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.local.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.local.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.local.invalidate(key)
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]], store: bool = True
+    ) -> Any:
+        return await self.local.get_or_load(key, loader, store=store)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", **self.local.stats()}
+
+
+class RedisCacheBackend(CacheBackend):
+    """Shared backend speaking the Redis protocol, fronted by a local TTLCache.
+
+    Values are stored in Redis through ``encode``/``decode`` so every worker
+    sees the same entries. Writes publish the key on an invalidation channel
+    and each worker evicts it from its local tier when the message arrives.
+    Redis failures degrade to the loader instead of failing the request.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        url: str = REDIS_URL,
+        maxsize: int = 10000,
+        ttl: float = 60.0,
+        encode: Callable[[Any], str] = str,
+        decode: Callable[[str], Any] = lambda raw: raw,
+        client=None,
+    ):
+        super().__init__(namespace)
+        self.url = url
+        self.ttl = ttl
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.encode = encode
+        self.decode = decode
+        self.channel = f"cache-invalidate:{namespace}"
+        self.remote_hits = 0
+        self.remote_errors = 0
+        self.invalidations_received = 0
+        self._client = client
+        self._instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package (pip install redis)")
+            self._client = redis.from_url(self.url)
+        return self._client
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def _publish(self, key: str) -> None:
+        self.local.invalidate(key)
+        await self.client.publish(self.channel, f"{self._instance_id}|{key}")
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        value = await self._get_remote(key)
+        if value is not None:
+            self.local.set(key, value)
+        return value
+
+    async def _get_remote(self, key: str) -> Optional[Any]:
+        try:
+            raw = await self.client.get(self._key(key))
+        except Exception as e:
+            self.remote_errors += 1
+            print(f"Cache read failed for {self._key(key)}: {e}")
+            return None
+        if raw is None:
+            return None
+        self.remote_hits += 1
+        return self.decode(raw.decode() if isinstance(raw, bytes) else raw)
+
+    async def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if value is None:
+            return
+        ttl = ttl if ttl is not None else self.ttl
+        try:
+            await self.client.set(self._key(key), self.encode(value), px=int(ttl * 1000))
+            await self._publish(key)
+        except Exception as e:
+            self.remote_errors += 1
+            print(f"Cache write failed for {self._key(key)}: {e}")
+            # Never keep a local copy the other workers can't see invalidated
+            self.local.invalidate(key)
+            return
+        self.local.set(key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        self.local.invalidate(key)
+        try:
+            await self.client.delete(self._key(key))
+            await self._publish(key)
+        except Exception as e:
+            self.remote_errors += 1
+            print(f"Cache delete failed for {self._key(key)}: {e}")
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]], store: bool = True
+    ) -> Any:
+        if not store:
+            return await self.local.get_or_load(key, loader, store=False)
+
+        async def load_shared():
+            value = await self._get_remote(key)
+            if value is None:
+                value = await loader()
+                if value is not None:
+                    try:
+                        await self.client.set(self._key(key), self.encode(value), px=int(self.ttl * 1000))
+                    except Exception as e:
+                        self.remote_errors += 1
+                        print(f"Cache write failed for {self._key(key)}: {e}")
+            return value
+
+        return await self.local.get_or_load(key, load_shared)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message["data"]
+                    sender, _, key = (data.decode() if isinstance(data, bytes) else data).partition("|")
+                    if sender != self._instance_id:
+                        self.invalidations_received += 1
+                        self.local.invalidate(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Entries may have been missed while disconnected
+                print(f"Cache invalidation listener error on {self.channel}: {e}")
+                self.local.clear()
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": "redis",
+            **self.local.stats(),
+            "remote_hits": self.remote_hits,
+            "remote_errors": self.remote_errors,
+            "invalidations_received": self.invalidations_received,
+        }
+
+
+_caches: List[CacheBackend] = []
+
+
+def create_cache(
+    namespace: str,
+    maxsize: int = 10000,
+    ttl: float = 60.0,
+    encode: Callable[[Any], str] = str,
+    decode: Callable[[str], Any] = lambda raw: raw,
+) -> CacheBackend:
+    """Create a cache for ``namespace`` using the backend selected by CACHE_BACKEND"""
+    if CACHE_BACKEND == "redis":
+        cache: CacheBackend = RedisCacheBackend(
+            namespace, url=REDIS_URL, maxsize=maxsize, ttl=ttl, encode=encode, decode=decode
+        )
+    elif CACHE_BACKEND == "memory":
+        cache = MemoryCacheBackend(namespace, maxsize=maxsize, ttl=ttl)
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND: {CACHE_BACKEND}")
+    _caches.append(cache)
+    return cache
+
+
+def registered_caches() -> List[CacheBackend]:
+    return list(_caches)
+
+
+# Per-process caches built directly on TTLCache (values that never leave the worker)
+_local_caches: List[Tuple[str, TTLCache]] = []
+
+
+def register_local_cache(namespace: str, cache: TTLCache) -> TTLCache:
+    """Report a TTLCache on /metrics under ``namespace``; returns the cache"""
+    _local_caches.append((namespace, cache))
+    return cache
+
+
+def registered_local_caches() -> List[Tuple[str, TTLCache]]:
+    return list(_local_caches)
+
+
+async def start_caches() -> None:
+    """Start invalidation listeners for every cache created with create_cache"""
+    for cache in _caches:
+        try:
+            await cache.start()
+        except Exception as e:
+            print(f"Failed to start cache {cache.namespace}: {e}")
+
+
+async def close_caches() -> None:
+    for cache in _caches:
+        await cache.aclose()
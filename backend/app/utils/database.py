@@ -1,40 +1,248 @@
-from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
+from postgrest.constants import DEFAULT_POSTGREST_CLIENT_HEADERS
+from postgrest.exceptions import APIError
+from gotrue import AsyncGoTrueClient
 from dotenv import load_dotenv
+import asyncio
+import httpx
 import os
-from typing import Optional
+from typing import Optional, Dict, Any, List, Callable, Union, TYPE_CHECKING
+from app.utils.metrics import timed_db_call
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 load_dotenv()
 
+# Connection pool settings for the async client
+POOL_MAX_CONNECTIONS = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", 100))
+POOL_MAX_KEEPALIVE = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", 20))
+POOL_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY", 30))
+CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", 5))
+REQUEST_TIMEOUT = float(os.getenv("SUPABASE_REQUEST_TIMEOUT", 10))
+HTTP2_ENABLED = os.getenv("SUPABASE_HTTP2", "false").lower() == "true"
+
+
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    """PostgREST client whose session runs on a shared connection pool"""
+
+    def __init__(self, base_url: str, transport: httpx.AsyncHTTPTransport, **kwargs):
+        self._transport = transport
+        super().__init__(base_url, **kwargs)
+
+    def create_session(
+        self,
+        base_url: str,
+        headers: Dict[str, str],
+        timeout: Union[int, float, httpx.Timeout],
+    ) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            transport=self._transport,
+        )
+
+
+class AsyncSupabaseClient:
+    """Non-blocking Supabase client for use inside request handlers.
+
+    PostgREST and GoTrue calls share a single keep-alive connection pool, so
+    awaiting a query never blocks the event loop and sockets are reused
+    across requests.
+    """
+
+    def __init__(self, supabase_url: str, supabase_key: str):
+        headers = {"apiKey": supabase_key, "Authorization": f"Bearer {supabase_key}"}
+        self.timeout = httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT)
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+            ),
+            http2=HTTP2_ENABLED,
+        )
+        self.postgrest = _PooledPostgrestClient(
+            f"{supabase_url}/rest/v1",
+            transport=self._transport,
+            headers={**DEFAULT_POSTGREST_CLIENT_HEADERS, **headers},
+            timeout=self.timeout,
+        )
+        # The API is stateless per request, so GoTrue must not keep or refresh sessions
+        self.auth = AsyncGoTrueClient(
+            url=f"{supabase_url}/auth/v1",
+            headers=headers,
+            auto_refresh_token=False,
+            persist_session=False,
+            http_client=httpx.AsyncClient(
+                timeout=self.timeout,
+                transport=self._transport,
+                follow_redirects=True,
+            ),
+        )
+
+    def table(self, table_name: str):
+        """Start a PostgREST query on a table"""
+        return self.postgrest.from_(table_name)
+
+    def rpc(self, fn: str, params: Dict[str, Any]):
+        """Call a Postgres function through PostgREST"""
+        return self.postgrest.rpc(fn, params)
+
+    async def call(self, fn: str, params: Dict[str, Any], timeout: Optional[float] = None) -> Any:
+        """Call a Postgres function that returns a scalar, JSON value or nothing.
+
+        postgrest-py only accepts list results, so non-set-returning functions
+        are posted directly and their decoded body is returned.
+        """
+        with timed_db_call(f"POST /rpc/{fn}"):
+            response = await asyncio.wait_for(
+                self.postgrest.session.post(f"/rpc/{fn}", json=params), timeout or REQUEST_TIMEOUT
+            )
+        if not response.is_success:
+            raise APIError(response.json() if response.content else {"message": response.reason_phrase})
+        return response.json() if response.content else None
+
+    async def aclose(self) -> None:
+        """Close pooled connections"""
+        await self.postgrest.aclose()
+        await self.auth.close()
+
+
+async def execute(query, timeout: Optional[float] = None):
+    """Await a PostgREST query builder with a per-call timeout.
+
+    Raises asyncio.TimeoutError when the round-trip exceeds ``timeout``
+    seconds (defaults to SUPABASE_REQUEST_TIMEOUT). Every call is timed in
+    the supabase_request_duration_seconds metric.
+    """
+    with timed_db_call(f"{getattr(query, 'http_method', '?')} {getattr(query, 'path', '?')}"):
+        return await asyncio.wait_for(query.execute(), timeout or REQUEST_TIMEOUT)
+
+
+# PostgREST caps rows per response (1000 by default on Supabase)
+PAGE_SIZE = 1000
+
+
+async def fetch_all(make_query: Callable[[], Any], page_size: int = PAGE_SIZE) -> List[Dict[str, Any]]:
+    """Read every row of a query page by page.
+
+    ``make_query`` must return a fresh builder with a deterministic ``order``
+    each time it is called; builders cannot be reused across pages.
+    """
+    rows: List[Dict[str, Any]] = []
+    while True:
+        response = await execute(make_query().range(len(rows), len(rows) + page_size - 1))
+        rows.extend(response.data)
+        if len(response.data) < page_size:
+            return rows
+
+
+def or_filter(query, filters: str):
+    """Add a PostgREST ``or=(...)`` filter to a query builder.
+
+    Older postgrest-py releases have no ``or_`` method, so the parameter is
+    added directly when it is missing. Multiple calls are ANDed together.
+    """
+    if hasattr(query, "or_"):
+        return query.or_(filters)
+    query.params = query.params.add("or", f"({filters})")
+    return query
+
+
 class Database:
+    """Per-process registry of lazily built Supabase clients.
+
+    Nothing is constructed at import time: each client is created on first
+    use and cached for the current process. Clients inherited from a parent
+    process are dropped after a fork so workers never share sockets.
+    """
+
     def __init__(self):
         self.supabase_url: str = os.getenv("SUPABASE_URL", "")
         self.supabase_key: str = os.getenv("SUPABASE_ANON_KEY", "")
         self.supabase_service_key: str = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
-        self._client: Optional[Client] = None
-        self._admin_client: Optional[Client] = None
+        self._clients: Dict[str, Any] = {}
+        self._pid = os.getpid()
+
+    def _get(self, name: str, key: str, key_env: str, factory):
+        if self._pid != os.getpid():
+            self._reset()
+        client = self._clients.get(name)
+        if client is None:
+            if not self.supabase_url or not key:
+                raise ValueError(f"SUPABASE_URL and {key_env} must be set in environment variables")
+            client = self._clients[name] = factory(self.supabase_url, key)
+        return client
+
+    def _reset(self) -> None:
+        """Forget clients created by another process without closing their sockets"""
+        self._clients = {}
+        self._pid = os.getpid()
 
     @property
-    def client(self) -> Client:
+    def client(self) -> "Client":
         """Get the Supabase client for regular operations"""
-        if self._client is None:
-            if not self.supabase_url or not self.supabase_key:
-                # For development/testing, create a mock client or raise error only when used
-                raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment variables")
-            self._client = create_client(self.supabase_url, self.supabase_key)
-        return self._client
+        return self._get("client", self.supabase_key, "SUPABASE_ANON_KEY", _create_sync_client)
 
     @property
-    def admin_client(self) -> Client:
+    def admin_client(self) -> "Client":
         """Get the Supabase client with service role key for admin operations"""
-        if self._admin_client is None:
-            if not self.supabase_url or not self.supabase_service_key:
-                raise ValueError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set for admin operations")
-            self._admin_client = create_client(self.supabase_url, self.supabase_service_key)
-        return self._admin_client
+        return self._get("admin_client", self.supabase_service_key, "SUPABASE_SERVICE_ROLE_KEY", _create_sync_client)
+
+    @property
+    def async_client(self) -> AsyncSupabaseClient:
+        """Get the non-blocking Supabase client for regular operations"""
+        return self._get("async_client", self.supabase_key, "SUPABASE_ANON_KEY", AsyncSupabaseClient)
+
+    @property
+    def async_admin_client(self) -> AsyncSupabaseClient:
+        """Get the non-blocking Supabase client with service role key"""
+        return self._get("async_admin_client", self.supabase_service_key, "SUPABASE_SERVICE_ROLE_KEY", AsyncSupabaseClient)
+
+    async def warm_up(self) -> None:
+        """Build the async client and open a pooled connection ahead of the first request"""
+        try:
+            client = self.async_client
+        except ValueError as e:
+            print(f"Skipping database warm-up: {e}")
+            return
+        try:
+            await client.postgrest.session.head("/")
+        except Exception as e:
+            print(f"Database warm-up request failed: {e}")
+
+    async def aclose(self) -> None:
+        """Close every client owned by this process"""
+        if self._pid != os.getpid():
+            self._reset()
+            return
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            if isinstance(client, AsyncSupabaseClient):
+                await client.aclose()
+
+
+def _create_sync_client(supabase_url: str, supabase_key: str) -> "Client":
+    # Imported lazily: the sync client pulls in storage/realtime and is only used by scripts
+    from supabase import create_client
+    return create_client(supabase_url, supabase_key)
+
 
 # Global database instance
 db = Database()
 
-# Export clients for easy import - will raise error if env vars not set
-supabase = db.client
-supabase_admin = db.admin_client
\ No newline at end of file
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=db._reset)
+
+
+def __getattr__(name: str):
+    """Resolve the legacy module-level clients lazily on first access"""
+    if name == "supabase":
+        return db.client
+    if name == "supabase_admin":
+        return db.admin_client
+    if name == "async_supabase":
+        return db.async_client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
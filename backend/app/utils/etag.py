@@ -0,0 +1,19 @@
+import hashlib
+from typing import Optional
+
+def make_etag(*parts: object) -> str:
+    """Strong ETag derived from the values that determine a representation"""
+    digest = hashlib.sha256("\x1f".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True when an If-None-Match header already names ``etag`` (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = _strip_weak(etag)
+    return any(_strip_weak(tag.strip()) == opaque for tag in if_none_match.split(","))
+
+def _strip_weak(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
@@ -0,0 +1,279 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+# Optional; unauthenticated clients get 60 requests an hour instead of 5000
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN", "")
+# Requests in flight to one host at a time
+GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", 8))
+# Last response per URL, replayed when GitHub answers 304 (empty disables)
+GITHUB_CACHE_DIR = os.getenv("GITHUB_CACHE_DIR", os.path.join(tempfile.gettempdir(), "github-cache"))
+# Longest rate-limit pause a request waits out before giving up
+GITHUB_MAX_WAIT_SECONDS = float(os.getenv("GITHUB_MAX_WAIT_SECONDS", 900))
+GITHUB_MAX_RETRIES = 3
+GITHUB_REPOS_PER_PAGE = 100
+
+
+class GitHubError(Exception):
+    """A GitHub request failed for good"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimitedError(GitHubError):
+    """GitHub asked us to wait longer than GITHUB_MAX_WAIT_SECONDS"""
+
+    def __init__(self, resume_at: float):
+        super().__init__(f"GitHub rate limit exceeded until {time.ctime(resume_at)}", 429)
+        self.resume_at = resume_at
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: Any
+    # Link rel="next" of the cached page, so pagination works from the cache too
+    next_url: Optional[str]
+
+
+class ResponseCache:
+    """Last successful response per URL as JSON files, kept across restarts.
+
+    Files are sharded by the first byte of the URL digest and written
+    atomically; unreadable files count as misses.
+    """
+
+    def __init__(self, directory: str = GITHUB_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def load(self, url: str) -> Optional[CachedResponse]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(url)) as f:
+                entry = json.load(f)
+            cached = CachedResponse(entry["etag"], entry["body"], entry.get("next_url"))
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return cached
+
+    def store(self, url: str, response: CachedResponse) -> None:
+        if not self.directory:
+            return
+        path = self._path(url)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({"url": url, **response._asdict()}, f, separators=(",", ":"))
+        os.replace(temporary, path)
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.load, url)
+
+    async def set(self, url: str, response: CachedResponse) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self.store, url, response)
+        except OSError as e:
+            print(f"Error caching GitHub response: {e}")
+
+
+class _Host:
+    def __init__(self, max_concurrency: int):
+        self.slots = asyncio.Semaphore(max_concurrency)
+        # Wall-clock time before which nobody may call this host (rate limited)
+        self.paused_until = 0.0
+
+
+class GitHubClient:
+    """Async GitHub REST client built for bulk syncing.
+
+    Every request is conditional when a cached copy exists (If-None-Match),
+    and a 304 is answered from the on-disk cache; GitHub does not count 304s
+    against the rate limit. Requests to one host are capped at
+    ``max_concurrency``. When GitHub reports the rate limit exhausted (or
+    sends Retry-After) the whole host is paused until the reset time and the
+    requests resume by themselves; pauses longer than ``max_wait`` raise
+    RateLimitedError instead. Server errors are retried with jittered
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        base_url: str = GITHUB_API_URL,
+        token: str = GITHUB_TOKEN,
+        cache: Optional[ResponseCache] = None,
+        max_concurrency: int = GITHUB_MAX_CONCURRENCY,
+        max_wait: float = GITHUB_MAX_WAIT_SECONDS,
+        max_retries: int = GITHUB_MAX_RETRIES,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.cache = cache if cache is not None else ResponseCache()
+        self.max_concurrency = max_concurrency
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._hosts: Dict[str, _Host] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.rate_limited = 0
+        self.retries = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Built on first use, inside the worker's event loop
+        if self._client is None:
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+                "User-Agent": "medhasmind-portfolio-sync",
+            }
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            self._client = httpx.AsyncClient(
+                headers=headers,
+                timeout=httpx.Timeout(30, connect=10),
+                limits=httpx.Limits(max_connections=self.max_concurrency * 2),
+                transport=self._transport,
+            )
+        return self._client
+
+    def _host(self, url: str) -> _Host:
+        name = urlsplit(url).netloc
+        host = self._hosts.get(name)
+        if host is None:
+            host = self._hosts[name] = _Host(self.max_concurrency)
+        return host
+
+    def paused_until(self, url: Optional[str] = None) -> float:
+        """Wall-clock time the host of ``url`` (default: the API) is paused until"""
+        return self._host(url or self.base_url).paused_until
+
+    async def _wait(self, host: _Host) -> None:
+        while True:
+            delay = host.paused_until - time.time()
+            if delay <= 0:
+                return
+            if delay > self.max_wait:
+                raise RateLimitedError(host.paused_until)
+            await asyncio.sleep(delay)
+
+    def _check_rate_limit(self, host: _Host, response: httpx.Response) -> bool:
+        """Pause the host if GitHub says so; True if this response was a rate-limit rejection"""
+        remaining = response.headers.get("x-ratelimit-remaining")
+        retry_after = response.headers.get("retry-after")
+        reset = response.headers.get("x-ratelimit-reset")
+        limited = response.status_code in (403, 429) and (remaining == "0" or retry_after is not None)
+        if limited and retry_after is not None:
+            resume_at = time.time() + float(retry_after)
+        elif remaining == "0" and reset is not None:
+            # The last allowed request (or a rejected one): nothing more until the window resets
+            resume_at = float(reset) + 1
+        elif limited:
+            resume_at = time.time() + 60
+        else:
+            return False
+        host.paused_until = max(host.paused_until, resume_at)
+        if limited:
+            self.rate_limited += 1
+        return limited
+
+    async def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, Optional[str], Optional[str]]:
+        """GET a JSON resource: (body, its ETag, next page URL)"""
+        if params:
+            url = str(httpx.URL(url, params=params))
+        host = self._host(url)
+        cached = await self.cache.get(url)
+        headers = {"If-None-Match": cached.etag} if cached is not None else {}
+        failures = 0
+        while True:
+            await self._wait(host)
+            error: Optional[Exception] = None
+            async with host.slots:
+                try:
+                    self.requests += 1
+                    response = await self.client.get(url, headers=headers)
+                except httpx.TransportError as e:
+                    error = e
+            if error is None:
+                limited = self._check_rate_limit(host, response)
+                if response.status_code == 304 and cached is not None:
+                    self.not_modified += 1
+                    return cached.body, cached.etag, cached.next_url
+                if response.status_code == 200:
+                    body = response.json()
+                    next_url = response.links.get("next", {}).get("url")
+                    etag = response.headers.get("etag")
+                    if etag:
+                        await self.cache.set(url, CachedResponse(etag, body, next_url))
+                    return body, etag, next_url
+                if limited:
+                    # Resume once the pause is over; this does not count as a failure
+                    continue
+                if response.status_code < 500:
+                    raise GitHubError(f"GitHub returned {response.status_code} for {url}", response.status_code)
+                error = GitHubError(f"GitHub returned {response.status_code} for {url}", response.status_code)
+            failures += 1
+            if failures > self.max_retries:
+                raise error if isinstance(error, GitHubError) else GitHubError(f"GitHub request failed: {error}")
+            self.retries += 1
+            await asyncio.sleep(min(2 ** failures, 30) * (0.5 + random.random()))
+
+    async def list_repos(self, login: str, limit: int = 100) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """A user's own public repositories, most recently pushed first, and the ETags of the pages.
+
+        The ETags are joined into one version string for the whole list
+        (None if a page had none), for callers to compare with the version
+        they last stored.
+        """
+        url: Optional[str] = f"{self.base_url}/users/{login}/repos"
+        params: Optional[Dict[str, Any]] = {
+            "type": "owner", "sort": "pushed", "per_page": min(limit, GITHUB_REPOS_PER_PAGE)
+        }
+        repos: List[Dict[str, Any]] = []
+        etags: List[Optional[str]] = []
+        while url and len(repos) < limit:
+            page, etag, url = await self.get(url, params)
+            params = None  # the next link carries them
+            repos.extend(page)
+            etags.append(etag)
+        version = ",".join(etags) if all(etags) else None
+        return repos[:limit], version
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "cache_hits": self.cache.hits,
+            "cache_misses": self.cache.misses,
+            "paused_until": max((host.paused_until for host in self._hosts.values()), default=0.0),
+        }
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
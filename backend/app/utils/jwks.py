@@ -0,0 +1,159 @@
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import aiofiles
+import httpx
+from dotenv import load_dotenv
+from jose import jwk
+from jose.backends.base import Key
+
+load_dotenv()
+
+SUPABASE_URL = os.getenv("SUPABASE_URL", "")
+# Either an http(s) URL or a local file path / file:// URL (useful for tests)
+SUPABASE_JWKS_URL = os.getenv(
+    "SUPABASE_JWKS_URL",
+    f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json" if SUPABASE_URL else "",
+)
+JWKS_REFRESH_SECONDS = float(os.getenv("SUPABASE_JWKS_REFRESH_SECONDS", 600))
+JWKS_MIN_REFRESH_SECONDS = float(os.getenv("SUPABASE_JWKS_MIN_REFRESH_SECONDS", 30))
+
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+_DEFAULT_ALGORITHMS = {"RSA": "RS256", "EC": "ES256"}
+
+
+class JWKSKeySet:
+    """In-memory set of parsed public keys loaded from a JWKS document.
+
+    Keys are fetched and parsed only by ``refresh``, which runs at startup
+    and then periodically in the background. Request handlers call
+    ``get_key``, a plain dict lookup; an unknown ``kid`` (key rotation)
+    schedules an early background refresh instead of fetching inline.
+    """
+
+    def __init__(
+        self,
+        source: str = SUPABASE_JWKS_URL,
+        refresh_interval: float = JWKS_REFRESH_SECONDS,
+        min_refresh_interval: float = JWKS_MIN_REFRESH_SECONDS,
+    ):
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[Optional[str], Tuple[str, Key]] = {}
+        self._last_refresh = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._refresh_requested: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    @property
+    def kids(self):
+        return list(self._keys)
+
+    def get_key(self, kid: Optional[str], algorithm: str) -> Optional[Key]:
+        """Return the parsed key for ``kid`` if it was published for ``algorithm``"""
+        entry = self._keys.get(kid)
+        if entry is None and kid is None and len(self._keys) == 1:
+            entry = next(iter(self._keys.values()))
+        if entry is None:
+            self.request_refresh()
+            return None
+        key_algorithm, key = entry
+        if key_algorithm != algorithm:
+            return None
+        return key
+
+    def request_refresh(self) -> None:
+        """Ask the background task to reload the key set soon; safe from any thread"""
+        if self._loop is None or self._refresh_requested is None:
+            return
+        if time.monotonic() - self._last_refresh < self.min_refresh_interval:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._refresh_requested.set)
+        except RuntimeError:
+            # Event loop already closed during shutdown
+            pass
+
+    async def _load_document(self) -> Dict[str, Any]:
+        if self.source.startswith(("http://", "https://")):
+            if self._http is None:
+                self._http = httpx.AsyncClient(timeout=10)
+            response = await self._http.get(self.source)
+            response.raise_for_status()
+            return response.json()
+        path = self.source[len("file://"):] if self.source.startswith("file://") else self.source
+        async with aiofiles.open(path, "r") as f:
+            return json.loads(await f.read())
+
+    @staticmethod
+    def parse(document: Dict[str, Any]) -> Dict[Optional[str], Tuple[str, Key]]:
+        """Parse a JWKS document into {kid: (algorithm, key)}, skipping unusable keys"""
+        keys: Dict[Optional[str], Tuple[str, Key]] = {}
+        for key_data in document.get("keys", []):
+            if key_data.get("use", "sig") != "sig":
+                continue
+            algorithm = key_data.get("alg") or _DEFAULT_ALGORITHMS.get(key_data.get("kty"))
+            if algorithm not in ASYMMETRIC_ALGORITHMS:
+                continue
+            try:
+                keys[key_data.get("kid")] = (algorithm, jwk.construct(key_data, algorithm))
+            except Exception as e:
+                print(f"Skipping unparseable JWK {key_data.get('kid')}: {e}")
+        return keys
+
+    async def refresh(self) -> bool:
+        """Fetch and parse the JWKS, swapping the key set atomically on success"""
+        if not self.source:
+            return False
+        self._last_refresh = time.monotonic()
+        try:
+            keys = self.parse(await self._load_document())
+        except Exception as e:
+            # Keep serving the previous keys until the next successful refresh
+            print(f"Failed to refresh JWKS from {self.source}: {e}")
+            return False
+        if not keys:
+            print(f"JWKS from {self.source} contained no usable signing keys")
+            return False
+        self._keys = keys
+        return True
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._refresh_requested.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._refresh_requested.clear()
+            await self.refresh()
+
+    async def start(self) -> None:
+        """Load the keys once and start the background refresh task"""
+        if not self.source or self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._refresh_requested = asyncio.Event()
+        await self.refresh()
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def aclose(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+        self._loop = None
+
+
+# Global key set for Supabase-issued tokens
+supabase_jwks = JWKSKeySet()
@@ -0,0 +1,194 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import httpx
+
+# "fake" answers locally (development, tests, load tests); "openai" calls any
+# OpenAI-compatible chat completions API (OpenAI, vLLM, Ollama, ...)
+MENTOR_PROVIDER = os.getenv("MENTOR_PROVIDER", "fake")
+MENTOR_API_URL = os.getenv("MENTOR_API_URL", "https://api.openai.com/v1")
+MENTOR_API_KEY = os.getenv("MENTOR_API_KEY", "")
+MENTOR_MODEL = os.getenv("MENTOR_MODEL", "gpt-4o-mini")
+MENTOR_MAX_TOKENS = int(os.getenv("MENTOR_MAX_TOKENS", 512))
+# Longest wait for the next chunk of an answer
+MENTOR_TIMEOUT_SECONDS = float(os.getenv("MENTOR_TIMEOUT_SECONDS", 60))
+# Simulated latency of the fake provider
+MENTOR_FAKE_FIRST_TOKEN_SECONDS = float(os.getenv("MENTOR_FAKE_FIRST_TOKEN_SECONDS", 0.3))
+MENTOR_FAKE_TOKEN_SECONDS = float(os.getenv("MENTOR_FAKE_TOKEN_SECONDS", 0.02))
+
+# Chat messages in the OpenAI format: [{"role": "system"|"user"|"assistant", "content": "..."}]
+Messages = List[Dict[str, str]]
+
+
+class ModelProvider(ABC):
+    """Streams chat completions from a language model.
+
+    ``stream_batch`` is given every request the mentor service collected in
+    one batching window and returns one chunk iterator per request. The
+    default streams each request on its own; providers backed by a batching
+    inference server override it to submit the batch together.
+    """
+
+    name = "provider"
+
+    @abstractmethod
+    def stream(self, messages: Messages) -> AsyncIterator[str]:
+        ...
+
+    def stream_batch(self, batch: List[Messages]) -> List[AsyncIterator[str]]:
+        return [self.stream(messages) for messages in batch]
+
+    async def aclose(self) -> None:
+        """Release connections"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {"provider": self.name}
+
+
+_FILLER = (
+    "start small and ship a working version first . then measure , read the error messages closely , "
+    "and write down what you tried . break the problem into steps you can test one at a time , "
+    "pair with a teammate when you are stuck , and keep notes for your pitch ."
+).split()
+
+
+class FakeProvider(ModelProvider):
+    """Deterministic local model for development, tests and load tests.
+
+    Answers are made from the question's own words, so the same question
+    always gets the same answer. Like a batching inference server, a batch
+    pays the first-token latency once and then emits one token for every
+    sequence per decoding step.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        first_token_seconds: float = MENTOR_FAKE_FIRST_TOKEN_SECONDS,
+        token_seconds: float = MENTOR_FAKE_TOKEN_SECONDS,
+        tokens: int = 40
+    ):
+        self.first_token_seconds = first_token_seconds
+        self.token_seconds = token_seconds
+        self.tokens = tokens
+        self.batches = 0
+        self.sequences = 0
+        self._decoders: Set[asyncio.Task] = set()
+
+    def answer(self, messages: Messages) -> List[str]:
+        question = messages[-1]["content"]
+        topic = " ".join(re.findall(r"\w+", question.lower())[:6]) or "that"
+        seed = int(hashlib.sha256(question.encode()).hexdigest()[:8], 16)
+        words = [f"Good question about {topic} ."]
+        words += [_FILLER[(seed + step) % len(_FILLER)] for step in range(self.tokens - 1)]
+        return [word + " " for word in words]
+
+    def stream(self, messages: Messages) -> AsyncIterator[str]:
+        return self.stream_batch([messages])[0]
+
+    def stream_batch(self, batch: List[Messages]) -> List[AsyncIterator[str]]:
+        self.batches += 1
+        self.sequences += len(batch)
+        answers = [self.answer(messages) for messages in batch]
+        queues: List[asyncio.Queue] = [asyncio.Queue() for _ in batch]
+
+        async def decode():
+            await asyncio.sleep(self.first_token_seconds)
+            for step in range(max(map(len, answers))):
+                for queue, answer in zip(queues, answers):
+                    if step < len(answer):
+                        queue.put_nowait(answer[step])
+                        if step == len(answer) - 1:
+                            queue.put_nowait(None)
+                await asyncio.sleep(self.token_seconds)
+
+        task = asyncio.create_task(decode())
+        self._decoders.add(task)
+        task.add_done_callback(self._decoders.discard)
+
+        async def read(queue: asyncio.Queue) -> AsyncIterator[str]:
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    return
+                yield chunk
+
+        return [read(queue) for queue in queues]
+
+    async def aclose(self) -> None:
+        for task in list(self._decoders):
+            task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"provider": self.name, "batches": self.batches, "sequences": self.sequences}
+
+
+class OpenAIProvider(ModelProvider):
+    """Any OpenAI-compatible chat completions API, streamed over server-sent events"""
+
+    name = "openai"
+
+    def __init__(
+        self,
+        url: str = MENTOR_API_URL,
+        api_key: str = MENTOR_API_KEY,
+        model: str = MENTOR_MODEL,
+        max_tokens: int = MENTOR_MAX_TOKENS,
+        timeout: float = MENTOR_TIMEOUT_SECONDS
+    ):
+        self.url = url
+        self.api_key = api_key
+        self.model = model
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Built on first use, inside the worker's event loop
+        if self._client is None:
+            headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
+            self._client = httpx.AsyncClient(
+                base_url=self.url, headers=headers, timeout=httpx.Timeout(self.timeout, connect=10)
+            )
+        return self._client
+
+    async def stream(self, messages: Messages) -> AsyncIterator[str]:
+        payload = {"model": self.model, "messages": messages, "max_tokens": self.max_tokens, "stream": True}
+        async with self.client.stream("POST", "/chat/completions", json=payload) as response:
+            if response.status_code >= 400:
+                body = await response.aread()
+                raise RuntimeError(f"model API returned {response.status_code}: {body[:200]!r}")
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    return
+                choices = json.loads(data).get("choices") or []
+                content = (choices[0].get("delta") or {}).get("content") if choices else None
+                if content:
+                    yield content
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"provider": self.name, "model": self.model}
+
+
+def create_provider() -> ModelProvider:
+    """Create the model provider selected by MENTOR_PROVIDER"""
+    if MENTOR_PROVIDER == "openai":
+        return OpenAIProvider()
+    if MENTOR_PROVIDER == "fake":
+        return FakeProvider()
+    raise ValueError(f"Unknown MENTOR_PROVIDER: {MENTOR_PROVIDER}")
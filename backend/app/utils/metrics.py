@@ -0,0 +1,365 @@
+import functools
+import hmac
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.utils.cache import registered_caches, registered_local_caches
+from app.utils.write_behind import registered_buffers
+
+# Set to "false" to stop timing HTTP requests (/metrics still reports the rest)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+# When set, /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Upper bounds in seconds, from cache hits to slow database calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Starlette appends "; charset=utf-8" to text responses
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class _HistogramChild:
+    __slots__ = ("upper_bounds", "counts", "sum")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # One slot per bucket plus +Inf; made cumulative only when rendered
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+
+
+class Metric:
+    """A metric family; ``labels(...)`` returns the child for one label set.
+
+    Children are created on first use and kept, so hot paths pay one dict
+    lookup. Updates are plain attribute writes: everything runs on the
+    worker's event loop, and each worker exposes its own values.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: str) -> Any:
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+            child = self._children[values] = self._new_child()
+        return child
+
+    def _sample_lines(self) -> Iterable[str]:
+        for values, child in self._children.items():
+            yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._sample_lines())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _sample_lines(self) -> Iterable[str]:
+        bounds = [_format_value(bound) for bound in self.upper_bounds] + ["+Inf"]
+        for values, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(bounds, child.counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, values, f'le="{bound}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Registry:
+    """Metrics exposed on /metrics.
+
+    Collectors are called on every scrape and return freshly filled metrics
+    for values that live elsewhere (cache and buffer statistics).
+    """
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Metric]]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            try:
+                metrics.extend(collector())
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Shared by every request in this worker process
+registry = Registry()
+
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being handled by this worker"
+))
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving an HTTP request to the end of its response, by route template",
+    ("method", "route", "status"),
+))
+db_request_duration = registry.register(Histogram(
+    "supabase_request_duration_seconds",
+    "Round-trip time of Supabase (PostgREST) calls, by HTTP method and table or RPC path",
+    ("operation",),
+))
+db_request_errors = registry.register(Counter(
+    "supabase_request_errors_total",
+    "Supabase (PostgREST) calls that raised or timed out",
+    ("operation",),
+))
+service_call_duration = registry.register(Histogram(
+    "service_call_duration_seconds",
+    "Time spent in service methods, including cache hits",
+    ("service", "method"),
+))
+service_call_errors = registry.register(Counter(
+    "service_call_errors_total",
+    "Service method calls that raised",
+    ("service", "method"),
+))
+
+
+class timed_db_call:
+    """Time one Supabase call: ``with timed_db_call("GET /profiles"): ...``"""
+
+    __slots__ = ("operation", "start")
+
+    def __init__(self, operation: str):
+        self.operation = operation
+
+    def __enter__(self) -> "timed_db_call":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        db_request_duration.labels(self.operation).observe(time.perf_counter() - self.start)
+        if exc_type is not None:
+            db_request_errors.labels(self.operation).inc()
+
+
+def timed_service(service: str):
+    """Decorate an async service method to count and time its calls"""
+
+    def decorate(method):
+        duration = service_call_duration.labels(service, method.__name__)
+        errors = service_call_errors.labels(service, method.__name__)
+
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                duration.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorate
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording in-flight requests and latency per route template.
+
+    Written against raw ASGI rather than BaseHTTPMiddleware so it adds no
+    task or response wrapping; the route template comes from the route
+    FastAPI matched (``/api/v1/users/{user_id}``), so ids never become
+    label values. Streaming responses are timed until their last chunk.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = http_requests_in_flight.labels()
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            http_request_duration.labels(scope["method"], route_template(scope), str(status)).observe(elapsed)
+
+
+def route_template(scope) -> str:
+    """The path template of the route that handled a finished request"""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Plain Starlette routes (the docs) have fixed paths; anything else matched no route
+    return scope["path"] if "endpoint" in scope else "unmatched"
+
+
+def _cache_metrics() -> Iterable[Metric]:
+    hits = Counter("cache_hits_total", "Lookups answered by the cache, by namespace and tier", ("cache", "tier"))
+    misses = Counter("cache_misses_total", "Lookups that went to the loader, by namespace", ("cache",))
+    ratio = Gauge("cache_hit_ratio", "Hits over lookups since the worker started, by namespace", ("cache",))
+    size = Gauge("cache_entries", "Entries held in this worker's cache tier, by namespace", ("cache",))
+    caches = [(cache.namespace, cache.stats()) for cache in registered_caches()]
+    caches += [(namespace, cache.stats()) for namespace, cache in registered_local_caches()]
+    for namespace, stats in caches:
+        # A local miss answered by Redis is a hit of the shared tier, not a miss
+        remote_hits = stats.get("remote_hits", 0)
+        lookups = stats["hits"] + stats["misses"]
+        hits.labels(namespace, "local").inc(stats["hits"])
+        if "remote_hits" in stats:
+            hits.labels(namespace, "remote").inc(remote_hits)
+        misses.labels(namespace).inc(max(stats["misses"] - remote_hits, 0))
+        ratio.labels(namespace).set((stats["hits"] + remote_hits) / lookups if lookups else 0.0)
+        size.labels(namespace).set(stats["size"])
+    return [hits, misses, ratio, size]
+
+
+def _buffer_metrics() -> Iterable[Metric]:
+    depth = Gauge("write_behind_depth", "Rows waiting to be flushed, by buffer", ("buffer",))
+    flushed = Counter("write_behind_rows_flushed_total", "Rows written by flushes, by buffer", ("buffer",))
+    failures = Counter("write_behind_flush_failures_total", "Flushes that failed, by buffer", ("buffer",))
+    flushes = Counter("write_behind_flushes_total", "Flushes that succeeded, by buffer", ("buffer",))
+    flush_seconds = Counter(
+        "write_behind_flush_seconds_total", "Time spent in successful flushes, by buffer", ("buffer",)
+    )
+    last_flush = Gauge(
+        "write_behind_last_flush_seconds", "Duration of the latest successful flush, by buffer", ("buffer",)
+    )
+    max_flush = Gauge(
+        "write_behind_max_flush_seconds", "Slowest successful flush since the worker started, by buffer", ("buffer",)
+    )
+    for buffer in registered_buffers():
+        stats = buffer.stats()
+        depth.labels(buffer.name).set(stats["depth"])
+        flushed.labels(buffer.name).inc(stats["rows_flushed"])
+        failures.labels(buffer.name).inc(stats["flush_failures"])
+        flushes.labels(buffer.name).inc(stats["flushes"])
+        flush_seconds.labels(buffer.name).inc(stats["total_flush_seconds"])
+        last_flush.labels(buffer.name).set(stats["last_flush_seconds"])
+        max_flush.labels(buffer.name).set(stats["max_flush_seconds"])
+    return [depth, flushed, failures, flushes, flush_seconds, last_flush, max_flush]
+
+
+registry.register_collector(_cache_metrics)
+registry.register_collector(_buffer_metrics)
+
+
+def metrics_authorized(authorization: Optional[str]) -> bool:
+    """Whether a scrape may read /metrics given its Authorization header"""
+    if not METRICS_TOKEN:
+        return True
+    return hmac.compare_digest((authorization or "").encode(), f"Bearer {METRICS_TOKEN}".encode())
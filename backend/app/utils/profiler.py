@@ -0,0 +1,306 @@
+import asyncio
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from app.utils.metrics import route_template
+
+# Off unless set to "true"; the sampler thread only runs when enabled
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+# Share of requests profiled regardless of how long they take
+PROFILER_SAMPLE_RATE = float(os.getenv("PROFILER_SAMPLE_RATE", 0.01))
+# Requests slower than this are always kept (0 keeps only sampled requests)
+PROFILER_SLOW_MS = float(os.getenv("PROFILER_SLOW_MS", 1000))
+# Milliseconds between stack samples
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", 5))
+# Requests watched at once; requests beyond this are not profiled
+PROFILER_MAX_TRACKED = int(os.getenv("PROFILER_MAX_TRACKED", 64))
+# Ring buffer of saved profiles, shared by every worker on the host
+PROFILER_DIR = os.getenv("PROFILER_DIR", os.path.join(tempfile.gettempdir(), "medhasmind-profiles"))
+PROFILER_MAX_PROFILES = int(os.getenv("PROFILER_MAX_PROFILES", 100))
+
+PROFILE_ID_RE = re.compile(r"^[0-9]{13}-[0-9]+-[0-9]+$")
+
+
+def _label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+
+def _coroutine_stack(coro) -> List[str]:
+    """Frames of a suspended coroutine down to the awaitable it is waiting on"""
+    labels = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            if labels:
+                # A future, task or async generator step: the time is spent waiting
+                name = type(coro).__name__
+                labels.append(f"[await {'Future' if name == 'FutureIter' else name}]")
+            break
+        labels.append(_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return labels
+
+
+def _thread_stack(frame, root) -> List[str]:
+    """Frames of the running thread from the task's coroutine up to ``frame``"""
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        if frame is root:
+            break
+        frame = frame.f_back
+    return [_label(frame) for frame in reversed(frames)]
+
+
+class _Trace:
+    __slots__ = ("task", "samples")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        # Folded stack ("a;b;c") -> samples
+        self.samples: Counter = Counter()
+
+
+class ProfileStore:
+    """Saved profiles as files in a directory, oldest removed beyond ``max_profiles``.
+
+    Each profile is a folded-stack file (``frame;frame;frame count`` per
+    line, the input of flamegraph.pl, speedscope and inferno) and a JSON
+    file with the request it came from. Ids sort by creation time.
+    """
+
+    def __init__(self, directory: str = PROFILER_DIR, max_profiles: int = PROFILER_MAX_PROFILES):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        self._sequence = itertools.count()
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def save(self, folded: str, metadata: Dict[str, Any]) -> str:
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = f"{int(time.time() * 1000)}-{os.getpid()}-{next(self._sequence)}"
+        for extension, content in (("folded", folded), ("json", json.dumps({"id": profile_id, **metadata}))):
+            temporary = self._path(profile_id, f"{extension}.tmp")
+            with open(temporary, "w") as f:
+                f.write(content)
+            os.replace(temporary, self._path(profile_id, extension))
+        self._trim()
+        return profile_id
+
+    def _ids(self) -> List[str]:
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".json")] for name in names if name.endswith(".json"))
+
+    def _trim(self) -> None:
+        ids = self._ids()
+        for profile_id in ids[:max(len(ids) - self.max_profiles, 0)]:
+            for extension in ("json", "folded"):
+                try:
+                    os.remove(self._path(profile_id, extension))
+                except FileNotFoundError:
+                    # Another worker trimmed it first
+                    pass
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of every saved profile, newest first"""
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                with open(self._path(profile_id, "json")) as f:
+                    profiles.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return profiles
+
+    def read(self, profile_id: str) -> Optional[str]:
+        if not PROFILE_ID_RE.match(profile_id):
+            return None
+        try:
+            with open(self._path(profile_id, "folded")) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+
+class SamplingProfiler:
+    """Statistical wall-clock profiler for in-flight requests.
+
+    A background thread wakes every ``interval`` seconds and records one
+    stack per tracked request: the thread's stack for the request whose
+    task is running (CPU time, e.g. jwt.decode or Pydantic validation),
+    and the await chain for the suspended ones (waiting, e.g. a Supabase
+    round-trip, shown with an ``[await ...]`` leaf). Only the event loop
+    thread is sampled; work pushed to a thread pool shows as an await.
+
+    Every request is tracked while it runs (up to ``max_tracked``), and
+    its profile is kept if it was picked by ``sample_rate`` or took at
+    least ``slow_ms``.
+    """
+
+    def __init__(
+        self,
+        store: Optional[ProfileStore] = None,
+        enabled: bool = PROFILER_ENABLED,
+        sample_rate: float = PROFILER_SAMPLE_RATE,
+        slow_ms: float = PROFILER_SLOW_MS,
+        interval: float = PROFILER_INTERVAL_MS / 1000,
+        max_tracked: int = PROFILER_MAX_TRACKED
+    ):
+        self.store = store or ProfileStore()
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.interval = interval
+        self.max_tracked = max_tracked
+        self._tracked: Dict[asyncio.Task, _Trace] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.ticks = 0
+        self.saved = 0
+        self.untracked = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def _sample(self) -> None:
+        traces = list(self._tracked.values())
+        if not traces:
+            return
+        running = asyncio.current_task(self._loop)
+        thread_frame = sys._current_frames().get(self._thread_id)
+        for trace in traces:
+            coro = trace.task.get_coro()
+            if trace.task is running and thread_frame is not None:
+                stack = _thread_stack(thread_frame, getattr(coro, "cr_frame", None))
+            else:
+                stack = _coroutine_stack(coro)
+            if stack:
+                trace.samples[";".join(stack)] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+                self.ticks += 1
+            except (RuntimeError, AttributeError):
+                # A request started or finished mid-sample; skip this tick
+                continue
+
+    def track(self, task: asyncio.Task) -> Optional[_Trace]:
+        if len(self._tracked) >= self.max_tracked:
+            self.untracked += 1
+            return None
+        trace = self._tracked[task] = _Trace(task)
+        return trace
+
+    def finish(self, trace: _Trace, scope, status: int, elapsed: float, sampled: bool) -> None:
+        """Stop watching a request and save its profile if it qualifies"""
+        self._tracked.pop(trace.task, None)
+        elapsed_ms = elapsed * 1000
+        slow = self.slow_ms > 0 and elapsed_ms >= self.slow_ms
+        if not (sampled or slow) or not trace.samples:
+            return
+        folded = "".join(f"{stack} {count}\n" for stack, count in trace.samples.most_common())
+        metadata = {
+            "method": scope["method"],
+            "route": route_template(scope),
+            "path": scope["path"],
+            "status": status,
+            "duration_ms": round(elapsed_ms, 2),
+            "trigger": "slow" if slow else "sampled",
+            "samples": sum(trace.samples.values()),
+            "interval_ms": self.interval * 1000,
+            "captured_at": time.time(),
+        }
+        loop = asyncio.get_running_loop()
+        # Written off the event loop; the response has already been sent
+        loop.run_in_executor(None, self._save, folded, metadata)
+
+    def _save(self, folded: str, metadata: Dict[str, Any]) -> None:
+        try:
+            self.store.save(folded, metadata)
+            self.saved += 1
+        except OSError as e:
+            print(f"Error saving profile: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "tracked": len(self._tracked),
+            "ticks": self.ticks,
+            "saved": self.saved,
+            "untracked": self.untracked,
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "interval_ms": self.interval * 1000,
+        }
+
+    async def start(self) -> None:
+        if not self.enabled or self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    async def aclose(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._tracked.clear()
+
+
+class ProfilerMiddleware:
+    """ASGI middleware that hands every HTTP request to the sampling profiler while it runs"""
+
+    def __init__(self, app, profiler: Optional[SamplingProfiler] = None):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send) -> None:
+        profiler = self.profiler or request_profiler
+        if scope["type"] != "http" or not profiler.running:
+            await self.app(scope, receive, send)
+            return
+        trace = profiler.track(asyncio.current_task())
+        if trace is None:
+            await self.app(scope, receive, send)
+            return
+        sampled = random.random() < profiler.sample_rate
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profiler.finish(trace, scope, status, time.perf_counter() - start, sampled)
+
+# Shared by every request in this worker process
+request_profiler = SamplingProfiler()
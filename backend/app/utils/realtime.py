@@ -0,0 +1,388 @@
+import asyncio
+import json
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Set
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.utils.cache import REDIS_URL
+
+REALTIME_BROKER = os.getenv("REALTIME_BROKER", "memory")
+# Pings go out this often; connections silent for three intervals are closed
+REALTIME_HEARTBEAT_SECONDS = float(os.getenv("REALTIME_HEARTBEAT_SECONDS", 20))
+# Messages waiting to be sent to one connection before it counts as slow
+REALTIME_SEND_QUEUE_SIZE = int(os.getenv("REALTIME_SEND_QUEUE_SIZE", 256))
+# "drop" discards the oldest queued message, "disconnect" closes the connection
+REALTIME_SLOW_CONSUMER = os.getenv("REALTIME_SLOW_CONSUMER", "drop")
+REALTIME_MAX_MESSAGE_BYTES = int(os.getenv("REALTIME_MAX_MESSAGE_BYTES", 16 * 1024))
+# Chat messages one connection may publish per second, sustained and in a burst
+REALTIME_MESSAGES_PER_SECOND = float(os.getenv("REALTIME_MESSAGES_PER_SECOND", 1))
+REALTIME_MESSAGE_BURST = int(os.getenv("REALTIME_MESSAGE_BURST", 10))
+
+# Close codes (RFC 6455 and the 4000-4999 private range)
+CLOSE_GOING_AWAY = 1001
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_TOO_BIG = 1009
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+Deliver = Callable[[str, str], None]
+
+
+class Broker(ABC):
+    """Carries published messages to the hub in every worker.
+
+    ``publish`` must eventually call the ``deliver`` callback given to
+    ``start`` with the channel and the already-encoded message, in this
+    worker and in every other worker sharing the broker.
+    """
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    @abstractmethod
+    async def publish(self, channel: str, message: str) -> None:
+        ...
+
+    async def aclose(self) -> None:
+        """Release connections and stop background listeners"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class MemoryBroker(Broker):
+    """Delivers within this process only; the default for a single worker"""
+
+    async def publish(self, channel: str, message: str) -> None:
+        self._deliver(channel, message)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"broker": "memory"}
+
+
+class RedisBroker(Broker):
+    """Fans messages out to every worker over Redis pub/sub.
+
+    Messages are delivered locally straight away and published tagged with
+    this worker's id, so the listener only delivers messages from other
+    workers. Messages published while the listener is reconnecting are lost,
+    as with any pub/sub transport.
+    """
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "realtime", client=None):
+        super().__init__()
+        self.url = url
+        self.prefix = prefix
+        self.remote_received = 0
+        self.remote_errors = 0
+        self._client = client
+        self._instance_id = uuid.uuid4().hex
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import redis.asyncio as redis
+            except ImportError:
+                raise RuntimeError("REALTIME_BROKER=redis requires the 'redis' package (pip install redis)")
+            self._client = redis.from_url(self.url)
+        return self._client
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def publish(self, channel: str, message: str) -> None:
+        self._deliver(channel, message)
+        try:
+            await self.client.publish(f"{self.prefix}:{channel}", f"{self._instance_id}|{message}")
+        except Exception as e:
+            self.remote_errors += 1
+            print(f"Realtime publish failed for {channel}: {e}")
+
+    async def _listen(self) -> None:
+        prefix = f"{self.prefix}:"
+        while True:
+            pubsub = self.client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{prefix}*")
+                async for message in pubsub.listen():
+                    if message.get("type") != "pmessage":
+                        continue
+                    channel, data = message["channel"], message["data"]
+                    channel = channel.decode() if isinstance(channel, bytes) else channel
+                    data = data.decode() if isinstance(data, bytes) else data
+                    sender, _, payload = data.partition("|")
+                    if sender != self._instance_id:
+                        self.remote_received += 1
+                        self._deliver(channel[len(prefix):], payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.remote_errors += 1
+                print(f"Realtime listener error: {e}")
+                await asyncio.sleep(1)
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    async def aclose(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"broker": "redis", "remote_received": self.remote_received, "remote_errors": self.remote_errors}
+
+
+def create_broker() -> Broker:
+    """Create the broker selected by REALTIME_BROKER"""
+    if REALTIME_BROKER == "redis":
+        return RedisBroker()
+    if REALTIME_BROKER == "memory":
+        return MemoryBroker()
+    raise ValueError(f"Unknown REALTIME_BROKER: {REALTIME_BROKER}")
+
+
+class Connection:
+    """One accepted WebSocket and its bounded queue of encoded outgoing messages"""
+
+    def __init__(self, websocket: WebSocket, user_id: str, channel: str, queue_size: int, burst: int):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.channel = channel
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.last_seen = asyncio.get_running_loop().time()
+        # Token bucket limiting what this connection may publish
+        self.tokens = float(burst)
+        self.refilled_at = self.last_seen
+        self.dropped = 0
+        self.close_code: Optional[int] = None
+        self.sender: Optional[asyncio.Task] = None
+
+    def take_token(self, rate: float, burst: int, now: float) -> bool:
+        """Spend one publish token, refilling ``rate`` per second up to ``burst``"""
+        self.tokens = min(float(burst), self.tokens + (now - self.refilled_at) * rate)
+        self.refilled_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def close(self, code: int) -> None:
+        """Stop sending and let ``serve`` close the socket with ``code``"""
+        if self.close_code is None:
+            self.close_code = code
+            if self.sender is not None:
+                self.sender.cancel()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class RealtimeHub:
+    """Channel registry that fans messages out to WebSocket connections.
+
+    A publish encodes the message once and hands it to the broker; every
+    worker's hub then appends the same string to the send queue of each
+    local connection on the channel without awaiting. Each connection has
+    its own sender task draining its queue, so one slow client never delays
+    the others: when its queue is full the oldest message is dropped or the
+    client is disconnected, per ``slow_consumer``. Each connection may
+    publish ``messages_per_second`` messages (bursts of up to
+    ``message_burst``); the rest are refused. A single heartbeat task pings
+    every connection and closes those that stopped answering.
+    """
+
+    def __init__(
+        self,
+        broker: Optional[Broker] = None,
+        heartbeat_interval: float = REALTIME_HEARTBEAT_SECONDS,
+        queue_size: int = REALTIME_SEND_QUEUE_SIZE,
+        slow_consumer: str = REALTIME_SLOW_CONSUMER,
+        max_message_bytes: int = REALTIME_MAX_MESSAGE_BYTES,
+        messages_per_second: float = REALTIME_MESSAGES_PER_SECOND,
+        message_burst: int = REALTIME_MESSAGE_BURST,
+    ):
+        if slow_consumer not in ("drop", "disconnect"):
+            raise ValueError(f"Unknown slow consumer policy: {slow_consumer}")
+        self.broker = broker or create_broker()
+        self.heartbeat_interval = heartbeat_interval
+        self.queue_size = queue_size
+        self.slow_consumer = slow_consumer
+        self.max_message_bytes = max_message_bytes
+        self.messages_per_second = messages_per_second
+        self.message_burst = message_burst
+        self.channels: Dict[str, Set[Connection]] = {}
+        self.messages_published = 0
+        self.messages_delivered = 0
+        self.messages_dropped = 0
+        self.messages_throttled = 0
+        self.slow_disconnects = 0
+        self.idle_disconnects = 0
+        self._started = False
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self.channels.values())
+
+    def _offer(self, connection: Connection, message: str) -> None:
+        if connection.close_code is not None:
+            return
+        try:
+            connection.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+        if self.slow_consumer == "disconnect":
+            self.slow_disconnects += 1
+            connection.close(CLOSE_TRY_AGAIN_LATER)
+            return
+        connection.queue.get_nowait()
+        connection.queue.put_nowait(message)
+        connection.dropped += 1
+        self.messages_dropped += 1
+
+    def deliver(self, channel: str, message: str) -> None:
+        """Queue an encoded message for every local connection on ``channel``"""
+        for connection in self.channels.get(channel, ()):
+            self._offer(connection, message)
+            self.messages_delivered += 1
+
+    async def publish(self, channel: str, message: Dict[str, Any]) -> None:
+        """Send a message to everyone on ``channel`` in every worker"""
+        await self.start()
+        self.messages_published += 1
+        await self.broker.publish(channel, json.dumps({"channel": channel, **message}, default=str))
+
+    async def _send_loop(self, connection: Connection) -> None:
+        while True:
+            message = await connection.queue.get()
+            await connection.websocket.send_text(message)
+
+    async def _receive_loop(self, connection: Connection) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            text = await connection.websocket.receive_text()
+            connection.last_seen = loop.time()
+            if len(text) > self.max_message_bytes:
+                connection.close(CLOSE_TOO_BIG)
+                return
+            try:
+                message = json.loads(text)
+                kind = message.get("type")
+            except (ValueError, AttributeError):
+                self._offer(connection, json.dumps({"type": "error", "detail": "Messages must be JSON objects"}))
+                continue
+            if kind == "ping":
+                self._offer(connection, json.dumps({"type": "pong", "at": _now()}))
+            elif kind == "message":
+                if not connection.take_token(self.messages_per_second, self.message_burst, connection.last_seen):
+                    self.messages_throttled += 1
+                    self._offer(connection, json.dumps({"type": "error", "detail": "Too many messages; slow down"}))
+                    continue
+                await self.publish(connection.channel, {
+                    "type": "message", "from": connection.user_id, "data": message.get("data"), "sent_at": _now()
+                })
+            elif kind != "pong":
+                self._offer(connection, json.dumps({"type": "error", "detail": f"Unknown message type: {kind}"}))
+
+    async def serve(self, websocket: WebSocket, channel: str, user_id: str, subprotocol: Optional[str] = None) -> None:
+        """Accept an authenticated socket onto ``channel`` and run it until either side closes"""
+        await self.start()
+        await websocket.accept(subprotocol=subprotocol)
+        connection = Connection(websocket, user_id, channel, self.queue_size, self.message_burst)
+        self.channels.setdefault(channel, set()).add(connection)
+        receiver = asyncio.create_task(self._receive_loop(connection))
+        connection.sender = asyncio.create_task(self._send_loop(connection))
+        try:
+            await asyncio.wait({receiver, connection.sender}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            connections = self.channels.get(channel)
+            if connections is not None:
+                connections.discard(connection)
+                if not connections:
+                    del self.channels[channel]
+            for task in (receiver, connection.sender):
+                task.cancel()
+            results = await asyncio.gather(receiver, connection.sender, return_exceptions=True)
+            disconnected = any(isinstance(result, WebSocketDisconnect) for result in results)
+            if not disconnected:
+                try:
+                    await websocket.close(code=connection.close_code or CLOSE_GOING_AWAY)
+                except Exception:
+                    pass
+
+    async def _heartbeat_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            cutoff = loop.time() - 3 * self.heartbeat_interval
+            ping = json.dumps({"type": "ping", "at": _now()})
+            for connections in list(self.channels.values()):
+                for connection in list(connections):
+                    if connection.last_seen < cutoff:
+                        self.idle_disconnects += 1
+                        connection.close(CLOSE_GOING_AWAY)
+                    else:
+                        self._offer(connection, ping)
+
+    async def start(self) -> None:
+        """Start the broker and heartbeat (idempotent; called on first use if not at startup)"""
+        if self._started:
+            return
+        self._started = True
+        await self.broker.start(self.deliver)
+        if self.heartbeat_interval > 0:
+            self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    async def aclose(self) -> None:
+        """Disconnect every client and stop the broker"""
+        for connections in list(self.channels.values()):
+            for connection in list(connections):
+                connection.close(CLOSE_GOING_AWAY)
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        await self.broker.aclose()
+        self._started = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": self.connection_count(),
+            "channels": len(self.channels),
+            "messages_published": self.messages_published,
+            "messages_delivered": self.messages_delivered,
+            "messages_dropped": self.messages_dropped,
+            "messages_throttled": self.messages_throttled,
+            "slow_disconnects": self.slow_disconnects,
+            "idle_disconnects": self.idle_disconnects,
+            **self.broker.stats(),
+        }
+
+
+# Shared by every connection in this worker process
+hub = RealtimeHub()
@@ -0,0 +1,45 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional, get_args, get_origin
+
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Used by every route that does not return a Response itself; orjson is
+# optional and the standard library encoder is used without it
+DefaultJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+
+@lru_cache(maxsize=None)
+def _adapter(annotation: Any) -> TypeAdapter:
+    return TypeAdapter(annotation)
+
+
+def _already_validated(content: Any, annotation: Any) -> bool:
+    """Whether ``content`` is exactly ``annotation``: a model, or a list of them"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        # Exact type: a subclass may carry fields the response model leaves out
+        return type(content) is annotation
+    if get_origin(annotation) is list:
+        (item,) = get_args(annotation)
+        return isinstance(content, list) and all(_already_validated(value, item) for value in content)
+    return False
+
+
+def model_response(content: Any, annotation: Any, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """JSON response for a route's ``response_model``, validated at most once.
+
+    FastAPI validates whatever a route returns against its response model,
+    dumps it to a dict and then encodes that dict. Models the service layer
+    already built are written straight to JSON by pydantic instead; anything
+    else (rows from the database) is validated first. Keep ``response_model``
+    on the route for the OpenAPI schema.
+    """
+    adapter = _adapter(annotation)
+    if not _already_validated(content, annotation):
+        content = adapter.validate_python(content)
+    return Response(content=adapter.dump_json(content), media_type="application/json", headers=headers)
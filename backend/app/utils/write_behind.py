@@ -0,0 +1,176 @@
+import asyncio
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class BufferFullError(Exception):
+    """Raised when a bounded buffer cannot take more pending rows"""
+
+
+def _overwrite(pending: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
+    return {**pending, **row}
+
+
+class WriteBehindBuffer:
+    """In-process write-behind queue that coalesces rows and flushes them in bulk.
+
+    Rows added with a key are merged into the pending row for that key, so a
+    burst of updates for one user becomes a single row. ``merge`` combines the
+    pending row with the newer one (by default newer values overwrite). Rows
+    added without a key are kept as-is (append-only writes). Pending rows are
+    flushed when ``max_batch`` rows are waiting or ``flush_interval`` seconds
+    have passed, and once more when the buffer is drained on shutdown. A failed
+    flush merges its rows back under anything newer and is retried after a
+    backoff. With ``max_pending`` set, adding a new key to a full buffer raises
+    BufferFullError so callers can shed load.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[List[Dict[str, Any]]], Awaitable[Any]],
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        retry_backoff: float = 1.0,
+        merge: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any]] = _overwrite,
+        max_pending: Optional[int] = None,
+    ):
+        self.name = name
+        self.flush_fn = flush
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.retry_backoff = retry_backoff
+        self.merge = merge
+        self.max_pending = max_pending
+        self._pending: Dict[Hashable, Dict[str, Any]] = {}
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.rows_added = 0
+        self.rows_flushed = 0
+        self.flushes = 0
+        self.flush_failures = 0
+        self.rows_rejected = 0
+        self.last_flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        self.total_flush_seconds = 0.0
+        _buffers.append(self)
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def is_pending(self, key: Hashable) -> bool:
+        return key in self._pending
+
+    def has_capacity(self, new_keys: int = 1) -> bool:
+        """True if ``new_keys`` more pending rows fit under ``max_pending``"""
+        return self.max_pending is None or len(self._pending) + new_keys <= self.max_pending
+
+    def add(self, row: Dict[str, Any], key: Optional[Hashable] = None) -> None:
+        """Queue a row without waiting for it to be written"""
+        if key in self._pending:
+            self._pending[key] = self.merge(self._pending[key], row)
+        elif not self.has_capacity():
+            self.rows_rejected += 1
+            raise BufferFullError(f"Write-behind buffer {self.name} is full ({len(self._pending)} rows)")
+        elif key is None:
+            self._pending[("_append", next(self._sequence))] = row
+        else:
+            self._pending[key] = dict(row)
+        self.rows_added += 1
+        self._ensure_running()
+        if len(self._pending) >= self.max_batch:
+            self._wakeup.set()
+
+    def _ensure_running(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._pending and not self._stopping:
+                if not await self.flush():
+                    await asyncio.sleep(self.retry_backoff)
+                    break
+                if len(self._pending) < self.max_batch:
+                    break
+
+    async def flush(self) -> bool:
+        """Write up to ``max_batch`` pending rows; returns False if the write failed"""
+        if not self._pending:
+            return True
+        keys = list(itertools.islice(self._pending, self.max_batch))
+        batch = {key: self._pending.pop(key) for key in keys}
+        start = time.perf_counter()
+        try:
+            await self.flush_fn(list(batch.values()))
+        except Exception as e:
+            self.flush_failures += 1
+            print(f"Write-behind flush for {self.name} failed ({len(batch)} rows): {e}")
+            for key, row in batch.items():
+                if key in self._pending:
+                    # A newer update arrived during the flush; it takes precedence
+                    row = self.merge(row, self._pending[key])
+                self._pending[key] = row
+            return False
+        elapsed = time.perf_counter() - start
+        self.flushes += 1
+        self.rows_flushed += len(batch)
+        self.last_flush_seconds = elapsed
+        self.total_flush_seconds += elapsed
+        self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+        return True
+
+    async def drain(self, attempts: int = 3) -> None:
+        """Stop the background flusher and write everything still pending"""
+        if self._task is not None:
+            # Let an in-progress flush finish rather than cancelling it mid-write
+            self._stopping = True
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        failures = 0
+        while self._pending and failures < attempts:
+            if not await self.flush():
+                failures += 1
+                await asyncio.sleep(self.retry_backoff)
+        if self._pending:
+            print(f"Write-behind buffer {self.name} dropped {len(self._pending)} rows on shutdown")
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "rows_added": self.rows_added,
+            "rows_flushed": self.rows_flushed,
+            "flushes": self.flushes,
+            "flush_failures": self.flush_failures,
+            "rows_rejected": self.rows_rejected,
+            "last_flush_seconds": self.last_flush_seconds,
+            "max_flush_seconds": self.max_flush_seconds,
+            "total_flush_seconds": self.total_flush_seconds,
+            "avg_flush_seconds": self.total_flush_seconds / self.flushes if self.flushes else 0.0,
+        }
+
+
+_buffers: List[WriteBehindBuffer] = []
+
+
+def registered_buffers() -> List[WriteBehindBuffer]:
+    return list(_buffers)
+
+
+async def drain_buffers() -> None:
+    """Flush every write-behind buffer; called on application shutdown"""
+    for buffer in _buffers:
+        await buffer.drain()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Metrics Overhead Benchmark
+Measures what the metrics subsystem adds to the request path:
+
+    primitives     one histogram observation, one timed Supabase call and one
+                   timed service call (the wrapper around a no-op coroutine)
+    requests       a FastAPI app shaped like app.main (CORS, routers with path
+                   parameters) called in-process over ASGI, with and without
+                   MetricsMiddleware; best of --repeats runs, interleaved
+    scrape         rendering /metrics with every route and status seen
+
+Run from the backend directory:
+    python -m benchmarks.bench_metrics --requests 20000
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi import APIRouter, FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from app.utils import metrics
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    if with_metrics:
+        app.add_middleware(metrics.MetricsMiddleware)
+    router = APIRouter()
+
+    @router.get("/{user_id}")
+    async def get_user(user_id: str):
+        return {"id": user_id, "name": "Ada", "role": "student"}
+
+    @router.get("/")
+    async def list_users(limit: int = 20):
+        return [{"id": str(i), "name": "Ada"} for i in range(limit)]
+
+    app.include_router(router, prefix="/api/v1/users")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    return app
+
+def scope(path: str, query: bytes = b"") -> dict:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query, "root_path": "",
+        "headers": [(b"host", b"testserver"), (b"origin", b"http://localhost:3000")],
+        "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+
+async def drive(app: FastAPI, requests: int) -> float:
+    """Seconds per request over ``requests`` in-process ASGI calls"""
+    body = {"type": "http.request", "body": b"", "more_body": False}
+
+    async def receive():
+        return body
+
+    async def send(message):
+        pass
+
+    paths = [scope(f"/api/v1/users/user-{i}") for i in range(50)] + [scope("/api/v1/users/", b"limit=5"), scope("/health")]
+    start = time.perf_counter()
+    for i in range(requests):
+        await app(dict(paths[i % len(paths)]), receive, send)
+    return (time.perf_counter() - start) / requests
+
+def bench_primitives(iterations: int) -> None:
+    histogram = metrics.http_request_duration
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        histogram.labels("GET", "/api/v1/users/{user_id}", "200").observe(0.0042)
+    observe = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with metrics.timed_db_call("GET /profiles"):
+            pass
+    db_call = (time.perf_counter() - start) / iterations
+
+    async def noop():
+        return None
+
+    timed = metrics.timed_service("bench")(noop)
+
+    async def run_calls(function) -> float:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            await function()
+        return (time.perf_counter() - start) / iterations
+
+    service_call = asyncio.run(run_calls(timed)) - asyncio.run(run_calls(noop))
+
+    print(f"  {'histogram observation':<28} {observe * 1e9:8.0f} ns")
+    print(f"  {'timed Supabase call':<28} {db_call * 1e9:8.0f} ns")
+    print(f"  {'timed service call':<28} {service_call * 1e9:8.0f} ns")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=200000, help="iterations per primitive")
+    args = parser.parse_args()
+
+    print("🔍 Metrics primitives\n")
+    bench_primitives(args.iterations)
+
+    print(f"\n🔍 {args.requests:,} in-process requests, best of {args.repeats}\n")
+    plain, instrumented = build_app(False), build_app(True)
+    asyncio.run(drive(plain, 1000))
+    asyncio.run(drive(instrumented, 1000))
+    without, with_metrics = float("inf"), float("inf")
+    for _ in range(args.repeats):
+        without = min(without, asyncio.run(drive(plain, args.requests)))
+        with_metrics = min(with_metrics, asyncio.run(drive(instrumented, args.requests)))
+    overhead = with_metrics - without
+    print(f"  {'without metrics':<28} {without * 1e6:8.1f} µs/request  {1 / without:10,.0f} requests/s")
+    print(f"  {'with MetricsMiddleware':<28} {with_metrics * 1e6:8.1f} µs/request  {1 / with_metrics:10,.0f} requests/s")
+    print(f"\n✅ middleware adds {overhead * 1e6:.1f} µs per request ({overhead / without:.1%} of an in-process "
+          f"request, before any network or database time)")
+
+    start = time.perf_counter()
+    text = metrics.registry.render()
+    print(f"✅ /metrics renders {len(text.splitlines()):,} lines in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
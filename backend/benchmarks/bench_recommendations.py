@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Course Recommendation Benchmark
+Builds a RecommenderModel for a synthetic catalog (courses in topic clusters,
+learners enrolling mostly within a topic, prerequisite chains) and reports
+build time, model file size, and recommendation and learning-path latency
+without any caching.
+
+Run from the backend directory:
+    python -m benchmarks.bench_recommendations [--courses 2000] [--learners 100000]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+from app.services.recommendation_service import RecommenderModel
+
+TOPICS = [
+    "python", "javascript", "data science", "machine learning", "web development", "mobile",
+    "cloud", "devops", "security", "databases", "design", "blockchain", "game development", "iot",
+]
+DIFFICULTIES = ["beginner", "intermediate", "advanced"]
+ITERATIONS = 1000
+
+def make_catalog(courses: int, learners: int, per_learner: int):
+    catalog = []
+    by_topic = {topic: [] for topic in TOPICS}
+    for index in range(courses):
+        topic = random.choice(TOPICS)
+        earlier = by_topic[topic]
+        catalog.append({
+            "id": str(uuid.uuid4()),
+            "title": f"{topic.title()} {index}",
+            "category": topic,
+            "difficulty": DIFFICULTIES[min(len(earlier) // 20, 2)],
+            "tags": random.sample(TOPICS, 2) + [topic],
+            # Later courses of a topic build on one or two earlier ones, by title or id
+            "prerequisites": [
+                random.choice([course["title"], course["id"]])
+                for course in random.sample(earlier, min(len(earlier), random.randint(0, 2)))
+            ],
+        })
+        earlier.append(catalog[-1])
+
+    enrollments = []
+    for _ in range(learners):
+        user_id = str(uuid.uuid4())
+        topic = random.choice(TOPICS)
+        chosen = set()
+        for _ in range(random.randint(1, per_learner)):
+            pool = by_topic[topic] if random.random() < 0.8 else catalog
+            chosen.add(random.choice(pool)["id"])
+        enrollments.extend({"user_id": user_id, "course_id": course_id} for course_id in chosen)
+    return catalog, enrollments
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def timed(label, call, arguments):
+    samples = []
+    for argument in arguments:
+        start = time.perf_counter()
+        call(argument)
+        samples.append((time.perf_counter() - start) * 1000)
+    print(
+        f"  {label:<34} p50 {statistics.median(samples):7.3f} ms  "
+        f"p95 {percentile(samples, 0.95):7.3f} ms  p99 {percentile(samples, 0.99):7.3f} ms"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--courses", type=int, default=2000)
+    parser.add_argument("--learners", type=int, default=100000)
+    parser.add_argument("--per-learner", type=int, default=8, help="most courses a learner enrolls in")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    print(f"🧪 Generating {args.courses:,} courses and {args.learners:,} learners...")
+    catalog, enrollments = make_catalog(args.courses, args.learners, args.per_learner)
+
+    start = time.perf_counter()
+    model = RecommenderModel.build(catalog, enrollments)
+    print(f"  model build: {time.perf_counter() - start:.2f}s from {len(enrollments):,} enrollments")
+
+    path = os.path.join(tempfile.mkdtemp(), "course_recommender.npz")
+    model.save(path)
+    start = time.perf_counter()
+    model = RecommenderModel.load(path)
+    print(f"  model file: {os.path.getsize(path) / 1024:.0f} KiB, loaded in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms ({model.stats()['similarities']:,} similarities)\n")
+
+    learners = []
+    for _ in range(ITERATIONS):
+        enrolled = random.sample(catalog, random.randint(0, args.per_learner))
+        completed = {course["id"] for course in enrolled if random.random() < 0.5}
+        learners.append(({course["id"]: 1.0 if course["id"] in completed else 0.5 for course in enrolled}, completed))
+    targets = [(random.choice(catalog)["id"], completed) for _, completed in learners]
+
+    print("⏱️  Uncached lookups:")
+    timed("recommendations (top 10)", lambda learner: model.recommend(learner[0], learner[1], 10), learners)
+    timed("learning path", lambda target: model.learning_path(target[0], target[1]), targets)
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
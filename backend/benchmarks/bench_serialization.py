@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Response Serialization Benchmark
+Per-request cost of turning Supabase rows into the JSON body of a list
+endpoint like GET /api/v1/users/?query=... (search_users), for result sizes
+of --sizes profiles:
+
+    emailstr + json    the old path: rows -> UserResponse(**row) with the
+                       email validator run on every stored email, then FastAPI
+                       validates the models against response_model again,
+                       dumps them to dicts and json.dumps the result
+    fastapi + json     the same without the email validator on reads
+    fastapi + orjson   the same, encoded by ORJSONResponse
+    model_response     rows -> UserResponse.model_validate(row) once, written
+                       straight to JSON by pydantic (app.utils.responses)
+
+The "request" column runs the same paths through a FastAPI app in-process
+over ASGI, so routing and response handling are included.
+
+Run from the backend directory:
+    python -m benchmarks.bench_serialization --sizes 20,50,200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from pydantic import EmailStr
+
+from app.schemas.user import UserResponse
+from app.utils.responses import model_response, orjson
+from benchmarks.fake_supabase import make_profiles
+
+class EmailValidatedUser(UserResponse):
+    """UserResponse as it was before reads stopped validating stored emails"""
+    email: EmailStr
+
+def best_of(function: Callable[[], Any], iterations: int, repeats: int) -> float:
+    """Best seconds per call over ``repeats`` runs of ``iterations`` calls"""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        best = min(best, (time.perf_counter() - start) / iterations)
+    return best
+
+def build_app(rows: List[Dict[str, Any]]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/emailstr", response_model=List[EmailValidatedUser], response_class=JSONResponse)
+    async def fastapi_emailstr():
+        return [EmailValidatedUser(**row) for row in rows]
+
+    @app.get("/json", response_model=List[UserResponse], response_class=JSONResponse)
+    async def fastapi_json():
+        return [UserResponse(**row) for row in rows]
+
+    @app.get("/orjson", response_model=List[UserResponse], response_class=ORJSONResponse)
+    async def fastapi_orjson():
+        return [UserResponse(**row) for row in rows]
+
+    @app.get("/model", response_model=List[UserResponse])
+    async def fast_path():
+        return model_response([UserResponse.model_validate(row) for row in rows], List[UserResponse])
+
+    return app
+
+async def drive(app: FastAPI, path: str, requests: int) -> float:
+    """Seconds per request over ``requests`` in-process ASGI calls"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"testserver")], "client": ("127.0.0.1", 50000), "server": ("testserver", 80),
+    }
+    body = {"type": "http.request", "body": b"", "more_body": False}
+
+    async def receive():
+        return body
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - start) / requests
+
+def bench_size(size: int, rows: List[Dict[str, Any]], iterations: int, repeats: int) -> None:
+    app = build_app(rows)
+    fields = {route.path: route.response_field for route in app.routes if isinstance(route, APIRoute)}
+    loop = asyncio.new_event_loop()
+
+    def fastapi_path(model, path: str, response_class) -> Callable[[], bytes]:
+        def run() -> bytes:
+            models = [model(**row) for row in rows]
+            content = loop.run_until_complete(serialize_response(field=fields[path], response_content=models))
+            return response_class(content).body
+        return run
+
+    def fast_path() -> bytes:
+        return model_response([UserResponse.model_validate(row) for row in rows], List[UserResponse]).body
+
+    paths = {
+        "emailstr + json": ("/emailstr", fastapi_path(EmailValidatedUser, "/emailstr", JSONResponse)),
+        "fastapi + json": ("/json", fastapi_path(UserResponse, "/json", JSONResponse)),
+        "fastapi + orjson": ("/orjson", fastapi_path(UserResponse, "/orjson", ORJSONResponse)),
+        "model_response": ("/model", fast_path),
+    }
+    if orjson is None:
+        del paths["fastapi + orjson"]
+    # Same document every way
+    expected = json.loads(fast_path())
+    assert all(json.loads(serialize()) == expected for _, serialize in paths.values())
+
+    print(f"\n  {size} profiles ({len(fast_path()):,} bytes)")
+    print(f"  {'':<20} {'serialize':>12} {'request':>12}")
+    baseline = None
+    for name, (path, serialize) in paths.items():
+        serialized = best_of(serialize, iterations, repeats)
+        asyncio.run(drive(app, path, 50))
+        request = min(asyncio.run(drive(app, path, iterations)) for _ in range(repeats))
+        baseline = baseline or request
+        print(f"  {name:<20} {serialized * 1e6:9.1f} µs {request * 1e6:9.1f} µs   {baseline / request:4.1f}x")
+    loop.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="20,50,200", help="comma-separated result sizes")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    profiles = make_profiles(max(sizes), seed=42)
+
+    print(f"🔍 Serializing search_users results, best of {args.repeats} x {args.iterations}"
+          f"{'' if orjson is not None else ' (orjson not installed)'}")
+    for size in sizes:
+        bench_size(size, profiles[:size], args.iterations, args.repeats)
+
+if __name__ == "__main__":
+    main()
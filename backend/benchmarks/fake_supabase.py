@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fake Supabase
+A local stand-in for the parts of PostgREST and GoTrue the auth and users
+API uses, so the API can be benchmarked without a Supabase project:
+
+    POST /auth/v1/token?grant_type=password     password sign-in
+    GET  /rest/v1/profiles                      eq filters, select, order, limit, keyset or=()
+    POST /rest/v1/rpc/search_profiles           prefix search over name and email
+    POST /rest/v1/rpc/autocomplete_profiles
+    POST /rest/v1/rpc/bulk_update_last_login
+
+Profiles are generated from --seed: user{N}@example.com for N < --users
+(students) and admin@example.com, all with password --password. Every
+request waits --latency-ms (plus up to --jitter-ms) before answering, to
+stand in for the network and database.
+
+Run from the backend directory:
+    python -m benchmarks.fake_supabase --port 54321 --users 1000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from faker import Faker
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+DEFAULT_PASSWORD = "benchmark-password"
+SKILLS = ["python", "react", "sql", "docker", "figma", "pitching", "ml", "go", "typescript", "aws"]
+
+def make_profiles(users: int, seed: int) -> List[Dict[str, Any]]:
+    fake = Faker()
+    Faker.seed(seed)
+    generator = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    profiles = []
+    for index in range(users + 1):
+        admin = index == users
+        created = (start + timedelta(minutes=index)).isoformat()
+        profiles.append({
+            "id": str(uuid.UUID(int=generator.getrandbits(128), version=4)),
+            "email": "admin@example.com" if admin else f"user{index}@example.com",
+            "name": fake.name(),
+            "role": "admin" if admin else "student",
+            "user_type": "student",
+            "avatar_url": None,
+            "bio": fake.sentence(nb_words=12),
+            "institution": fake.company(),
+            "location": fake.city(),
+            "linkedin_url": None,
+            "github_url": f"https://github.com/user{index}",
+            "portfolio_url": None,
+            "skills": generator.sample(SKILLS, 3),
+            "created_at": created,
+            "updated_at": created,
+            "last_login": None,
+            "is_active": True,
+            "email_confirmed": True,
+            "total_courses": generator.randint(0, 12),
+            "completed_courses": generator.randint(0, 5),
+            "total_hours": generator.randint(0, 200),
+            "hackathons_participated": generator.randint(0, 6),
+            "hackathons_won": generator.randint(0, 2),
+            "badges_earned": generator.randint(0, 10),
+            "skill_level": generator.choice(["beginner", "intermediate", "advanced"]),
+        })
+    return profiles
+
+def _error(status: int, code: str, message: str) -> JSONResponse:
+    return JSONResponse({"code": code, "details": None, "hint": None, "message": message}, status_code=status)
+
+class FakeSupabase:
+    def __init__(self, profiles: List[Dict[str, Any]], password: str, latency: float, jitter: float):
+        self.profiles = profiles
+        self.by_id = {profile["id"]: profile for profile in profiles}
+        self.by_email = {profile["email"]: profile for profile in profiles}
+        self.password = password
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+
+    async def _delay(self) -> None:
+        self.requests += 1
+        delay = self.latency + random.random() * self.jitter
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def root(self, request: Request) -> Response:
+        return Response(status_code=200)
+
+    async def token(self, request: Request) -> Response:
+        await self._delay()
+        body = await request.json()
+        user = self.by_email.get(body.get("email"))
+        if user is None or body.get("password") != self.password:
+            return JSONResponse(
+                {"error": "invalid_grant", "error_description": "Invalid login credentials"}, status_code=400
+            )
+        return JSONResponse({
+            "access_token": f"fake-access-{user['id']}",
+            "token_type": "bearer",
+            "expires_in": 3600,
+            "refresh_token": f"fake-refresh-{user['id']}",
+            "user": {
+                "id": user["id"],
+                "aud": "authenticated",
+                "role": "authenticated",
+                "email": user["email"],
+                "app_metadata": {"provider": "email"},
+                "user_metadata": {"name": user["name"]},
+                "created_at": user["created_at"],
+            },
+        })
+
+    def _filter(self, request: Request) -> List[Dict[str, Any]]:
+        # Primary key and unique email lookups use an index, like the database
+        for column, index in (("id", self.by_id), ("email", self.by_email)):
+            value = request.query_params.get(column, "")
+            if value.startswith("eq."):
+                row = index.get(value[3:])
+                rows = [row] if row is not None else []
+                break
+        else:
+            rows = self.profiles
+        for column, value in request.query_params.multi_items():
+            if column in ("select", "order", "limit", "offset"):
+                continue
+            if column == "or":
+                # The keyset cursor written by UserService.list_users
+                match = re.search(r'created_at\.gt\."([^"]+)".*id\.gt\.([0-9a-f-]+)', value)
+                if match:
+                    after = (match.group(1), match.group(2))
+                    rows = [row for row in rows if (row["created_at"], row["id"]) > after]
+                continue
+            if value.startswith("eq."):
+                rows = [row for row in rows if str(row.get(column)) == value[3:]]
+        return rows
+
+    async def profiles_table(self, request: Request) -> Response:
+        await self._delay()
+        rows = sorted(self._filter(request), key=lambda row: (row["created_at"], row["id"]))
+        limit = request.query_params.get("limit")
+        if limit is not None:
+            rows = rows[:int(limit)]
+        select = request.query_params.get("select", "*")
+        if select != "*":
+            columns = select.split(",")
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+        if "vnd.pgrst.object" in request.headers.get("accept", ""):
+            if len(rows) != 1:
+                return _error(406, "PGRST116", "JSON object requested, multiple (or no) rows returned")
+            return JSONResponse(rows[0])
+        return JSONResponse(rows)
+
+    def _search(self, query: str, role: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        words = query.lower().split()
+        matches = []
+        for row in self.profiles:
+            if role and row["role"] != role:
+                continue
+            haystack = re.split(r"[^a-z0-9]+", f"{row['name']} {row['email']}".lower())
+            if all(any(part.startswith(word) for part in haystack) for word in words):
+                matches.append(row)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+    async def rpc(self, request: Request) -> Response:
+        await self._delay()
+        name = request.path_params["name"]
+        params = json.loads(await request.body() or b"{}")
+        if name == "search_profiles":
+            return JSONResponse(self._search(
+                params.get("search_query", ""), params.get("role_filter"), params.get("result_limit", 20)
+            ))
+        if name == "autocomplete_profiles":
+            rows = self._search(params.get("prefix", ""), params.get("role_filter"), params.get("result_limit", 10))
+            return JSONResponse([{key: row[key] for key in ("id", "name", "email", "role")} for row in rows])
+        if name == "bulk_update_last_login":
+            for update in params.get("updates", []):
+                if update.get("id") in self.by_id:
+                    self.by_id[update["id"]]["last_login"] = update.get("last_login")
+            return Response(status_code=204)
+        return _error(404, "PGRST202", f"Could not find the function public.{name}")
+
+def create_app(users: int, seed: int, password: str, latency: float, jitter: float) -> Starlette:
+    fake = FakeSupabase(make_profiles(users, seed), password, latency, jitter)
+    app = Starlette(routes=[
+        Route("/rest/v1/", fake.root, methods=["GET", "HEAD"]),
+        Route("/rest/v1/profiles", fake.profiles_table, methods=["GET"]),
+        Route("/rest/v1/rpc/{name}", fake.rpc, methods=["POST"]),
+        Route("/auth/v1/token", fake.token, methods=["POST"]),
+    ])
+    app.state.fake = fake
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--latency-ms", type=float, default=20, help="added to every request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="random extra latency, up to this much")
+    args = parser.parse_args()
+    app = create_app(args.users, args.seed, args.password, args.latency_ms / 1000, args.jitter_ms / 1000)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
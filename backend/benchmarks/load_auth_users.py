@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auth and Users API Load Test
+Starts the fake Supabase (benchmarks.fake_supabase) with --latency-ms of
+injected latency and one uvicorn worker of the API pointed at it, then
+drives each scenario with --concurrency clients in a closed loop:
+
+    login          POST /api/v1/auth/login, cycling through the users
+    me             GET  /api/v1/auth/me
+    profile        GET  /api/v1/users/profile
+    list_users     GET  /api/v1/users/?limit=50 (admin)
+    search_users   GET  /api/v1/users/?query=<name prefix> (admin)
+
+Each scenario reports throughput and p50/p95/p99 latency. Results are saved
+as JSON (--output, by default benchmarks/results/auth_users-<time>.json);
+--compare prints the change against an earlier file and exits with status 1
+when a p95 grows or the throughput drops by more than --max-regression.
+
+Run from the backend directory:
+    python -m benchmarks.load_auth_users --concurrency 32 --requests 2000 --latency-ms 20
+    python -m benchmarks.load_auth_users --compare benchmarks/results/auth_users-20260101-120000.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.fake_supabase import DEFAULT_PASSWORD
+
+SCENARIOS = ("login", "me", "profile", "list_users", "search_users")
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# Students logged in up front whose tokens the authenticated scenarios use
+SESSIONS = 200
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+async def wait_until_up(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server at {url} did not start")
+            await asyncio.sleep(0.2)
+
+async def log_in(client: httpx.AsyncClient, email: str) -> str:
+    response = await client.post("/api/v1/auth/login", json={"email": email, "password": DEFAULT_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+Request = Tuple[str, str, Dict[str, Any]]
+
+def scenario_requests(name: str, users: int, tokens: List[str], admin_token: str) -> Callable[[int], Request]:
+    """The i-th request of a scenario as (method, url, httpx keyword arguments)"""
+    admin = {"headers": {"Authorization": f"Bearer {admin_token}"}}
+    prefixes = ["a", "ma", "jo", "user1", "da", "li", "user2", "st", "ch", "ro"]
+    if name == "login":
+        return lambda i: ("POST", "/api/v1/auth/login",
+                          {"json": {"email": f"user{i % users}@example.com", "password": DEFAULT_PASSWORD}})
+    if name == "me":
+        return lambda i: ("GET", "/api/v1/auth/me", {"headers": {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}})
+    if name == "profile":
+        return lambda i: ("GET", "/api/v1/users/profile",
+                          {"headers": {"Authorization": f"Bearer {tokens[i % len(tokens)]}"}})
+    if name == "list_users":
+        return lambda i: ("GET", "/api/v1/users/?limit=50", admin)
+    if name == "search_users":
+        return lambda i: ("GET", f"/api/v1/users/?query={prefixes[i % len(prefixes)]}&limit=20", admin)
+    raise ValueError(f"Unknown scenario: {name}")
+
+async def run_scenario(client: httpx.AsyncClient, make_request: Callable[[int], Request], requests: int,
+                       concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    counter = iter(range(requests))
+
+    async def worker():
+        for index in counter:
+            method, url, kwargs = make_request(index)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, **kwargs)
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    ok = sum(count for status, count in statuses.items() if status.startswith("2"))
+    return {
+        "requests": len(latencies),
+        "errors": len(latencies) - ok,
+        "statuses": statuses,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(ok / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p50_ms": round(percentile(latencies, 0.50), 2),
+        "p95_ms": round(percentile(latencies, 0.95), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(max(latencies), 2),
+    }
+
+async def run(args, url: str) -> Dict[str, Dict[str, Any]]:
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        admin_token = await log_in(client, "admin@example.com")
+        sessions = min(SESSIONS, args.users)
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def student(index: int) -> str:
+            async with semaphore:
+                return await log_in(client, f"user{index}@example.com")
+
+        tokens = await asyncio.gather(*(student(index) for index in range(sessions)))
+        results = {}
+        for name in args.scenarios:
+            make_request = scenario_requests(name, args.users, tokens, admin_token)
+            # Warm connections, caches and code paths before measuring
+            await run_scenario(client, make_request, args.warmup, args.concurrency)
+            result = results[name] = await run_scenario(client, make_request, args.requests, args.concurrency)
+            print(
+                f"  {name:<14} {result['throughput_rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+                f"p95 {result['p95_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  errors {result['errors']}"
+            )
+        return results
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(baseline_path: str, results: Dict[str, Dict[str, Any]], max_regression: float) -> bool:
+    """Print the change against a saved run; True if nothing regressed past max_regression"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\n📊 Compared with {baseline_path} ({baseline.get('git_commit') or 'unknown commit'})\n")
+    passed = True
+    for name, result in results.items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            print(f"  {name:<14} not in baseline")
+            continue
+        throughput = result["throughput_rps"] / before["throughput_rps"] - 1 if before["throughput_rps"] else 0.0
+        p95 = result["p95_ms"] / before["p95_ms"] - 1 if before["p95_ms"] else 0.0
+        p99 = result["p99_ms"] / before["p99_ms"] - 1 if before["p99_ms"] else 0.0
+        regressed = throughput < -max_regression or p95 > max_regression
+        passed = passed and not regressed
+        print(f"  {name:<14} throughput {throughput:+7.1%}  p95 {p95:+7.1%}  p99 {p99:+7.1%}"
+              f"{'  ❌ regression' if regressed else ''}")
+    return passed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests per scenario")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=20, help="injected Supabase latency")
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--supabase-port", type=int, default=54321)
+    parser.add_argument("--output", help="results file (default benchmarks/results/auth_users-<time>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare with")
+    parser.add_argument("--max-regression", type=float, default=0.10)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+    random.seed(args.seed)
+
+    supabase_url = f"http://127.0.0.1:{args.supabase_port}"
+    url = f"http://127.0.0.1:{args.port}"
+    env = {
+        **os.environ,
+        "SUPABASE_URL": supabase_url,
+        "SUPABASE_ANON_KEY": "benchmark-anon-key",
+        "SUPABASE_SERVICE_ROLE_KEY": "benchmark-service-key",
+        "JWT_SECRET_KEY": "benchmark-secret",
+        "CACHE_BACKEND": "memory",
+        "ANALYTICS_ROLLUP_SECONDS": "0",
+        "GITHUB_SYNC_POLL_SECONDS": "0",
+    }
+    # The API's background jobs find no courses or leaderboards in the fake; keep their noise out of the report
+    log = tempfile.NamedTemporaryFile(prefix="load_auth_users-", suffix=".log", delete=False)
+    servers = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fake_supabase", "--port", str(args.supabase_port),
+             "--users", str(args.users), "--seed", str(args.seed),
+             "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms)],
+            stdout=log, stderr=subprocess.STDOUT,
+        ),
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+            env=env, stdout=log, stderr=subprocess.STDOUT,
+        ),
+    ]
+    try:
+        asyncio.run(wait_until_up(f"{supabase_url}/rest/v1/"))
+        asyncio.run(wait_until_up(f"{url}/health"))
+        print(f"🚀 {args.concurrency} concurrent clients, {args.requests} requests per scenario, "
+              f"{args.latency_ms:.0f} ms (+{args.jitter_ms:.0f} ms jitter) Supabase latency\n")
+        results = asyncio.run(run(args, url))
+    finally:
+        for server in servers:
+            server.terminate()
+            server.wait()
+    print(f"\n  server output: {log.name}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"auth_users-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({
+            "benchmark": "auth_users",
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "scenarios": results,
+        }, f, indent=2)
+    print(f"  results: {output}")
+
+    if args.compare and not compare(args.compare, results, args.max_regression):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GitHub Import Load Test
+Syncs many users' repositories through the GitHub import pipeline against a
+local stub of the GitHub REST API (started in-process on --port), and
+reports throughput in repositories synced per minute. The stub paginates
+like GitHub, answers If-None-Match with 304, adds --latency-ms to every
+request, and enforces a rate limit of --rate-limit full responses per
+--window-seconds (304s are free, as on GitHub), answering 403 with
+x-ratelimit-remaining: 0 once it is used up.
+
+Three passes share one on-disk response cache, each with a fresh client as
+after a restart:
+
+    cold      empty cache: every page is downloaded and written
+    warm      nothing changed: every page is a 304, nothing is written
+    churn     --churn of the users pushed new commits
+
+Run from the backend directory:
+    python -m benchmarks.load_github_sync --users 300 --workers 16 --max-concurrency 8
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from app.services.github_sync_service import GitHubSync, SyncStore
+from app.utils.github import GitHubClient, ResponseCache
+
+LANGUAGES = ["Python", "TypeScript", "JavaScript", "Go", "Rust", "Java", None]
+TOPICS = ["hackathon", "machine-learning", "react", "fastapi", "cli", "game", "api", "education"]
+
+
+class StubGitHub:
+    def __init__(self, users: int, max_repos: int, latency: float, rate_limit: int, window: float, per_page: int):
+        self.latency = latency
+        self.rate_limit = rate_limit
+        self.window = window
+        self.per_page = per_page
+        self.repos: Dict[str, List[Dict[str, Any]]] = {}
+        self.versions: Dict[str, int] = {}
+        for user in range(users):
+            login = f"hacker{user}"
+            self.versions[login] = 0
+            self.repos[login] = [
+                {
+                    "id": user * 10000 + number,
+                    "name": f"project-{number}",
+                    "description": f"Project {number} by {login}",
+                    "html_url": f"https://github.com/{login}/project-{number}",
+                    "homepage": f"https://{login}.dev/{number}" if number % 4 == 0 else "",
+                    "language": random.choice(LANGUAGES),
+                    "topics": random.sample(TOPICS, 2),
+                    "fork": number % 10 == 9,
+                }
+                for number in range(random.randint(1, max_repos))
+            ]
+        self.window_start = time.time()
+        self.used = 0
+        self.requests = 0
+        self.not_modified = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    def push(self, login: str) -> None:
+        self.versions[login] += 1
+        self.repos[login][0]["description"] = f"Updated {self.versions[login]} times"
+
+    async def list_repos(self, request: Request) -> Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            return self._page(request)
+        finally:
+            self.in_flight -= 1
+
+    def _page(self, request: Request) -> Response:
+        login = request.path_params["login"]
+        if login not in self.repos:
+            return JSONResponse({"message": "Not Found"}, status_code=404)
+        now = time.time()
+        if now - self.window_start >= self.window:
+            self.window_start, self.used = now, 0
+        reset = str(int(self.window_start + self.window))
+        if self.used >= self.rate_limit:
+            self.rejected += 1
+            return JSONResponse(
+                {"message": "API rate limit exceeded"},
+                status_code=403,
+                headers={"x-ratelimit-remaining": "0", "x-ratelimit-reset": reset},
+            )
+        page = int(request.query_params.get("page", 1))
+        per_page = min(int(request.query_params.get("per_page", 30)), self.per_page)
+        repos = self.repos[login]
+        etag = '"' + hashlib.sha256(f"{login}:{self.versions[login]}:{page}:{per_page}".encode()).hexdigest()[:32] + '"'
+        if request.headers.get("if-none-match") == etag:
+            self.not_modified += 1
+            return Response(status_code=304, headers={"etag": etag})
+        self.used += 1
+        headers = {
+            "etag": etag,
+            "x-ratelimit-remaining": str(self.rate_limit - self.used),
+            "x-ratelimit-reset": reset,
+        }
+        if page * per_page < len(repos):
+            next_url = str(request.url.include_query_params(page=page + 1, per_page=per_page))
+            headers["link"] = f'<{next_url}>; rel="next"'
+        return JSONResponse(repos[(page - 1) * per_page:page * per_page], headers=headers)
+
+
+class MemoryStore(SyncStore):
+    def __init__(self):
+        self.projects: Dict[Any, Dict[str, Any]] = {}
+        self.states: Dict[str, Dict[str, Any]] = {}
+        self.writes = 0
+
+    async def save_projects(self, user_id: str, rows: List[Dict[str, Any]]) -> None:
+        self.writes += 1
+        for row in rows:
+            self.projects[(user_id, row["github_repo_id"])] = row
+
+    async def record(self, user_id: str, state: Dict[str, Any]) -> None:
+        self.states.setdefault(user_id, {}).update(state)
+
+    async def get_state(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self.states.get(user_id)
+
+
+async def sync_pass(label: str, stub: StubGitHub, args, cache_dir: str, store: MemoryStore) -> None:
+    client = GitHubClient(
+        base_url=f"http://127.0.0.1:{args.port}",
+        cache=ResponseCache(cache_dir),
+        max_concurrency=args.max_concurrency,
+    )
+    pipeline = GitHubSync(client=client, store=store, max_repos=args.max_repos)
+    workers = asyncio.Semaphore(args.workers)
+    checked = 0
+    requests_before, not_modified_before, rejected_before = stub.requests, stub.not_modified, stub.rejected
+    stub.peak = 0
+
+    async def sync(login: str) -> None:
+        nonlocal checked
+        async with workers:
+            await pipeline.sync_user(login, f"https://github.com/{login}")
+            checked += len([repo for repo in stub.repos[login][:args.max_repos] if not repo["fork"]])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sync(login) for login in stub.repos))
+    elapsed = time.perf_counter() - start
+    await client.aclose()
+    stats = pipeline.stats()
+    print(
+        f"  {label:<6} {elapsed:6.1f} s  {checked / elapsed * 60:9.0f} repos/min  "
+        f"written {stats['repos_imported']:6d}  requests {stub.requests - requests_before:5d}  "
+        f"304s {stub.not_modified - not_modified_before:5d}  "
+        f"rate limited {stub.rejected - rejected_before:4d}  "
+        f"peak concurrency {stub.peak}/{args.max_concurrency}  failed users {stats['users_failed']}"
+    )
+
+
+async def run(args) -> None:
+    random.seed(args.seed)
+    stub = StubGitHub(
+        args.users, args.repos, args.latency_ms / 1000, args.rate_limit, args.window_seconds, 100
+    )
+    app = Starlette(routes=[Route("/users/{login}/repos", stub.list_repos)])
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning", lifespan="off"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    cache_dir = tempfile.mkdtemp(prefix="github-cache-")
+    store = MemoryStore()
+    total = sum(len(repos) for repos in stub.repos.values())
+    print(f"🐙 {args.users} users, {total} repositories, {args.workers} workers, "
+          f"{args.max_concurrency} requests in flight, {args.latency_ms:.0f} ms per request, "
+          f"{args.rate_limit} requests per {args.window_seconds:.0f} s\n")
+    try:
+        await sync_pass("cold", stub, args, cache_dir, store)
+        await sync_pass("warm", stub, args, cache_dir, store)
+        for login in random.sample(list(stub.repos), int(args.users * args.churn)):
+            stub.push(login)
+        await sync_pass("churn", stub, args, cache_dir, store)
+    finally:
+        server.should_exit = True
+        await serving
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    print(f"\n  {len(store.projects)} projects stored, {store.writes} batch writes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--repos", type=int, default=300, help="most repositories per user")
+    parser.add_argument("--max-repos", type=int, default=300, help="repositories imported per user")
+    parser.add_argument("--workers", type=int, default=16, help="users synced at once")
+    parser.add_argument("--max-concurrency", type=int, default=8, help="requests in flight to the host")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--rate-limit", type=int, default=150, help="full responses per window")
+    parser.add_argument("--window-seconds", type=float, default=2)
+    parser.add_argument("--churn", type=float, default=0.2, help="share of users changed before the last pass")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
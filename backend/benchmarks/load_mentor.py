@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI Mentor Load Test
+Drives the mentor service with many concurrent learners asking a mix of new,
+repeated and reworded questions, against the fake provider (which behaves
+like a batching inference server: a fixed first-token latency per batch,
+then one token per sequence per step). Each configuration reports
+throughput, time to first token, and cache hit rate:
+
+    no batching, no cache     one question per model call
+    batching, no cache        up to --batch-size questions per model call
+    batching + prompt cache   repeated and reworded questions skip the model
+
+Run from the backend directory:
+    python -m benchmarks.load_mentor --learners 100 --questions 2
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from app.services.mentor_service import MentorService
+from app.utils.llm import FakeProvider
+
+TOPICS = [
+    "deploy a FastAPI app", "structure a React project", "write a good hackathon pitch", "pick a database",
+    "use Git branches in a team", "debug a CORS error", "train a small image classifier", "design a REST API",
+    "write unit tests in Python", "speed up a slow SQL query", "add authentication to my app", "use Docker",
+    "scope a 24 hour project", "present a demo to judges", "split work in a team of four", "learn TypeScript",
+]
+PHRASINGS = ["How do I {}?", "how do i {}", "What is the best way to {}?", "Can you explain how to {}",
+             "Please help me {}.", "HOW DO I {}??"]
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+def make_questions(learners: int, per_learner: int, unique: float):
+    questions = []
+    for learner in range(learners):
+        asked = []
+        for number in range(per_learner):
+            if random.random() < unique:
+                # Specific to this learner: never asked by anyone else
+                asked.append(f"How do I {random.choice(TOPICS)} for project {learner}-{number}?")
+            else:
+                asked.append(random.choice(PHRASINGS).format(random.choice(TOPICS)))
+        questions.append(asked)
+    return questions
+
+async def run(label, service: MentorService, questions, think_seconds: float) -> None:
+    ttfts, totals = [], []
+
+    async def learner(asked):
+        await asyncio.sleep(random.random() * think_seconds)
+        for question in asked:
+            start = time.perf_counter()
+            answer = service.ask(question)
+            first = None
+            async for _ in answer.chunks:
+                if first is None:
+                    first = time.perf_counter() - start
+            ttfts.append(first * 1000)
+            totals.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(random.random() * think_seconds)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(learner(asked) for asked in questions))
+    elapsed = time.perf_counter() - start
+    stats = service.stats()
+    print(
+        f"  {label:<26} {len(ttfts) / elapsed:7.1f} answers/s  "
+        f"TTFT p50 {statistics.median(ttfts):6.0f} ms  p95 {percentile(ttfts, 0.95):6.0f} ms  "
+        f"full answer p95 {percentile(totals, 0.95):6.0f} ms  "
+        f"model calls {stats['provider']['sequences']:4d}  "
+        f"hit rate {stats['cache_hit_rate']:.0%}"
+    )
+    await service.aclose()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--learners", type=int, default=100)
+    parser.add_argument("--questions", type=int, default=2, help="questions per learner")
+    parser.add_argument("--unique", type=float, default=0.5, help="share of questions nobody else asks")
+    parser.add_argument("--concurrency", type=int, default=4, help="batches generating at once")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--first-token-ms", type=float, default=300)
+    parser.add_argument("--token-ms", type=float, default=20)
+    parser.add_argument("--think-seconds", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    questions = make_questions(args.learners, args.questions, args.unique)
+
+    def service(batch_size: int, cache: bool) -> MentorService:
+        return MentorService(
+            provider=FakeProvider(first_token_seconds=args.first_token_ms / 1000, token_seconds=args.token_ms / 1000),
+            max_concurrency=args.concurrency,
+            batch_size=batch_size,
+            max_pending=10 ** 6,
+            cache_size=10000 if cache else 0,
+            semantic_cache_size=2000 if cache else 0,
+        )
+
+    print(f"🤖 {args.learners} learners x {args.questions} questions, {args.concurrency} concurrent model calls, "
+          f"{args.first_token_ms:.0f} ms to first token\n")
+    for label, batch_size, cache in (
+        ("no batching, no cache", 1, False),
+        ("batching, no cache", args.batch_size, False),
+        ("batching + prompt cache", args.batch_size, True),
+    ):
+        random.seed(args.seed)
+        asyncio.run(run(label, service(batch_size, cache), questions, args.think_seconds))
+
+if __name__ == "__main__":
+    main()
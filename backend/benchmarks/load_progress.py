@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Progress Ingestion Load Test
+Drives POST /api/v1/courses/progress in-process with many simulated learners
+and reports sustained events/sec, coalescing and backpressure. The bulk write
+is replaced by a sleep of --flush-latency-ms so no database is needed.
+
+Run from the backend directory:
+    python -m benchmarks.load_progress --learners 2000 --concurrency 200 --seconds 10
+    # Saturate the queue to see 429s:
+    python -m benchmarks.load_progress --flush-latency-ms 2000 --max-pending 500
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from app.main import app
+from app.services import progress_service
+from app.utils.auth import create_access_token
+
+HEARTBEAT_SECONDS = 5
+
+class Learner:
+    def __init__(self, index: int, courses):
+        self.token = create_access_token(
+            {"sub": str(uuid.uuid4()), "email": f"learner{index}@example.com", "role": "student"},
+            expires_delta=timedelta(hours=1),
+        )
+        self.course_id = random.choice(courses)
+        self.progress = 0
+        self.clock = datetime.now(timezone.utc)
+
+    def heartbeats(self, count: int):
+        events = []
+        for _ in range(count):
+            self.clock += timedelta(seconds=HEARTBEAT_SECONDS)
+            self.progress = min(100, self.progress + random.randint(0, 1))
+            events.append({
+                "course_id": self.course_id,
+                "event_id": uuid.uuid4().hex,
+                "occurred_at": self.clock.isoformat(),
+                "progress_percentage": self.progress,
+                "seconds_watched": HEARTBEAT_SECONDS,
+                "current_lesson": f"lesson-{self.progress // 10}",
+            })
+        return events
+
+async def run(args):
+    written = []
+
+    async def fake_flush(rows):
+        await asyncio.sleep(args.flush_latency_ms / 1000)
+        written.append(len(rows))
+
+    writer = progress_service.progress_writer
+    writer.flush_fn = fake_flush
+    writer.max_pending = args.max_pending
+    courses = [str(uuid.uuid4()) for _ in range(50)]
+    learners = [Learner(i, courses) for i in range(args.learners)]
+    latencies, statuses = [], {}
+    accepted = duplicates = 0
+    max_depth = 0
+    deadline = time.perf_counter() + args.seconds
+
+    async with httpx.AsyncClient(app=app, base_url="http://test") as client:
+        async def worker():
+            nonlocal accepted, duplicates, max_depth
+            while time.perf_counter() < deadline:
+                learner = random.choice(learners)
+                events = learner.heartbeats(args.batch)
+                if args.retry_rate and random.random() < args.retry_rate:
+                    events += events[: len(events) // 2]  # a client resending part of a batch
+                start = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/courses/progress",
+                    json={"events": events},
+                    headers={"Authorization": f"Bearer {learner.token}"},
+                )
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                if response.status_code == 202:
+                    body = response.json()
+                    accepted += body["accepted"]
+                    duplicates += body["duplicates"]
+                max_depth = max(max_depth, writer.depth)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+        await writer.drain()
+
+    latencies.sort()
+    print(f"  Requests:           {sum(statuses.values()):,} in {elapsed:.1f}s  {statuses}")
+    print(f"  Accepted events:    {accepted:,}  ({accepted / elapsed:,.0f} events/s sustained)")
+    print(f"  Duplicates dropped: {duplicates:,}")
+    # In-process requests run back to back, so this is handler time, not queueing
+    print(f"  Handler time:       p50 {statistics.median(latencies):.2f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99) - 1]:.2f} ms")
+    print(f"  Bulk writes:        {len(written):,} flushes, {sum(written):,} enrollment rows "
+          f"({accepted / max(sum(written), 1):.1f} events per row)")
+    print(f"  Max queue depth:    {max_depth:,} / {args.max_pending:,}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--learners", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--batch", type=int, default=6, help="heartbeats per request")
+    parser.add_argument("--retry-rate", type=float, default=0.05, help="share of requests resending events")
+    parser.add_argument("--flush-latency-ms", type=float, default=50, help="simulated bulk upsert time")
+    parser.add_argument("--max-pending", type=int, default=progress_service.PROGRESS_MAX_PENDING)
+    args = parser.parse_args()
+
+    print("📈 Progress Ingestion Load Test")
+    print("=" * 60)
+    print(f"  {args.learners} learners, {args.concurrency} concurrent clients, "
+          f"{args.batch} heartbeats/request, {args.flush_latency_ms:.0f} ms per bulk write\n")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
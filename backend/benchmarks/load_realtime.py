@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Realtime Hub Load Test
+Opens thousands of WebSocket connections spread over hackathon channels,
+has one client per channel publish messages, and reports connect time,
+fan-out latency (publish to receipt on every other client) and deliveries
+per second. --slow adds clients that stop reading, to show that the bounded
+send queues keep them from delaying everyone else.
+
+By default a single uvicorn worker is started on --port, with the per-
+connection publish limit lifted; pass --url to target a running server
+instead (it must share JWT_SECRET_KEY).
+
+Run from the backend directory:
+    python -m benchmarks.load_realtime --connections 2000 --channels 20 --messages 50
+    python -m benchmarks.load_realtime --connections 2000 --slow 100
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import socket as socketlib
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import timedelta
+
+import httpx
+import websockets
+
+from app.utils.auth import create_access_token
+
+def token(index: int) -> str:
+    # Admins may join any hackathon channel, so the test needs no participants in the database
+    return create_access_token(
+        {"sub": str(uuid.uuid4()), "email": f"hacker{index}@example.com", "role": "admin"},
+        expires_delta=timedelta(hours=1),
+    )
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+async def wait_until_up(url: str, timeout: float = 20) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(f"{url}/health")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server at {url} did not start")
+            await asyncio.sleep(0.2)
+
+async def run(args, url: str) -> None:
+    ws_url = url.replace("http", "ws", 1)
+    parsed = httpx.URL(url)
+    host, port = parsed.host, parsed.port or 80
+    channels = [str(uuid.uuid4()) for _ in range(args.channels)]
+    connect_times, latencies = [], []
+    received = 0
+    expected = args.messages * (args.connections // args.channels - 1) * args.channels
+    limit = asyncio.Semaphore(200)
+
+    async def connect(index: int):
+        async with limit:
+            start = time.perf_counter()
+            socket = await websockets.connect(
+                f"{ws_url}/api/v1/hackathons/{channels[index % args.channels]}/ws",
+                subprotocols=["bearer", token(index)],
+                ping_interval=None,
+            )
+            connect_times.append((time.perf_counter() - start) * 1000)
+            return socket
+
+    async def connect_stalled(index: int):
+        """Handshake by hand, then never read, behind a small receive window (a stalled
+        mobile link): the server's writes back up instead of filling kernel buffers"""
+        sock = socketlib.socket(socketlib.AF_INET, socketlib.SOCK_STREAM)
+        sock.setsockopt(socketlib.SOL_SOCKET, socketlib.SO_RCVBUF, 4096)
+        sock.setblocking(False)
+        await asyncio.get_running_loop().sock_connect(sock, (host, port))
+        reader, writer = await asyncio.open_connection(sock=sock)
+        writer.write((
+            f"GET /api/v1/hackathons/{channels[index % args.channels]}/ws HTTP/1.1\r\n"
+            f"Host: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Protocol: bearer, {token(index)}\r\n"
+            f"Sec-WebSocket-Key: {base64.b64encode(os.urandom(16)).decode()}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+        ).encode())
+        await reader.readuntil(b"\r\n\r\n")
+        return reader, writer
+
+    async def was_disconnected(reader) -> bool:
+        # Read what the kernel buffered; EOF (or a reset) means the server gave up on us
+        try:
+            while await asyncio.wait_for(reader.read(1 << 20), timeout=10):
+                pass
+        except asyncio.TimeoutError:
+            return False
+        except ConnectionError:
+            pass
+        return True
+
+    async def listen(socket, done: asyncio.Event):
+        nonlocal received
+        async for raw in socket:
+            message = json.loads(raw)
+            if message.get("type") != "message":
+                continue
+            latencies.append((time.monotonic() - message["data"]["sent"]) * 1000)
+            received += 1
+            if received >= expected:
+                done.set()
+
+    async def drain(socket):
+        async for _ in socket:
+            pass
+
+    print(f"🔌 Opening {args.connections:,} connections over {args.channels} channels (+{args.slow} slow)...")
+    started = time.perf_counter()
+    sockets = await asyncio.gather(*(connect(i) for i in range(args.connections)))
+    slow = await asyncio.gather(*(connect_stalled(i) for i in range(args.slow)))
+    print(f"  connected in {time.perf_counter() - started:.1f}s, "
+          f"p50 {statistics.median(connect_times):.1f} ms, p99 {percentile(connect_times, 0.99):.1f} ms\n")
+
+    senders = sockets[: args.channels]
+    done = asyncio.Event()
+    listeners = [asyncio.create_task(listen(socket, done)) for socket in sockets[args.channels:]]
+    # Senders also receive their own channel's messages
+    listeners += [asyncio.create_task(drain(socket)) for socket in senders]
+
+    print(f"📣 Publishing {args.messages} messages of {args.payload_bytes} B per channel every {args.interval_ms} ms...")
+    padding = "x" * args.payload_bytes
+    started = time.perf_counter()
+    for sequence in range(args.messages):
+        sent = time.monotonic()
+        await asyncio.gather(*(
+            socket.send(json.dumps({"type": "message", "data": {"sent": sent, "sequence": sequence, "text": padding}}))
+            for socket in senders
+        ))
+        await asyncio.sleep(args.interval_ms / 1000)
+    try:
+        await asyncio.wait_for(done.wait(), timeout=args.timeout)
+    except asyncio.TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started
+
+    print(f"  {received:,}/{expected:,} deliveries to reading clients in {elapsed:.1f}s "
+          f"({received / elapsed:,.0f}/s)")
+    if latencies:
+        print(f"  fan-out latency p50 {statistics.median(latencies):.1f} ms  "
+              f"p95 {percentile(latencies, 0.95):.1f} ms  p99 {percentile(latencies, 0.99):.1f} ms")
+    if slow:
+        closed = sum(await asyncio.gather(*(was_disconnected(reader) for reader, _ in slow)))
+        print(f"  slow clients disconnected by the server: {closed}/{len(slow)}")
+
+    for task in listeners:
+        task.cancel()
+    for _, writer in slow:
+        writer.close()
+    await asyncio.gather(*(socket.close() for socket in sockets), return_exceptions=True)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=50, help="messages published per channel")
+    parser.add_argument("--interval-ms", type=int, default=100)
+    parser.add_argument("--payload-bytes", type=int, default=100)
+    parser.add_argument("--slow", type=int, default=0, help="extra clients that never read")
+    parser.add_argument("--slow-consumer", choices=["drop", "disconnect"], default="disconnect")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="target a running server instead of starting one")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        url = f"http://127.0.0.1:{args.port}"
+        env = {
+            **os.environ, "REALTIME_SLOW_CONSUMER": args.slow_consumer, "REALTIME_SEND_QUEUE_SIZE": "64",
+            "REALTIME_MESSAGES_PER_SECOND": "1000", "REALTIME_MESSAGE_BURST": "1000",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+            env=env,
+        )
+    try:
+        asyncio.run(wait_until_up(url))
+        asyncio.run(run(args, url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Course Recommender Build
+Precomputes course-course similarities (co-enrollment and tags) and the
+prerequisite order from published courses and enrollments, and writes them
+to RECOMMENDER_MODEL_PATH. Running API workers pick up the new file within
+RECOMMENDER_RELOAD_SECONDS. Run it on a schedule (e.g. nightly):
+
+    cd backend && python build_recommendations.py
+"""
+
+import asyncio
+import time
+
+from app.services.recommendation_service import CourseRecommender
+from app.utils.database import db
+
+async def main():
+    recommender = CourseRecommender()
+    print("🧭 Building course recommendations...")
+    start = time.perf_counter()
+    try:
+        model = await recommender.rebuild()
+        elapsed = time.perf_counter() - start
+        stats = model.stats()
+        print(f"✅ Model built in {elapsed:.2f}s: {stats['courses']} course(s), "
+              f"{stats['similarities']} similarities, {stats['prerequisites']} prerequisite link(s)")
+        print(f"   Saved to {recommender.model_path}")
+    except Exception as e:
+        print(f"❌ Build failed: {e}")
+    finally:
+        await db.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
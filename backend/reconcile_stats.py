@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profile Statistics Reconciliation Job
+Recomputes the counter columns on profiles from course_enrollments,
+team_members and achievements, repairing any drift from the incremental
+triggers. Schedule it (e.g. nightly via cron) or run it by hand:
+
+    cd backend && python reconcile_stats.py
+"""
+
+import asyncio
+import time
+
+from app.services.user_service import UserService
+from app.utils.database import db
+
+async def main():
+    print("🔍 Reconciling profile statistics...")
+    start = time.perf_counter()
+    try:
+        repaired = await UserService().reconcile_profile_stats()
+        elapsed = time.perf_counter() - start
+        print(f"✅ Reconciliation finished in {elapsed:.2f}s, {repaired} profile(s) repaired")
+    except Exception as e:
+        print(f"❌ Reconciliation failed: {e}")
+    finally:
+        await db.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analytics Rollup Job
+Folds user_progress rows added since the last run into the hourly and daily
+rollups read by the analytics dashboards. The API does this in the background
+every ANALYTICS_ROLLUP_SECONDS; run it by hand to backfill or catch up:
+
+    cd backend && python rollup_analytics.py
+"""
+
+import asyncio
+import time
+
+from app.services.analytics_service import AnalyticsService
+from app.utils.database import db
+
+async def main():
+    print("📊 Rolling up analytics...")
+    start = time.perf_counter()
+    try:
+        consumed = await AnalyticsService().run_rollup()
+        elapsed = time.perf_counter() - start
+        print(f"✅ Rollup finished in {elapsed:.2f}s, {consumed} event(s) consumed")
+    except Exception as e:
+        print(f"❌ Rollup failed: {e}")
+    finally:
+        await db.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -27,6 +27,7 @@ CREATE TABLE IF NOT EXISTS profiles (
     linkedin_url TEXT,
     github_url TEXT,
     portfolio_url TEXT,
+    skills TEXT[] NOT NULL DEFAULT '{}', -- Technologies the user works with, used for team matching
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     last_login TIMESTAMP WITH TIME ZONE,
@@ -37,6 +38,7 @@ CREATE TABLE IF NOT EXISTS profiles (
     total_courses INTEGER DEFAULT 0,
     completed_courses INTEGER DEFAULT 0,
     total_hours INTEGER DEFAULT 0,
+    total_minutes INTEGER DEFAULT 0, -- Exact time behind total_hours
     hackathons_participated INTEGER DEFAULT 0,
     hackathons_won INTEGER DEFAULT 0,
     badges_earned INTEGER DEFAULT 0,
@@ -45,6 +47,10 @@ CREATE TABLE IF NOT EXISTS profiles (
     PRIMARY KEY (id)
 );
 
+-- Columns added after the initial release
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS total_minutes INTEGER DEFAULT 0;
+ALTER TABLE profiles ADD COLUMN IF NOT EXISTS skills TEXT[] NOT NULL DEFAULT '{}';
+
 -- Enable Row Level Security
 ALTER TABLE profiles ENABLE ROW LEVEL SECURITY;
 
@@ -118,10 +124,16 @@ CREATE TABLE IF NOT EXISTS course_enrollments (
     progress_percentage INTEGER DEFAULT 0 CHECK (progress_percentage >= 0 AND progress_percentage <= 100),
     current_lesson TEXT,
     time_spent_minutes INTEGER DEFAULT 0,
+    time_spent_seconds INTEGER DEFAULT 0, -- Heartbeat time, carried into time_spent_minutes
+    last_activity_at TIMESTAMP WITH TIME ZONE,
 
     UNIQUE(user_id, course_id)
 );
 
+-- Columns added after the initial release
+ALTER TABLE course_enrollments ADD COLUMN IF NOT EXISTS time_spent_seconds INTEGER DEFAULT 0;
+ALTER TABLE course_enrollments ADD COLUMN IF NOT EXISTS last_activity_at TIMESTAMP WITH TIME ZONE;
+
 -- Enable RLS
 ALTER TABLE course_enrollments ENABLE ROW LEVEL SECURITY;
 
@@ -223,6 +235,28 @@ CREATE TABLE IF NOT EXISTS team_members (
     UNIQUE(team_id, user_id)
 );
 
+-- Participants registered for a hackathon; looking_for_team puts them in the
+-- pool that team matching recommends to teams
+CREATE TABLE IF NOT EXISTS hackathon_participants (
+    hackathon_id UUID REFERENCES hackathons(id) ON DELETE CASCADE,
+    user_id UUID REFERENCES profiles(id) ON DELETE CASCADE,
+    looking_for_team BOOLEAN DEFAULT TRUE,
+    registered_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+
+    PRIMARY KEY (hackathon_id, user_id)
+);
+
+ALTER TABLE hackathon_participants ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Anyone can view hackathon participants" ON hackathon_participants;
+DROP POLICY IF EXISTS "Users can manage their own registrations" ON hackathon_participants;
+
+CREATE POLICY "Anyone can view hackathon participants" ON hackathon_participants
+    FOR SELECT USING (TRUE);
+
+CREATE POLICY "Users can manage their own registrations" ON hackathon_participants
+    FOR ALL USING (auth.uid() = user_id);
+
 -- =========================================
 -- 7. PORTFOLIO PROJECTS
 -- =========================================
@@ -240,10 +274,14 @@ CREATE TABLE IF NOT EXISTS portfolio_projects (
     project_type TEXT DEFAULT 'personal', -- personal, hackathon, academic
     hackathon_id UUID REFERENCES hackathons(id), -- If it's a hackathon project
     team_id UUID REFERENCES teams(id), -- If it's a team project
+    github_repo_id BIGINT, -- Set on projects imported from GitHub
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
+-- Columns added after the initial release
+ALTER TABLE portfolio_projects ADD COLUMN IF NOT EXISTS github_repo_id BIGINT;
+
 -- Enable RLS
 ALTER TABLE portfolio_projects ENABLE ROW LEVEL SECURITY;
 
@@ -258,6 +296,27 @@ CREATE POLICY "Anyone can view published projects" ON portfolio_projects
 CREATE POLICY "Users can manage their own projects" ON portfolio_projects
     FOR ALL USING (auth.uid() = user_id);
 
+-- Progress of the background GitHub import for each user with a github_url
+CREATE TABLE IF NOT EXISTS github_sync_state (
+    user_id UUID PRIMARY KEY REFERENCES profiles(id) ON DELETE CASCADE,
+    github_login TEXT,
+    synced_at TIMESTAMP WITH TIME ZONE,
+    leased_until TIMESTAMP WITH TIME ZONE, -- A worker is syncing this user until then
+    repos_imported INTEGER DEFAULT 0,
+    last_error TEXT,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- ETags of the repository list pages the imported projects were last written from
+ALTER TABLE github_sync_state ADD COLUMN IF NOT EXISTS repos_etag TEXT;
+
+ALTER TABLE github_sync_state ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own GitHub sync" ON github_sync_state;
+
+CREATE POLICY "Users can view their own GitHub sync" ON github_sync_state
+    FOR SELECT USING (auth.uid() = user_id);
+
 -- =========================================
 -- 8. ACHIEVEMENTS/BADGES
 -- =========================================
@@ -287,6 +346,26 @@ CREATE POLICY "Users can view their own achievements" ON achievements
 CREATE POLICY "System can create achievements" ON achievements
     FOR INSERT WITH CHECK (TRUE); -- Allow triggers/functions to create achievements
 
+-- Column added for the leaderboards: hackathon_id ties points to a hackathon board
+ALTER TABLE achievements ADD COLUMN IF NOT EXISTS hackathon_id UUID REFERENCES hackathons(id) ON DELETE SET NULL;
+
+-- Signed change log behind the in-memory leaderboards (see leaderboard_changes).
+-- Every insert, update and delete of an achievement appends the points it adds
+-- or takes away per user and hackathon; renaming a profile with points, or
+-- moving it to another institution, appends a zero row. xid is the writing
+-- transaction, which tells workers when a row can no longer be preceded by an
+-- uncommitted one.
+CREATE TABLE IF NOT EXISTS leaderboard_deltas (
+    seq BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+    xid XID8 NOT NULL DEFAULT pg_current_xact_id(),
+    user_id UUID NOT NULL,
+    hackathon_id UUID,
+    points INTEGER NOT NULL
+);
+
+-- No policies: only the service role reads the log
+ALTER TABLE leaderboard_deltas ENABLE ROW LEVEL SECURITY;
+
 -- =========================================
 -- 9. ANALYTICS/PROGRESS TRACKING
 -- =========================================
@@ -314,6 +393,65 @@ CREATE POLICY "Users can view their own progress" ON user_progress
 CREATE POLICY "Users can create their own progress records" ON user_progress
     FOR INSERT WITH CHECK (auth.uid() = user_id);
 
+-- Columns added for incremental analytics rollups: seq orders rows by arrival
+-- (created_at is the event time and can arrive late) and xid is the writing
+-- transaction, which tells the rollup when a row can no longer be preceded by
+-- an uncommitted one. Rows written before xid existed get 0 (already settled).
+ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS seq BIGINT GENERATED ALWAYS AS IDENTITY;
+ALTER TABLE user_progress ADD COLUMN IF NOT EXISTS xid XID8;
+UPDATE user_progress SET xid = '0' WHERE xid IS NULL;
+ALTER TABLE user_progress ALTER COLUMN xid SET DEFAULT pg_current_xact_id();
+ALTER TABLE user_progress ALTER COLUMN xid SET NOT NULL;
+
+-- Pre-aggregated user_progress, maintained by rollup_user_progress().
+-- grain is 'hour' or 'day'; buckets are UTC. Rows without an activity_id use
+-- the nil UUID so they can be part of the primary key.
+CREATE TABLE IF NOT EXISTS user_activity_rollups (
+    grain TEXT NOT NULL CHECK (grain IN ('hour', 'day')),
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    user_id UUID NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    activity_type TEXT NOT NULL,
+    activity_id UUID NOT NULL,
+    events INTEGER NOT NULL DEFAULT 0,
+    seconds BIGINT NOT NULL DEFAULT 0,
+    max_progress INTEGER,
+
+    PRIMARY KEY (grain, user_id, bucket, activity_type, activity_id)
+);
+
+-- The same totals per activity (e.g. per course) across all users
+CREATE TABLE IF NOT EXISTS activity_rollups (
+    grain TEXT NOT NULL CHECK (grain IN ('hour', 'day')),
+    bucket TIMESTAMP WITH TIME ZONE NOT NULL,
+    activity_type TEXT NOT NULL,
+    activity_id UUID NOT NULL,
+    events INTEGER NOT NULL DEFAULT 0,
+    seconds BIGINT NOT NULL DEFAULT 0,
+    active_users INTEGER NOT NULL DEFAULT 0,
+
+    PRIMARY KEY (grain, activity_id, bucket, activity_type)
+);
+
+-- How far into user_progress (by xid, then seq) the rollups have been built,
+-- where leaderboard_deltas was last pruned and when the leaderboards were last reset
+CREATE TABLE IF NOT EXISTS analytics_watermarks (
+    name TEXT PRIMARY KEY,
+    last_seq BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- A seq-only watermark continues as (0, last_seq): rows written before xid existed
+ALTER TABLE analytics_watermarks ADD COLUMN IF NOT EXISTS last_xid XID8 NOT NULL DEFAULT '0';
+
+ALTER TABLE user_activity_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE activity_rollups ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analytics_watermarks ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view their own activity rollups" ON user_activity_rollups;
+
+CREATE POLICY "Users can view their own activity rollups" ON user_activity_rollups
+    FOR SELECT USING (auth.uid() = user_id);
+
 -- =========================================
 -- 10. FUNCTIONS AND TRIGGERS
 -- =========================================
@@ -353,6 +491,654 @@ CREATE TRIGGER update_teams_updated_at BEFORE UPDATE ON teams
 CREATE TRIGGER update_portfolio_projects_updated_at BEFORE UPDATE ON portfolio_projects
     FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Bulk last_login update used by the API's write-behind batcher.
+-- A plain upsert cannot be used because profiles has NOT NULL columns.
+CREATE OR REPLACE FUNCTION bulk_update_last_login(updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    UPDATE profiles p
+    SET last_login = GREATEST(COALESCE(p.last_login, u.last_login), u.last_login)
+    FROM jsonb_to_recordset(updates) AS u(id UUID, last_login TIMESTAMP WITH TIME ZONE)
+    WHERE p.id = u.id;
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION bulk_update_last_login(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION bulk_update_last_login(JSONB) TO service_role;
+
+-- Bulk progress ingestion used by the API's heartbeat batcher. Each update is
+-- one enrollment's coalesced heartbeats: updates the enrollment (progress never
+-- moves backwards, watched seconds accumulate and carry into whole minutes) and
+-- appends a course_progress row to user_progress. Heartbeats only advance
+-- enrollments that already exist; updates for any other user and course are
+-- dropped rather than enrolling the user or failing the batch.
+CREATE OR REPLACE FUNCTION ingest_progress(updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    applied_count INTEGER;
+BEGIN
+    WITH batch AS (
+        SELECT u.user_id, u.course_id,
+               SUM(GREATEST(u.seconds, 0))::INTEGER AS seconds,
+               LEAST(GREATEST(MAX(u.progress), 0), 100) AS progress,
+               (ARRAY_AGG(u.lesson ORDER BY u.occurred_at DESC) FILTER (WHERE u.lesson IS NOT NULL))[1] AS lesson,
+               MAX(u.occurred_at) AS occurred_at,
+               SUM(u.events)::INTEGER AS events
+        FROM jsonb_to_recordset(updates) AS u(
+            user_id UUID, course_id UUID, seconds INTEGER, progress INTEGER,
+            lesson TEXT, occurred_at TIMESTAMP WITH TIME ZONE, events INTEGER
+        )
+        GROUP BY u.user_id, u.course_id
+    ), updated AS (
+        UPDATE course_enrollments AS e SET
+            progress_percentage = GREATEST(e.progress_percentage, b.progress),
+            time_spent_seconds = COALESCE(e.time_spent_seconds, 0) + b.seconds,
+            time_spent_minutes = COALESCE(e.time_spent_minutes, 0)
+                + (COALESCE(e.time_spent_seconds, 0) % 60 + b.seconds) / 60,
+            -- Heartbeats can arrive out of order; only a newer one moves the lesson
+            current_lesson = CASE
+                WHEN e.last_activity_at IS NULL OR b.occurred_at >= e.last_activity_at
+                THEN COALESCE(b.lesson, e.current_lesson)
+                ELSE e.current_lesson
+            END,
+            last_activity_at = GREATEST(e.last_activity_at, b.occurred_at),
+            completed_at = COALESCE(e.completed_at, CASE WHEN b.progress = 100 THEN b.occurred_at END)
+        FROM batch b
+        WHERE e.user_id = b.user_id AND e.course_id = b.course_id
+        RETURNING e.user_id, e.course_id
+    )
+    INSERT INTO user_progress (user_id, activity_type, activity_id, metadata, created_at)
+    SELECT b.user_id, 'course_progress', b.course_id,
+           jsonb_build_object('seconds', b.seconds, 'progress_percentage', b.progress,
+                              'current_lesson', b.lesson, 'events', b.events),
+           b.occurred_at
+    FROM batch b
+    JOIN updated u ON u.user_id = b.user_id AND u.course_id = b.course_id;
+    GET DIAGNOSTICS applied_count = ROW_COUNT;
+    RETURN applied_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION ingest_progress(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION ingest_progress(JSONB) TO service_role;
+
+-- -----------------------------------------
+-- Analytics rollups
+-- -----------------------------------------
+-- Folds user_progress rows past the watermark into the hourly and daily
+-- rollups and advances the watermark in the same transaction. Rows are read
+-- in (xid, seq) order and only from transactions older than the snapshot's
+-- xmin, which have all committed or aborted: a transaction still in flight,
+-- however long it takes, is picked up by a later run instead of being passed
+-- over. Concurrent runs (one per API worker) skip instead of waiting. Returns
+-- the number of events consumed; call again while it returns batch_limit to
+-- catch up. Run it from the API's background task, pg_cron or
+-- backend/rollup_analytics.py.
+DROP FUNCTION IF EXISTS rollup_user_progress(INTEGER, INTEGER);
+
+CREATE OR REPLACE FUNCTION rollup_user_progress(
+    batch_limit INTEGER DEFAULT 50000
+)
+RETURNS INTEGER AS $$
+DECLARE
+    from_xid XID8;
+    from_seq BIGINT;
+    to_xid XID8;
+    to_seq BIGINT;
+    consumed INTEGER;
+    rollup_grain TEXT;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('rollup_user_progress')) THEN
+        RETURN 0;
+    END IF;
+
+    INSERT INTO analytics_watermarks (name) VALUES ('user_progress') ON CONFLICT (name) DO NOTHING;
+    SELECT last_xid, last_seq INTO from_xid, from_seq FROM analytics_watermarks WHERE name = 'user_progress';
+
+    WITH pending AS (
+        SELECT xid, seq FROM user_progress
+        WHERE (xid, seq) > (from_xid, from_seq)
+          AND xid < pg_snapshot_xmin(pg_current_snapshot())
+        ORDER BY xid, seq
+        LIMIT batch_limit
+    )
+    SELECT (SELECT COUNT(*) FROM pending), last.xid, last.seq INTO consumed, to_xid, to_seq
+    FROM (SELECT xid, seq FROM pending ORDER BY xid DESC, seq DESC LIMIT 1) last;
+    IF to_seq IS NULL THEN
+        RETURN 0;
+    END IF;
+
+    FOREACH rollup_grain IN ARRAY ARRAY['hour', 'day'] LOOP
+        WITH events AS (
+            SELECT date_trunc(rollup_grain, created_at, 'UTC') AS bucket,
+                   user_id,
+                   activity_type,
+                   COALESCE(activity_id, '00000000-0000-0000-0000-000000000000'::UUID) AS activity_id,
+                   CASE WHEN jsonb_typeof(metadata->'seconds') = 'number'
+                        THEN GREATEST((metadata->>'seconds')::NUMERIC, 0)::BIGINT ELSE 0 END AS seconds,
+                   CASE WHEN jsonb_typeof(metadata->'progress_percentage') = 'number'
+                        THEN (metadata->>'progress_percentage')::NUMERIC::INTEGER END AS progress
+            FROM user_progress
+            WHERE (xid, seq) > (from_xid, from_seq) AND (xid, seq) <= (to_xid, to_seq)
+              AND user_id IS NOT NULL AND created_at IS NOT NULL
+        ), per_user AS (
+            SELECT bucket, user_id, activity_type, activity_id,
+                   COUNT(*) AS events, SUM(seconds) AS seconds, MAX(progress) AS max_progress
+            FROM events
+            GROUP BY bucket, user_id, activity_type, activity_id
+        ), user_upsert AS (
+            INSERT INTO user_activity_rollups AS r
+                (grain, bucket, user_id, activity_type, activity_id, events, seconds, max_progress)
+            SELECT rollup_grain, bucket, user_id, activity_type, activity_id, events, seconds, max_progress
+            FROM per_user
+            ON CONFLICT (grain, user_id, bucket, activity_type, activity_id) DO UPDATE SET
+                events = r.events + EXCLUDED.events,
+                seconds = r.seconds + EXCLUDED.seconds,
+                max_progress = GREATEST(r.max_progress, EXCLUDED.max_progress)
+            -- xmax = 0 marks a freshly inserted row: a user new to this bucket
+            RETURNING r.bucket, r.activity_type, r.activity_id, (r.xmax = 0) AS inserted
+        ), new_users AS (
+            SELECT bucket, activity_type, activity_id, COUNT(*) FILTER (WHERE inserted) AS users
+            FROM user_upsert
+            GROUP BY bucket, activity_type, activity_id
+        )
+        INSERT INTO activity_rollups AS a
+            (grain, bucket, activity_type, activity_id, events, seconds, active_users)
+        SELECT rollup_grain, p.bucket, p.activity_type, p.activity_id,
+               SUM(p.events), SUM(p.seconds), COALESCE(MAX(n.users), 0)
+        FROM per_user p
+        LEFT JOIN new_users n USING (bucket, activity_type, activity_id)
+        GROUP BY p.bucket, p.activity_type, p.activity_id
+        ON CONFLICT (grain, activity_id, bucket, activity_type) DO UPDATE SET
+            events = a.events + EXCLUDED.events,
+            seconds = a.seconds + EXCLUDED.seconds,
+            active_users = a.active_users + EXCLUDED.active_users;
+    END LOOP;
+
+    UPDATE analytics_watermarks SET last_xid = to_xid, last_seq = to_seq, updated_at = NOW()
+    WHERE name = 'user_progress';
+    RETURN consumed;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION rollup_user_progress(INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION rollup_user_progress(INTEGER) TO service_role;
+
+CREATE OR REPLACE FUNCTION log_achievement_points()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.user_id IS NOT NULL THEN
+        INSERT INTO leaderboard_deltas (user_id, hackathon_id, points)
+        VALUES (OLD.user_id, OLD.hackathon_id, -COALESCE(OLD.points, 0));
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') AND NEW.user_id IS NOT NULL THEN
+        INSERT INTO leaderboard_deltas (user_id, hackathon_id, points)
+        VALUES (NEW.user_id, NEW.hackathon_id, COALESCE(NEW.points, 0));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS log_achievement_points ON achievements;
+CREATE TRIGGER log_achievement_points
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, hackathon_id, points ON achievements
+    FOR EACH ROW EXECUTE FUNCTION log_achievement_points();
+
+-- Boards show names and group users by institution; a zero row makes workers
+-- re-read the profile of a user who is on them
+CREATE OR REPLACE FUNCTION log_leaderboard_profile()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM achievements a WHERE a.user_id = NEW.id) THEN
+        INSERT INTO leaderboard_deltas (user_id, points) VALUES (NEW.id, 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS log_leaderboard_profile ON profiles;
+CREATE TRIGGER log_leaderboard_profile AFTER UPDATE OF name, institution ON profiles
+    FOR EACH ROW
+    WHEN (OLD.name IS DISTINCT FROM NEW.name OR OLD.institution IS DISTINCT FROM NEW.institution)
+    EXECUTE FUNCTION log_leaderboard_profile();
+
+-- Logged point changes after the (after_xid, after_seq) cursor, summed per user
+-- and hackathon, for the in-memory leaderboards. Only rows of transactions older
+-- than every transaction still running are returned, in (xid, seq) order: a
+-- transaction that commits late holds the cursor back instead of being skipped
+-- (so does any long-running transaction, which only delays the boards). Each
+-- worker keeps its own cursor, so nothing is written here. floor_xid/floor_seq
+-- is where prune_leaderboard_deltas last cut the log: a worker whose cursor is
+-- below it (say, restored from an old snapshot) has missed rows and rebuilds.
+-- reset_xid is the transaction of the last reset_leaderboards() call; a worker
+-- whose boards were built before it rebuilds.
+DROP FUNCTION IF EXISTS leaderboard_changes(BIGINT, INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION leaderboard_changes(
+    after_xid BIGINT DEFAULT 0,
+    after_seq BIGINT DEFAULT 0,
+    batch_limit INTEGER DEFAULT 20000
+)
+RETURNS JSONB AS $$
+    WITH batch AS (
+        SELECT d.xid, d.seq, d.user_id, d.hackathon_id, d.points
+        FROM leaderboard_deltas d
+        WHERE (d.xid, d.seq) > (after_xid::TEXT::XID8, after_seq)
+          AND d.xid < pg_snapshot_xmin(pg_current_snapshot())
+        ORDER BY d.xid, d.seq
+        LIMIT batch_limit
+    ), last AS (
+        SELECT xid, seq FROM batch ORDER BY xid DESC, seq DESC LIMIT 1
+    ), totals AS (
+        SELECT user_id, hackathon_id, SUM(points) AS points
+        FROM batch
+        GROUP BY user_id, hackathon_id
+    )
+    SELECT jsonb_build_object(
+        'consumed', (SELECT COUNT(*) FROM batch),
+        'last_xid', (SELECT xid::TEXT::BIGINT FROM last),
+        'last_seq', (SELECT seq FROM last),
+        'reset_xid', COALESCE((SELECT last_xid::TEXT::BIGINT FROM analytics_watermarks WHERE name = 'leaderboard_resets'), 0),
+        'floor_xid', COALESCE((SELECT last_xid::TEXT::BIGINT FROM analytics_watermarks WHERE name = 'leaderboard_deltas'), 0),
+        'floor_seq', COALESCE((SELECT last_seq FROM analytics_watermarks WHERE name = 'leaderboard_deltas'), 0),
+        'totals', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('user_id', user_id, 'hackathon_id', hackathon_id, 'points', points))
+            FROM totals
+        ), '[]'::JSONB),
+        'profiles', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('id', p.id, 'name', p.name, 'institution', p.institution))
+            FROM profiles p
+            WHERE p.id IN (SELECT user_id FROM totals)
+        ), '[]'::JSONB)
+    );
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION leaderboard_changes(BIGINT, BIGINT, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION leaderboard_changes(BIGINT, BIGINT, INTEGER) TO service_role;
+
+-- Every user's points summed from achievements, for rebuilding the boards from
+-- scratch, and the cursor leaderboard_changes continues from. Logged changes of
+-- transactions at or past the snapshot's xmin are already in the sums when they
+-- committed before this query, so they are taken back out here and applied again
+-- when the worker reads them from the log: nothing is counted twice or missed.
+CREATE OR REPLACE FUNCTION leaderboard_totals()
+RETURNS JSONB AS $$
+    WITH horizon AS (
+        SELECT pg_snapshot_xmin(pg_current_snapshot()) AS xmin
+    ), points AS (
+        SELECT user_id, hackathon_id, COALESCE(points, 0) AS points
+        FROM achievements
+        WHERE user_id IS NOT NULL
+        UNION ALL
+        SELECT d.user_id, d.hackathon_id, -d.points
+        FROM leaderboard_deltas d, horizon h
+        WHERE d.xid >= h.xmin
+    ), totals AS (
+        SELECT user_id, hackathon_id, SUM(points) AS points
+        FROM points
+        GROUP BY user_id, hackathon_id
+        HAVING SUM(points) <> 0
+    )
+    SELECT jsonb_build_object(
+        'last_xid', (SELECT xmin::TEXT::BIGINT FROM horizon),
+        'last_seq', 0,
+        'reset_xid', COALESCE((SELECT last_xid::TEXT::BIGINT FROM analytics_watermarks WHERE name = 'leaderboard_resets'), 0),
+        'totals', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('user_id', user_id, 'hackathon_id', hackathon_id, 'points', points))
+            FROM totals
+        ), '[]'::JSONB),
+        'profiles', COALESCE((
+            SELECT jsonb_agg(jsonb_build_object('id', p.id, 'name', p.name, 'institution', p.institution))
+            FROM profiles p
+            WHERE p.id IN (SELECT user_id FROM totals)
+        ), '[]'::JSONB)
+    );
+$$ LANGUAGE sql STABLE SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION leaderboard_totals() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION leaderboard_totals() TO service_role;
+
+-- Delete logged changes at or before the (before_xid, before_seq) cursor and
+-- record it as the log's floor (which only moves forward). Workers call this
+-- after a rebuild with the cursor of their previous rebuild, so the log only
+-- keeps about one rebuild interval of changes: running workers are seconds
+-- behind the head and snapshots are replaced at least that often. Returns the
+-- number of rows deleted.
+CREATE OR REPLACE FUNCTION prune_leaderboard_deltas(before_xid BIGINT, before_seq BIGINT)
+RETURNS INTEGER AS $$
+DECLARE
+    floor_xid XID8 := before_xid::TEXT::XID8;
+    deleted INTEGER;
+BEGIN
+    INSERT INTO analytics_watermarks AS w (name, last_xid, last_seq)
+    VALUES ('leaderboard_deltas', floor_xid, before_seq)
+    ON CONFLICT (name) DO UPDATE
+        SET last_xid = EXCLUDED.last_xid, last_seq = EXCLUDED.last_seq, updated_at = NOW()
+        WHERE (w.last_xid, w.last_seq) < (EXCLUDED.last_xid, EXCLUDED.last_seq);
+
+    DELETE FROM leaderboard_deltas WHERE (xid, seq) <= (floor_xid, before_seq);
+    GET DIAGNOSTICS deleted = ROW_COUNT;
+    RETURN deleted;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION prune_leaderboard_deltas(BIGINT, BIGINT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION prune_leaderboard_deltas(BIGINT, BIGINT) TO service_role;
+
+-- Make every worker rebuild its boards from the achievements table on its next
+-- refresh. Run it after changing achievements behind the log's back, such as
+-- restoring them from a backup or editing them with triggers disabled:
+--   SELECT reset_leaderboards();
+CREATE OR REPLACE FUNCTION reset_leaderboards()
+RETURNS VOID AS $$
+    INSERT INTO analytics_watermarks (name, last_xid) VALUES ('leaderboard_resets', pg_current_xact_id())
+    ON CONFLICT (name) DO UPDATE SET last_xid = EXCLUDED.last_xid, updated_at = NOW();
+$$ LANGUAGE sql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION reset_leaderboards() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reset_leaderboards() TO service_role;
+
+-- Lease up to batch_limit users whose GitHub import is due (never synced, or
+-- synced more than sync_interval_seconds ago) to the calling worker for
+-- lease_seconds. Only one caller claims at a time; the others get [].
+CREATE OR REPLACE FUNCTION claim_github_syncs(
+    batch_limit INTEGER DEFAULT 50,
+    sync_interval_seconds INTEGER DEFAULT 21600,
+    lease_seconds INTEGER DEFAULT 900
+)
+RETURNS JSONB AS $$
+DECLARE
+    claimed JSONB;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('claim_github_syncs')) THEN
+        RETURN '[]'::JSONB;
+    END IF;
+
+    WITH due AS (
+        SELECT p.id, p.github_url
+        FROM profiles p
+        LEFT JOIN github_sync_state s ON s.user_id = p.id
+        WHERE p.github_url IS NOT NULL AND p.github_url <> '' AND p.is_active
+          AND (s.synced_at IS NULL OR s.synced_at < NOW() - make_interval(secs => sync_interval_seconds))
+          AND (s.leased_until IS NULL OR s.leased_until < NOW())
+        ORDER BY s.synced_at NULLS FIRST
+        LIMIT batch_limit
+    ), leased AS (
+        INSERT INTO github_sync_state (user_id, leased_until)
+        SELECT id, NOW() + make_interval(secs => lease_seconds) FROM due
+        ON CONFLICT (user_id) DO UPDATE SET leased_until = EXCLUDED.leased_until, updated_at = NOW()
+        RETURNING user_id
+    )
+    SELECT COALESCE(jsonb_agg(jsonb_build_object('user_id', due.id, 'github_url', due.github_url)), '[]'::JSONB)
+    INTO claimed
+    FROM due JOIN leased ON leased.user_id = due.id;
+
+    RETURN claimed;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION claim_github_syncs(INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_github_syncs(INTEGER, INTEGER, INTEGER) TO service_role;
+
+-- -----------------------------------------
+-- Profile statistics counters
+-- -----------------------------------------
+-- The counter columns on profiles are maintained incrementally by the
+-- triggers below so a profile view never aggregates other tables.
+-- reconcile_profile_stats() recomputes them in bulk and repairs drift;
+-- schedule it (e.g. nightly with pg_cron) or run backend/reconcile_stats.py.
+
+CREATE OR REPLACE FUNCTION profile_skill_level(completed INTEGER)
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN completed >= 20 THEN 'expert'
+        WHEN completed >= 10 THEN 'advanced'
+        WHEN completed >= 3 THEN 'intermediate'
+        ELSE 'beginner'
+    END;
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION bump_profile_stats(
+    target_user UUID,
+    d_courses INTEGER DEFAULT 0,
+    d_completed INTEGER DEFAULT 0,
+    d_minutes INTEGER DEFAULT 0,
+    d_hackathons INTEGER DEFAULT 0,
+    d_won INTEGER DEFAULT 0,
+    d_badges INTEGER DEFAULT 0
+)
+RETURNS VOID AS $$
+    UPDATE profiles SET
+        total_courses = GREATEST(COALESCE(total_courses, 0) + d_courses, 0),
+        completed_courses = GREATEST(COALESCE(completed_courses, 0) + d_completed, 0),
+        total_minutes = GREATEST(COALESCE(total_minutes, 0) + d_minutes, 0),
+        total_hours = GREATEST(COALESCE(total_minutes, 0) + d_minutes, 0) / 60,
+        hackathons_participated = GREATEST(COALESCE(hackathons_participated, 0) + d_hackathons, 0),
+        hackathons_won = GREATEST(COALESCE(hackathons_won, 0) + d_won, 0),
+        badges_earned = GREATEST(COALESCE(badges_earned, 0) + d_badges, 0),
+        skill_level = profile_skill_level(GREATEST(COALESCE(completed_courses, 0) + d_completed, 0))
+    WHERE id = target_user;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION sync_enrollment_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.user_id IS NOT DISTINCT FROM NEW.user_id THEN
+        -- Progress heartbeats only touch profiles when a counted value changes
+        IF (OLD.completed_at IS NULL) = (NEW.completed_at IS NULL)
+           AND COALESCE(OLD.time_spent_minutes, 0) = COALESCE(NEW.time_spent_minutes, 0) THEN
+            RETURN NULL;
+        END IF;
+        PERFORM bump_profile_stats(NEW.user_id,
+            d_completed => (NEW.completed_at IS NOT NULL)::INTEGER - (OLD.completed_at IS NOT NULL)::INTEGER,
+            d_minutes => COALESCE(NEW.time_spent_minutes, 0) - COALESCE(OLD.time_spent_minutes, 0));
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_profile_stats(OLD.user_id,
+            d_courses => -1,
+            d_completed => -(OLD.completed_at IS NOT NULL)::INTEGER,
+            d_minutes => -COALESCE(OLD.time_spent_minutes, 0));
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM bump_profile_stats(NEW.user_id,
+            d_courses => 1,
+            d_completed => (NEW.completed_at IS NOT NULL)::INTEGER,
+            d_minutes => COALESCE(NEW.time_spent_minutes, 0));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- hackathons_participated counts distinct hackathons a user has joined a team
+-- in or registered for, so a team member who also registered counts once.
+-- Recounted from the user's own rows (both indexed by user_id) rather than
+-- bumped: whether another row still ties the user to the hackathon cannot be
+-- told once a cascade from teams or hackathons has removed it.
+CREATE OR REPLACE FUNCTION count_profile_hackathons(target_user UUID)
+RETURNS VOID AS $$
+    UPDATE profiles SET hackathons_participated = h.hackathons
+    FROM (
+        SELECT COUNT(*)::INTEGER AS hackathons
+        FROM (
+            SELECT t.hackathon_id
+            FROM team_members tm JOIN teams t ON t.id = tm.team_id
+            WHERE tm.user_id = target_user AND t.hackathon_id IS NOT NULL
+            UNION
+            SELECT hackathon_id
+            FROM hackathon_participants
+            WHERE user_id = target_user AND hackathon_id IS NOT NULL
+        ) joined
+    ) h
+    WHERE id = target_user AND hackathons_participated IS DISTINCT FROM h.hackathons;
+$$ LANGUAGE sql;
+
+CREATE OR REPLACE FUNCTION sync_team_member_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM count_profile_hackathons(NEW.user_id);
+    ELSE
+        PERFORM count_profile_hackathons(OLD.user_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE OR REPLACE FUNCTION sync_achievement_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_profile_stats(OLD.user_id,
+            d_badges => -1,
+            d_won => -(OLD.achievement_type = 'hackathon_won')::INTEGER);
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') THEN
+        PERFORM bump_profile_stats(NEW.user_id,
+            d_badges => 1,
+            d_won => (NEW.achievement_type = 'hackathon_won')::INTEGER);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+DROP TRIGGER IF EXISTS sync_enrollment_stats ON course_enrollments;
+CREATE TRIGGER sync_enrollment_stats AFTER INSERT OR UPDATE OR DELETE ON course_enrollments
+    FOR EACH ROW EXECUTE FUNCTION sync_enrollment_stats();
+
+DROP TRIGGER IF EXISTS sync_team_member_stats ON team_members;
+CREATE TRIGGER sync_team_member_stats AFTER INSERT OR DELETE ON team_members
+    FOR EACH ROW EXECUTE FUNCTION sync_team_member_stats();
+
+-- Registrations count the same way as team memberships
+DROP TRIGGER IF EXISTS sync_participant_stats ON hackathon_participants;
+CREATE TRIGGER sync_participant_stats AFTER INSERT OR DELETE ON hackathon_participants
+    FOR EACH ROW EXECUTE FUNCTION sync_team_member_stats();
+
+DROP TRIGGER IF EXISTS sync_achievement_stats ON achievements;
+CREATE TRIGGER sync_achievement_stats AFTER INSERT OR UPDATE OR DELETE ON achievements
+    FOR EACH ROW EXECUTE FUNCTION sync_achievement_stats();
+
+-- Recompute every counter from the source tables; returns the number of
+-- profiles whose stored counters had drifted and were repaired.
+CREATE OR REPLACE FUNCTION reconcile_profile_stats()
+RETURNS INTEGER AS $$
+DECLARE
+    repaired INTEGER;
+BEGIN
+    WITH enrollment_stats AS (
+        SELECT user_id,
+               COUNT(*) AS total_courses,
+               COUNT(completed_at) AS completed_courses,
+               COALESCE(SUM(time_spent_minutes), 0) AS total_minutes
+        FROM course_enrollments GROUP BY user_id
+    ), team_stats AS (
+        SELECT joined.user_id, COUNT(DISTINCT joined.hackathon_id) AS hackathons_participated
+        FROM (
+            SELECT tm.user_id, t.hackathon_id
+            FROM team_members tm JOIN teams t ON t.id = tm.team_id
+            UNION ALL
+            SELECT user_id, hackathon_id FROM hackathon_participants
+        ) joined
+        GROUP BY joined.user_id
+    ), achievement_stats AS (
+        SELECT user_id,
+               COUNT(*) AS badges_earned,
+               COUNT(*) FILTER (WHERE achievement_type = 'hackathon_won') AS hackathons_won
+        FROM achievements GROUP BY user_id
+    ), expected AS (
+        SELECT p.id,
+               COALESCE(e.total_courses, 0)::INTEGER AS total_courses,
+               COALESCE(e.completed_courses, 0)::INTEGER AS completed_courses,
+               COALESCE(e.total_minutes, 0)::INTEGER AS total_minutes,
+               COALESCE(ts.hackathons_participated, 0)::INTEGER AS hackathons_participated,
+               COALESCE(a.hackathons_won, 0)::INTEGER AS hackathons_won,
+               COALESCE(a.badges_earned, 0)::INTEGER AS badges_earned
+        FROM profiles p
+        LEFT JOIN enrollment_stats e ON e.user_id = p.id
+        LEFT JOIN team_stats ts ON ts.user_id = p.id
+        LEFT JOIN achievement_stats a ON a.user_id = p.id
+    )
+    UPDATE profiles p SET
+        total_courses = x.total_courses,
+        completed_courses = x.completed_courses,
+        total_minutes = x.total_minutes,
+        total_hours = x.total_minutes / 60,
+        hackathons_participated = x.hackathons_participated,
+        hackathons_won = x.hackathons_won,
+        badges_earned = x.badges_earned,
+        skill_level = profile_skill_level(x.completed_courses)
+    FROM expected x
+    WHERE p.id = x.id
+      AND (p.total_courses, p.completed_courses, p.total_minutes, p.hackathons_participated,
+           p.hackathons_won, p.badges_earned)
+          IS DISTINCT FROM
+          (x.total_courses, x.completed_courses, x.total_minutes, x.hackathons_participated,
+           x.hackathons_won, x.badges_earned);
+    GET DIAGNOSTICS repaired = ROW_COUNT;
+    RETURN repaired;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+REVOKE EXECUTE ON FUNCTION reconcile_profile_stats() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION reconcile_profile_stats() TO service_role;
+
+-- Full-text search over profile names and emails (indexed by idx_profiles_search).
+-- Emails are split on punctuation so "jane.doe@uni.edu" is found by "jane",
+-- "doe" or "uni"; name matches rank above email matches.
+CREATE OR REPLACE FUNCTION profile_search_vector(name TEXT, email TEXT)
+RETURNS TSVECTOR AS $$
+    SELECT setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+           setweight(to_tsvector('simple', regexp_replace(coalesce(email, ''), '[^[:alnum:]]+', ' ', 'g')), 'B');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Turn free text into a prefix query: every word must start a name or email
+-- token. Only alphanumeric runs are kept and each is quoted, so user input can
+-- never inject tsquery operators. Returns NULL (no matches) for empty input.
+CREATE OR REPLACE FUNCTION profile_search_query(search_query TEXT)
+RETURNS TSQUERY AS $$
+    SELECT to_tsquery('simple', string_agg(quote_literal(word) || ':*', ' & '))
+    FROM regexp_split_to_table(lower(coalesce(search_query, '')), '[^[:alnum:]]+') AS word
+    WHERE word <> '';
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Ranked profile search. Every index match is ranked and the best result_limit
+-- (at most 100, as GET /api/v1/users/ allows) are returned; the ORDER BY ...
+-- LIMIT is a bounded top-N sort, so even very common prefixes (a single letter,
+-- a mail domain) keep memory flat.
+-- The dropped signature took a max_candidates cap, which ranked an arbitrary
+-- subset of the matches.
+DROP FUNCTION IF EXISTS search_profiles(TEXT, TEXT, INTEGER, INTEGER);
+CREATE OR REPLACE FUNCTION search_profiles(
+    search_query TEXT,
+    role_filter TEXT DEFAULT NULL,
+    result_limit INTEGER DEFAULT 20
+)
+RETURNS SETOF profiles AS $$
+    SELECT p.*
+    FROM profiles p
+    WHERE profile_search_vector(p.name, p.email) @@ profile_search_query(search_query)
+      AND (role_filter IS NULL OR p.role = role_filter)
+    ORDER BY ts_rank_cd(profile_search_vector(p.name, p.email), profile_search_query(search_query)) DESC,
+             lower(p.name), p.id
+    LIMIT LEAST(result_limit, 100);
+$$ LANGUAGE sql STABLE;
+
+-- Search-as-you-type suggestions: the same ranking, returning only what a
+-- suggestion list needs
+CREATE OR REPLACE FUNCTION autocomplete_profiles(
+    prefix TEXT,
+    role_filter TEXT DEFAULT NULL,
+    result_limit INTEGER DEFAULT 10
+)
+RETURNS TABLE (id UUID, name TEXT, email TEXT, role TEXT) AS $$
+    SELECT p.id, p.name, p.email, p.role
+    FROM search_profiles(prefix, role_filter, result_limit) p;
+$$ LANGUAGE sql STABLE;
+
 -- =========================================
 -- 11. INDEXES FOR PERFORMANCE
 -- =========================================
@@ -361,6 +1147,11 @@ CREATE TRIGGER update_portfolio_projects_updated_at BEFORE UPDATE ON portfolio_p
 CREATE INDEX IF NOT EXISTS idx_profiles_email ON profiles(email);
 CREATE INDEX IF NOT EXISTS idx_profiles_role ON profiles(role);
 CREATE INDEX IF NOT EXISTS idx_profiles_user_type ON profiles(user_type);
+-- Keyset pagination of the admin user listing and export
+CREATE INDEX IF NOT EXISTS idx_profiles_created_id ON profiles(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_profiles_role_created_id ON profiles(role, created_at, id);
+-- Ranked name/email search (search_profiles, autocomplete_profiles)
+CREATE INDEX IF NOT EXISTS idx_profiles_search ON profiles USING GIN (profile_search_vector(name, email));
 
 -- Courses indexes
 CREATE INDEX IF NOT EXISTS idx_courses_category ON courses(category);
@@ -381,20 +1172,30 @@ CREATE INDEX IF NOT EXISTS idx_hackathons_created_by ON hackathons(created_by);
 -- Teams indexes
 CREATE INDEX IF NOT EXISTS idx_teams_hackathon ON teams(hackathon_id);
 CREATE INDEX IF NOT EXISTS idx_teams_leader ON teams(leader_id);
+CREATE INDEX IF NOT EXISTS idx_team_members_user ON team_members(user_id);
+CREATE INDEX IF NOT EXISTS idx_participants_user ON hackathon_participants(user_id);
 
 -- Portfolio indexes
 CREATE INDEX IF NOT EXISTS idx_portfolio_user ON portfolio_projects(user_id);
 CREATE INDEX IF NOT EXISTS idx_portfolio_featured ON portfolio_projects(featured);
 CREATE INDEX IF NOT EXISTS idx_portfolio_hackathon ON portfolio_projects(hackathon_id);
+-- Upsert target for imported repositories; manual projects (NULL repo id) never conflict
+CREATE UNIQUE INDEX IF NOT EXISTS idx_portfolio_github_repo ON portfolio_projects(user_id, github_repo_id);
 
 -- Achievements indexes
 CREATE INDEX IF NOT EXISTS idx_achievements_user ON achievements(user_id);
 CREATE INDEX IF NOT EXISTS idx_achievements_type ON achievements(achievement_type);
+CREATE INDEX IF NOT EXISTS idx_achievements_hackathon ON achievements(hackathon_id);
+-- leaderboard_changes reads the log in (xid, seq) order
+CREATE INDEX IF NOT EXISTS idx_leaderboard_deltas_xid ON leaderboard_deltas(xid, seq);
 
 -- Progress indexes
 CREATE INDEX IF NOT EXISTS idx_progress_user ON user_progress(user_id);
 CREATE INDEX IF NOT EXISTS idx_progress_activity ON user_progress(activity_type);
 CREATE INDEX IF NOT EXISTS idx_progress_created ON user_progress(created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_progress_seq ON user_progress(seq);
+-- rollup_user_progress reads past its watermark in (xid, seq) order
+CREATE INDEX IF NOT EXISTS idx_progress_xid ON user_progress(xid, seq);
 
 -- =========================================
 -- CONTACT MESSAGES TABLE